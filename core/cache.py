@@ -67,14 +67,17 @@ def cached(ttl: int = 5):
             # Criar chave única baseada em função + argumentos
             cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
 
+            # Cache do repositório quando o 1º argumento é um RepoContext
+            cache = cache_for(args[0] if args else None)
+
             # Tentar recuperar do cache
-            cached_value = _cache.get(cache_key)
+            cached_value = cache.get(cache_key)
             if cached_value is not None:
                 return cached_value
 
             # Executar função e cachear resultado
             result = func(*args, **kwargs)
-            _cache.set(cache_key, result, ttl)
+            cache.set(cache_key, result, ttl)
             return result
 
         return wrapper
@@ -85,3 +88,8 @@ def get_cache() -> SimpleCache:
     """Retorna a instância global de cache."""
     return _cache
 
+
+def cache_for(owner: Any = None) -> SimpleCache:
+    """Cache próprio do RepoContext informado ou, para caminhos simples, o global."""
+    cache = getattr(owner, "cache", None)
+    return cache if isinstance(cache, SimpleCache) else _cache
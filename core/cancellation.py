@@ -0,0 +1,148 @@
+"""
+Cancelamento cooperativo e eventos de progresso para operações Git longas.
+
+Um CancellationToken é associado à operação via operation_scope(); todo
+comando Git executado dentro do escopo é registrado no token, e cancel()
+encerra o grupo de processos inteiro (git + ssh/remote-https filhos).
+"""
+import contextvars
+import os
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, NamedTuple, Optional
+
+
+class ProgressEvent(NamedTuple):
+    """Evento de progresso (ex.: stage="Receiving objects", percent=45)."""
+    stage: str
+    percent: Optional[int]
+    message: str
+
+
+class CancellationToken:
+    """Token compartilhado entre a UI (que cancela) e o worker (que executa)."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """Marca como cancelado e encerra os processos Git em andamento."""
+        self._event.set()
+        with self._lock:
+            processes = list(self._processes)
+        for proc in processes:
+            kill_process_tree(proc)
+
+    def register_process(self, proc: subprocess.Popen):
+        with self._lock:
+            self._processes.add(proc)
+        # Cancelado antes do registro: encerra imediatamente
+        if self.cancelled:
+            kill_process_tree(proc)
+
+    def unregister_process(self, proc: subprocess.Popen):
+        with self._lock:
+            self._processes.discard(proc)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda o cancelamento (retorna True se cancelado)."""
+        return self._event.wait(timeout)
+
+
+class _OperationScope(NamedTuple):
+    token: Optional[CancellationToken]
+    on_progress: Optional[Callable[[ProgressEvent], None]]
+
+
+_scope: contextvars.ContextVar = contextvars.ContextVar("operation_scope", default=None)
+
+
+@contextmanager
+def operation_scope(cancel_token: Optional[CancellationToken] = None,
+                    on_progress: Optional[Callable[[ProgressEvent], None]] = None):
+    """
+    Define token de cancelamento e callback de progresso para os comandos
+    Git executados no contexto atual. Valores None herdam do escopo externo.
+    """
+    parent = _scope.get()
+    if parent is not None:
+        cancel_token = cancel_token or parent.token
+        on_progress = on_progress or parent.on_progress
+    reset = _scope.set(_OperationScope(cancel_token, on_progress))
+    try:
+        yield
+    finally:
+        _scope.reset(reset)
+
+
+def current_token() -> Optional[CancellationToken]:
+    scope = _scope.get()
+    return scope.token if scope else None
+
+
+def current_progress_callback() -> Optional[Callable[[ProgressEvent], None]]:
+    scope = _scope.get()
+    return scope.on_progress if scope else None
+
+
+def report_progress(stage: str, percent: Optional[int] = None, message: str = ""):
+    """Envia um evento de progresso ao callback do escopo atual (se houver)."""
+    callback = current_progress_callback()
+    if callback:
+        try:
+            callback(ProgressEvent(stage, percent, message or stage))
+        except Exception:
+            # Progresso é informativo: nunca interromper a operação
+            pass
+
+
+def cancellable(func: Callable) -> Callable:
+    """
+    Decorator que adiciona os parâmetros `cancel_token` e `on_progress` a um
+    serviço, executando-o dentro de operation_scope().
+
+    Uso:
+        @cancellable
+        def update_branch(repo_path, branch, ...):
+            ...
+
+        update_branch(repo, "feature/x", cancel_token=token, on_progress=print)
+    """
+    @wraps(func)
+    def wrapper(*args, cancel_token: Optional[CancellationToken] = None,
+                on_progress: Optional[Callable[[ProgressEvent], None]] = None, **kwargs):
+        with operation_scope(cancel_token, on_progress):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def popen_group_kwargs() -> dict:
+    """Argumentos do Popen para criar o processo num grupo próprio."""
+    if os.name == "posix":
+        return {"start_new_session": True}
+    return {"creationflags": getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)}
+
+
+def kill_process_tree(proc: subprocess.Popen):
+    """Encerra o processo e todos os seus filhos (grupo de processos)."""
+    if proc.poll() is not None:
+        return
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+    except (ProcessLookupError, PermissionError, OSError):
+        try:
+            proc.kill()
+        except OSError:
+            pass
@@ -0,0 +1,142 @@
+"""
+Verificação de alterações locais com saída antecipada.
+
+Em vez de um `git status --porcelain` completo (que lista todos os arquivos
+não rastreados), cada etapa só roda se a anterior não encontrou nada:
+
+1. `git diff --quiet`           — alterações não preparadas
+2. `git diff --cached --quiet`  — alterações no índice
+3. `git ls-files --others`      — não rastreados (pulado com modo "no")
+
+O resultado fica em cache pelo mtime do índice e do HEAD, por poucos
+segundos: verificações repetidas numa mesma operação não executam o git.
+"""
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from core.git_operations import run_git_command_with_status, GitCommandError
+from core.logger_config import get_logger
+from utils.settings import get_untracked_check
+
+logger = get_logger()
+
+REASON_UNSTAGED = "não preparadas"
+REASON_STAGED = "no índice"
+REASON_UNTRACKED = "não rastreados"
+
+# Janela de validade do cache: alterações em arquivos do worktree não mudam o índice
+DIRTY_CACHE_TTL = 2.0
+
+
+class DirtyState(NamedTuple):
+    """Resultado da verificação; `reason` indica a primeira etapa que encontrou alterações."""
+    dirty: bool
+    reason: str = ""
+
+
+_CLEAN = DirtyState(False)
+
+_cache: Dict[Tuple[str, str], Tuple[tuple, float, DirtyState]] = {}
+_lock = threading.Lock()
+
+
+def _git_dir(repo_path) -> Optional[str]:
+    """Diretório git do worktree (onde ficam index e HEAD)."""
+    git_dir = getattr(repo_path, "git_dir", None)
+    if git_dir:
+        return git_dir
+    dot_git = os.path.join(str(repo_path), ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git, encoding="utf-8") as f:
+            content = f.read().strip()
+    except OSError:
+        return None
+    if not content.startswith("gitdir:"):
+        return None
+    return os.path.normpath(os.path.join(str(repo_path), content[len("gitdir:"):].strip()))
+
+
+def _fingerprint(repo_path) -> Optional[tuple]:
+    """mtime/tamanho do índice e do HEAD; None quando não é possível calcular (sem cache)."""
+    git_dir = _git_dir(repo_path)
+    if not git_dir:
+        return None
+    stamps = []
+    for name in ("index", "HEAD"):
+        try:
+            st = os.stat(os.path.join(git_dir, name))
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamps.append((0, 0))
+    return tuple(stamps)
+
+
+def _differs(repo_path: str, command) -> bool:
+    """True se o `git diff --quiet` indicar diferenças (código 1)."""
+    result = run_git_command_with_status(repo_path, command)
+    if result.returncode not in (0, 1):
+        raise GitCommandError(result.stderr.strip() or f"Falha ao verificar alterações em '{repo_path}'.")
+    return result.returncode == 1
+
+
+def _scan(repo_path: str, untracked: str) -> DirtyState:
+    if _differs(repo_path, ["diff", "--quiet", "--no-ext-diff"]):
+        return DirtyState(True, REASON_UNSTAGED)
+    if _differs(repo_path, ["diff", "--cached", "--quiet", "--no-ext-diff"]):
+        return DirtyState(True, REASON_STAGED)
+    if untracked == "no":
+        return _CLEAN
+    # --directory: diretórios não rastreados aparecem como uma entrada só (como -unormal)
+    result = run_git_command_with_status(repo_path, [
+        "ls-files", "--others", "--exclude-standard", "--directory", "--no-empty-directory", "-z",
+    ])
+    if result.returncode != 0:
+        raise GitCommandError(result.stderr.strip() or f"Falha ao listar arquivos não rastreados em '{repo_path}'.")
+    return DirtyState(True, REASON_UNTRACKED) if result.stdout else _CLEAN
+
+
+def check_dirty(repo_path, untracked: Optional[str] = None) -> DirtyState:
+    """
+    Verifica se o worktree tem alterações locais, parando na primeira encontrada.
+
+    Args:
+        untracked: "normal" considera arquivos não rastreados, "no" os ignora
+            (None = configuração do usuário, ver utils.settings.get_untracked_check)
+
+    Raises:
+        GitCommandError: se algum dos comandos git falhar.
+    """
+    untracked = untracked or get_untracked_check()
+    key = (os.path.abspath(str(repo_path)), untracked)
+    fingerprint = _fingerprint(repo_path)
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key)
+    if fingerprint is not None and entry and entry[0] == fingerprint and now - entry[1] < DIRTY_CACHE_TTL:
+        return entry[2]
+
+    state = _scan(str(repo_path), untracked)
+    if fingerprint is not None:
+        with _lock:
+            _cache[key] = (fingerprint, now, state)
+    logger.debug("Alterações locais em '%s': %s", repo_path, state.reason or "nenhuma")
+    return state
+
+
+def is_dirty(repo_path, untracked: Optional[str] = None) -> bool:
+    """Atalho para `check_dirty(...).dirty`."""
+    return check_dirty(repo_path, untracked).dirty
+
+
+def invalidate_dirty(repo_path=None):
+    """Descarta o resultado em cache (de um repositório ou de todos)."""
+    with _lock:
+        if repo_path is None:
+            _cache.clear()
+            return
+        path = os.path.abspath(str(repo_path))
+        for key in [k for k in _cache if k[0] == path]:
+            del _cache[key]
@@ -0,0 +1,151 @@
+"""
+Planejador de fetch: reúne todas as refs que uma operação precisa num único
+`git fetch` com refspecs explícitos.
+
+Refs buscadas recentemente (dentro da janela de frescor) são puladas, refs
+trazidas por um prefetch recente (core.prefetch) são promovidas sem ir à
+rede, e o resultado informa o que realmente mudou em refs/remotes/<remote>/.
+"""
+import re
+from typing import Dict, List, NamedTuple, Tuple
+from core.cache import cache_for
+from core.git_operations import run_git_command, GitCommandError
+from core.logger_config import get_logger
+from core.prefetch import promote_prefetched
+
+logger = get_logger()
+
+# Janela (segundos) em que uma ref buscada é considerada atual
+DEFAULT_FRESHNESS = 30
+
+_MISSING_REF_RE = re.compile(r"couldn't find remote ref (?:refs/heads/)?(\S+)")
+
+# Mensagens do git em inglês, independente do idioma do sistema (ex.: pt_BR),
+# para que _MISSING_REF_RE reconheça a ref inexistente
+_C_LOCALE = {"LC_ALL": "C"}
+
+
+class FetchResult(NamedTuple):
+    """Resumo de um fetch planejado."""
+    fetched: Tuple[str, ...]                   # branches buscadas nesta execução
+    skipped: Tuple[str, ...]                   # puladas (buscadas há pouco tempo)
+    missing: Tuple[str, ...]                   # não existem no remoto
+    updated: Dict[str, Tuple[str, str]]        # branch -> (sha antigo, sha novo) que mudaram
+    prefetched: Tuple[str, ...] = ()           # promovidas a partir do prefetch
+
+    @property
+    def available(self) -> Tuple[str, ...]:
+        """Branches que existem no remoto com ref local atualizada."""
+        return self.fetched + self.skipped + self.prefetched
+
+
+def _freshness_key(repo_path: str, remote: str, branch: str) -> str:
+    return f"fetch:{repo_path}:{remote}:{branch}"
+
+
+def mark_fetched(repo_path: str, branches, remote: str = "origin", freshness: int = DEFAULT_FRESHNESS):
+    """Registra branches como recém-buscadas (também usado por quem busca por fora do planner)."""
+    cache = cache_for(repo_path)
+    for branch in branches:
+        cache.set(_freshness_key(str(repo_path), remote, branch), True, ttl=freshness)
+
+
+def invalidate_fetched(repo_path: str, branches=None, remote: str = "origin"):
+    """Esquece o frescor das branches informadas (ex.: após push)."""
+    cache = cache_for(repo_path)
+    for branch in branches or []:
+        cache.clear(_freshness_key(str(repo_path), remote, branch))
+
+
+class FetchPlanner:
+    """
+    Coleta branches e executa um único fetch.
+
+    Uso:
+        result = FetchPlanner(repo).add("develop").add("feature/x", optional=True).execute()
+        if "feature/x" in result.available: ...
+    """
+
+    def __init__(self, repo_path: str, remote: str = "origin", freshness: int = DEFAULT_FRESHNESS):
+        self.repo_path = repo_path
+        self.remote = remote
+        self.freshness = freshness
+        self._branches: Dict[str, bool] = {}  # branch -> opcional?
+
+    def add(self, branch: str, optional: bool = False) -> "FetchPlanner":
+        """Inclui uma branch no plano (opcional = pode não existir no remoto)."""
+        if branch:
+            # Se qualquer chamador exigir a branch, ela passa a ser obrigatória
+            self._branches[branch] = self._branches.get(branch, True) and optional
+        return self
+
+    def _tracking_ref(self, branch: str) -> str:
+        return f"refs/remotes/{self.remote}/{branch}"
+
+    def _refspec(self, branch: str) -> str:
+        return f"+refs/heads/{branch}:{self._tracking_ref(branch)}"
+
+    def _snapshot(self, branches: List[str]) -> Dict[str, str]:
+        """SHA atual das refs de rastreamento (um único for-each-ref)."""
+        wanted = {self._tracking_ref(b): b for b in branches}
+        try:
+            raw = run_git_command(self.repo_path, ["for-each-ref", "--format=%(objectname) %(refname)"] + list(wanted))
+        except GitCommandError:
+            return {}
+        shas = {}
+        for line in raw.splitlines():
+            sha, _, ref = line.partition(" ")
+            if ref in wanted:
+                shas[wanted[ref]] = sha
+        return shas
+
+    def execute(self) -> FetchResult:
+        """Executa o fetch planejado e retorna o que foi transferido."""
+        # Leitura e escrita no mesmo cache (o do RepoContext, quando houver)
+        cache = cache_for(self.repo_path)
+        repo_key = str(self.repo_path)
+        skipped = tuple(
+            b for b in self._branches if cache.get(_freshness_key(repo_key, self.remote, b))
+        )
+        pending = [b for b in self._branches if b not in skipped]
+
+        # Prefetch recente: promove as refs e descarta opcionais inexistentes
+        promoted, absent = promote_prefetched(self.repo_path, pending, self.remote)
+        missing = [b for b in absent if self._branches[b]]
+        pending = [b for b in pending if b not in promoted and b not in missing]
+        prefetched = tuple(promoted)
+        updated = {b: shas for b, shas in promoted.items() if shas[0] != shas[1]}
+        mark_fetched(self.repo_path, prefetched, self.remote, self.freshness)
+
+        if not pending:
+            logger.debug("Fetch ignorado: refs recentes %s, pré-buscadas %s", skipped, prefetched)
+            return FetchResult((), skipped, tuple(missing), updated, prefetched)
+
+        before = self._snapshot(pending)
+        while pending:
+            try:
+                refspecs = [self._refspec(b) for b in pending]
+                run_git_command(self.repo_path, ["fetch", self.remote] + refspecs, env=_C_LOCALE)
+                break
+            except GitCommandError as e:
+                match = _MISSING_REF_RE.search(str(e))
+                absent = match.group(1) if match else None
+                if absent not in pending or not self._branches[absent]:
+                    # Falha de rede ou branch obrigatória ausente
+                    raise
+                logger.debug("Branch '%s' não existe em %s; refazendo fetch sem ela", absent, self.remote)
+                pending.remove(absent)
+                missing.append(absent)
+
+        after = self._snapshot(pending)
+        updated.update(
+            (b, (before.get(b, ""), after[b]))
+            for b in pending
+            if b in after and before.get(b) != after[b]
+        )
+        mark_fetched(self.repo_path, pending, self.remote, self.freshness)
+        logger.info(
+            "Fetch de %s: %d ref(s) buscadas, %d atualizadas, %d recentes, %d pré-buscadas, %d inexistentes",
+            self.remote, len(pending), len(updated), len(skipped), len(prefetched), len(missing)
+        )
+        return FetchResult(tuple(pending), skipped, tuple(missing), updated, prefetched)
@@ -1,51 +1,441 @@
+import codecs
+import os
+import re
 import subprocess
+import threading
+import time
 import requests
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from core.env_utils import require_github_token
 from utils.repo_utils import get_repo_info
+from utils.settings import get_git_timeout
 from core.logger_config import get_logger
+from core.tracing import span, start_span, end_span
+from core.metrics import get_metrics
+from core.cancellation import (
+    current_token,
+    current_progress_callback,
+    kill_process_tree,
+    popen_group_kwargs,
+    ProgressEvent,
+)
 
 logger = get_logger()
 
+# Comandos de rede: executados em grupo de processos próprio (cancelamento/timeout
+# encerram também ssh/remote-https) e com progresso via --progress no stderr
+NETWORK_COMMANDS = {"fetch", "push", "pull", "clone", "ls-remote"}
+PROGRESS_COMMANDS = {"fetch", "push", "pull", "clone"}
+
+# Ex.: "remote: Counting objects:  45% (450/1000)" / "Receiving objects: 100% (3/3), done."
+_PROGRESS_RE = re.compile(r"^(?:remote:\s*)?(?P<stage>[A-Za-z][A-Za-z ]*?):\s+(?P<percent>\d{1,3})%")
+
 
 class GitCommandError(Exception):
     """Erro personalizado para falhas em comandos Git."""
     pass
 
 
-def run_git_command(repo_path: str, command_list: List[str]) -> str:
-    """Executa comandos Git e retorna a saída limpa."""
+class GitCommandCancelled(GitCommandError):
+    """Comando Git interrompido por cancelamento do usuário."""
+    pass
+
+
+class GitCommandTimeout(GitCommandError):
+    """Comando Git excedeu o tempo limite configurado."""
+    pass
+
+
+def _timeout_message(command_list: List[str], timeout: float) -> str:
+    return f"Tempo limite de {timeout:g}s excedido em 'git {' '.join(command_list[:2])}'."
+
+
+def _run_git_process(repo_path: str, command_list: List[str], timeout: Optional[float],
+                     env: Optional[Dict[str, str]] = None, input: Optional[str] = None) -> subprocess.CompletedProcess:
+    """
+    Executa o git num grupo de processos próprio, lendo o stderr como stream
+    para emitir eventos de progresso, com suporte a cancelamento e timeout.
+    """
+    token = current_token()
+    on_progress = current_progress_callback()
+    subcommand = command_list[0] if command_list else ""
+    args = list(command_list)
+    if on_progress and subcommand in PROGRESS_COMMANDS and "--progress" not in args:
+        args.insert(1, "--progress")
+
+    proc = subprocess.Popen(
+        ["git", "-C", repo_path] + args,
+        stdin=subprocess.PIPE if input is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        **popen_group_kwargs()
+    )
+    if token:
+        token.register_process(proc)
+
+    if not (on_progress and subcommand in PROGRESS_COMMANDS):
+        # Sem progresso a reportar: communicate() basta (sem threads leitoras)
+        try:
+            try:
+                stdout, stderr = proc.communicate(
+                    input=input.encode("utf-8") if input is not None else None, timeout=timeout
+                )
+            except subprocess.TimeoutExpired:
+                kill_process_tree(proc)
+                proc.communicate()
+                raise GitCommandTimeout(_timeout_message(command_list, timeout))
+        finally:
+            if token:
+                token.unregister_process(proc)
+        if token and token.cancelled:
+            raise GitCommandCancelled(f"Operação cancelada: 'git {' '.join(command_list[:2])}' interrompido.")
+        return subprocess.CompletedProcess(
+            args=proc.args,
+            returncode=proc.returncode,
+            stdout=stdout.decode("utf-8", errors="replace"),
+            stderr=stderr.decode("utf-8", errors="replace"),
+        )
+
+    stdout_chunks = []
+    stderr_lines = []
+
+    def read_stdout():
+        for chunk in iter(lambda: proc.stdout.read(65536), b""):
+            stdout_chunks.append(chunk)
+
+    def read_stderr():
+        # Progresso usa "\r" para reescrever a linha: trata \r e \n como separadores
+        buffer = b""
+        last = None
+        for chunk in iter(lambda: proc.stderr.read1(4096), b""):
+            buffer += chunk
+            *lines, buffer = re.split(rb"[\r\n]", buffer)
+            for raw in lines:
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                match = _PROGRESS_RE.match(line)
+                if match:
+                    event = ProgressEvent(match.group("stage"), int(match.group("percent")), line)
+                    # Só repassa quando a porcentagem muda (evita inundar a UI)
+                    if on_progress and (event.stage, event.percent) != last:
+                        last = (event.stage, event.percent)
+                        try:
+                            on_progress(event)
+                        except Exception:
+                            pass
+                else:
+                    stderr_lines.append(line)
+        if buffer.strip():
+            stderr_lines.append(buffer.decode("utf-8", errors="replace").strip())
+
+    def write_stdin():
+        try:
+            proc.stdin.write(input.encode("utf-8"))
+        except (BrokenPipeError, OSError):
+            pass
+        finally:
+            proc.stdin.close()
+
+    readers = [threading.Thread(target=read_stdout, daemon=True), threading.Thread(target=read_stderr, daemon=True)]
+    if input is not None:
+        readers.append(threading.Thread(target=write_stdin, daemon=True))
+    for reader in readers:
+        reader.start()
     try:
-        logger.debug(f"Executando: git {' '.join(command_list)}")
-        result = subprocess.run(
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(proc)
+            proc.wait()
+            raise GitCommandTimeout(_timeout_message(command_list, timeout))
+        finally:
+            for reader in readers:
+                reader.join()
+            proc.stdout.close()
+            proc.stderr.close()
+    finally:
+        if token:
+            token.unregister_process(proc)
+
+    if token and token.cancelled:
+        raise GitCommandCancelled(f"Operação cancelada: 'git {' '.join(command_list[:2])}' interrompido.")
+
+    return subprocess.CompletedProcess(
+        args=proc.args,
+        returncode=proc.returncode,
+        stdout=b"".join(stdout_chunks).decode("utf-8", errors="replace"),
+        stderr="\n".join(stderr_lines),
+    )
+
+
+def _execute_git(repo_path: str, command_list: List[str], timeout: Optional[float] = None,
+                 env: Optional[Dict[str, str]] = None, input: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Executa o git escolhendo o modo: simples (subprocess.run) ou com grupo de processos.
+
+    env: variáveis adicionais (somadas ao ambiente atual), ex.: GIT_AUTHOR_* do commit-tree.
+    input: texto enviado ao stdin do git (ex.: `patch-id`, `update-ref --stdin`).
+    """
+    subcommand = command_list[0] if command_list else ""
+    if env:
+        env = {**os.environ, **env}
+    if timeout is None:
+        timeout = get_git_timeout(subcommand)
+    token = current_token()
+    if token and token.cancelled:
+        raise GitCommandCancelled("Operação cancelada antes de executar o comando Git.")
+
+    if token or subcommand in NETWORK_COMMANDS:
+        return _run_git_process(repo_path, command_list, timeout, env, input)
+    try:
+        return subprocess.run(
             ["git", "-C", repo_path] + command_list,
             capture_output=True,
-            text=True
+            text=True,
+            timeout=timeout,
+            **({"env": env} if env else {}),
+            **({"input": input} if input is not None else {})
         )
-        if result.returncode != 0:
-            logger.error(f"Comando Git falhou: {result.stderr.strip()}")
-            raise GitCommandError(result.stderr.strip())
-        logger.debug(f"Comando Git sucesso: {result.stdout.strip()[:100]}")
-        return result.stdout.strip()
-    except GitCommandError:
+    except subprocess.TimeoutExpired:
+        raise GitCommandTimeout(_timeout_message(command_list, timeout))
+
+
+def _run_git(repo_path: str, command_list: List[str], timeout: Optional[float], check: bool,
+             env: Optional[Dict[str, str]] = None, input: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Executa o git dentro de um span, registrando métricas; com check=True levanta em código != 0."""
+    subcommand = command_list[0] if command_list else ""
+    start = time.perf_counter()
+    output_bytes = 0
+    failed = True
+    with span(f"git {subcommand}", kind="git", args=" ".join(command_list)) as s:
+        try:
+            logger.debug("Executando: git %s", " ".join(command_list))
+            result = _execute_git(repo_path, command_list, timeout, env, input)
+            output_bytes = len(result.stdout or "")
+            failed = result.returncode != 0
+            s.set(exit_code=result.returncode, output_bytes=output_bytes)
+            if check and result.returncode != 0:
+                stderr = result.stderr.strip()
+                logger.error("Comando Git falhou: %s", stderr)
+                raise GitCommandError(stderr)
+            return result
+        except GitCommandError:
+            raise
+        except Exception as e:
+            logger.error("Erro ao executar comando Git: %s", e)
+            raise GitCommandError(str(e))
+        finally:
+            get_metrics().observe("git", subcommand, repo_path, time.perf_counter() - start, output_bytes, failed)
+
+
+def run_git_command(repo_path: str, command_list: List[str], timeout: Optional[float] = None,
+                    env: Optional[Dict[str, str]] = None) -> str:
+    """Executa comandos Git e retorna a saída limpa.
+
+    Args:
+        repo_path: caminho do repositório
+        command_list: argumentos do git (ex.: ["fetch", "origin", "main"])
+        timeout: tempo limite em segundos (None usa o configurado para o subcomando)
+        env: variáveis de ambiente extras para o processo do git
+
+    Raises:
+        GitCommandError: falha do git (GitCommandCancelled / GitCommandTimeout
+        quando interrompido pelo usuário ou pelo tempo limite).
+    """
+    output = _run_git(repo_path, command_list, timeout, check=True, env=env).stdout.strip()
+    logger.debug("Comando Git sucesso: %.100s", output)
+    return output
+
+
+def run_git_command_with_status(repo_path: str, command_list: List[str], timeout: Optional[float] = None,
+                                env: Optional[Dict[str, str]] = None,
+                                input: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Executa o git e retorna o CompletedProcess sem levantar erro pelo código de saída.
+
+    Para comandos cujo código de saída é informativo (ex.: `push --porcelain`
+    com refs rejeitadas, `merge-tree` com conflitos). Cancelamento, tempo
+    limite e falha ao iniciar o git continuam levantando GitCommandError.
+
+    env: variáveis de ambiente adicionais para o processo git.
+    input: texto enviado ao stdin do git.
+    """
+    return _run_git(repo_path, command_list, timeout, check=False, env=env, input=input)
+
+
+STREAM_CHUNK_SIZE = 65536
+
+
+def stream_git_command(repo_path: str, command_list: List[str], timeout: Optional[float] = None,
+                       encoding: Optional[str] = None, errors: str = "replace",
+                       chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Union[bytes, str]]:
+    """Executa o git e produz o stdout em blocos, à medida que chega do pipe.
+
+    Para saídas grandes (`stash show -p`, `log -p`, `status` de repositórios
+    enormes): nada é acumulado, então o consumo de memória não depende do
+    tamanho da saída. Parar de iterar (ou fechar o gerador) encerra o git.
+
+    Args:
+        timeout: segundos até encerrar o git (None = limite configurado do
+            subcomando; 0 desativa, para leituras no ritmo do usuário)
+        encoding: None produz `bytes`; com um encoding os blocos são
+            decodificados incrementalmente (caracteres divididos entre
+            blocos são preservados)
+        errors: tratamento de bytes inválidos na decodificação
+
+    Raises:
+        GitCommandError: código de saída diferente de 0, ao final da saída
+        (GitCommandCancelled / GitCommandTimeout quando interrompido).
+    """
+    subcommand = command_list[0] if command_list else ""
+    if timeout is None:
+        timeout = get_git_timeout(subcommand)
+    token = current_token()
+    if token and token.cancelled:
+        raise GitCommandCancelled("Operação cancelada antes de executar o comando Git.")
+
+    s = start_span(f"git {subcommand}", kind="git", args=" ".join(command_list), stream=True)
+    start = time.perf_counter()
+    logger.debug("Executando (stream): git %s", " ".join(command_list))
+    proc = subprocess.Popen(
+        ["git", "-C", str(repo_path)] + list(command_list),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **popen_group_kwargs()
+    )
+    if token:
+        token.register_process(proc)
+    stderr_chunks = []
+    reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    reader.start()
+    timed_out = threading.Event()
+    timer = None
+    if timeout:
+        def expire():
+            timed_out.set()
+            kill_process_tree(proc)
+        timer = threading.Timer(timeout, expire)
+        timer.daemon = True
+        timer.start()
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors) if encoding else None
+    output_bytes = 0
+    error = None
+    try:
+        for chunk in iter(lambda: proc.stdout.read1(chunk_size), b""):
+            output_bytes += len(chunk)
+            if decoder is None:
+                yield chunk
+            else:
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+        if decoder is not None:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+        proc.wait()
+        if token and token.cancelled:
+            error = GitCommandCancelled(f"Operação cancelada: 'git {' '.join(command_list[:2])}' interrompido.")
+        elif timed_out.is_set():
+            error = GitCommandTimeout(_timeout_message(command_list, timeout))
+        elif proc.returncode != 0:
+            reader.join()
+            error = GitCommandError(b"".join(stderr_chunks).decode("utf-8", errors="replace").strip())
+    except BaseException as e:
+        error = e
         raise
-    except Exception as e:
-        logger.error(f"Erro ao executar comando Git: {e}")
-        raise GitCommandError(str(e))
+    finally:
+        # Consumidor parou antes do fim (ou erro): encerra o git
+        if timer:
+            timer.cancel()
+        kill_process_tree(proc)
+        proc.wait()
+        reader.join()
+        proc.stdout.close()
+        proc.stderr.close()
+        if token:
+            token.unregister_process(proc)
+        s.set(exit_code=proc.returncode, output_bytes=output_bytes)
+        end_span(s, error if not isinstance(error, GeneratorExit) else None)
+        get_metrics().observe("git", subcommand, repo_path, time.perf_counter() - start,
+                              output_bytes, proc.returncode != 0)
+    if error is not None:
+        logger.error("Comando Git falhou: %s", error)
+        raise error
+
+
+def split_records(chunks: Iterable[bytes], sep: bytes = b"\0") -> Iterator[bytes]:
+    """Registros separados por `sep` (ex.: saída -z), à medida que os blocos chegam.
+
+    Blocos podem cortar registros ao meio; um registro final sem separador
+    também é produzido.
+    """
+    pending: List[bytes] = []
+    for chunk in chunks:
+        if sep not in chunk:
+            if chunk:
+                pending.append(chunk)
+            continue
+        first, *middle, last = chunk.split(sep)
+        pending.append(first)
+        yield b"".join(pending)
+        yield from middle
+        pending = [last] if last else []
+    if pending:
+        yield b"".join(pending)
+
+
+def iter_git_records(repo_path: str, command_list: List[str], sep: bytes = b"\0",
+                     encoding: Optional[str] = None, errors: str = "replace",
+                     timeout: Optional[float] = None) -> Iterator[Union[bytes, str]]:
+    """Registros da saída do git (ex.: `-z`), sem acumular a saída inteira.
+
+    Args:
+        sep: separador de registros (b"\\0" para -z, b"\\n" para linhas)
+        encoding: None produz `bytes`; "fs" decodifica como caminho
+            (os.fsdecode: nomes que não são UTF-8 são preservados)
+
+    Raises:
+        GitCommandError: como em stream_git_command.
+    """
+    def decode(record: bytes):
+        if encoding == "fs":
+            return os.fsdecode(record)
+        return record.decode(encoding, errors) if encoding else record
+
+    chunks = stream_git_command(repo_path, command_list, timeout)
+    try:
+        for record in split_records(chunks, sep):
+            yield decode(record)
+    finally:
+        chunks.close()
 
 
 def get_current_branch(repo_path: str) -> str:
     """Retorna o nome da branch atual."""
     try:
         branch = run_git_command(repo_path, ["rev-parse", "--abbrev-ref", "HEAD"])
-        logger.debug(f"Branch atual: {branch}")
+        logger.debug("Branch atual: %s", branch)
         return branch
     except GitCommandError as e:
         logger.error(f"Erro ao obter branch atual: {e}")
         raise
 
 
+def get_checked_out_branches(repo_path: str) -> Dict[str, str]:
+    """Retorna branch -> caminho do worktree em que está checada (inclui o principal)."""
+    raw = run_git_command(repo_path, ["worktree", "list", "--porcelain"])
+    checked_out, path = {}, ""
+    for line in raw.splitlines():
+        if line.startswith("worktree "):
+            path = line[len("worktree "):]
+        elif line.startswith("branch refs/heads/"):
+            checked_out[line[len("branch refs/heads/"):]] = path
+    return checked_out
+
+
 def rollback_last_commit(repo_path: Path, mode: str = "soft") -> str:
     """Desfaz o último commit."""
     try:
@@ -98,7 +488,18 @@ def merge_pull_request(repo_path: Path, pr_number: int) -> str:
             "Accept": "application/vnd.github+json",
         }
 
-        response = requests.put(url, headers=headers, json={"merge_method": "squash"})
+        start = time.perf_counter()
+        response = None
+        try:
+            with span("PUT /pulls/{number}/merge", kind="http", url=url) as s:
+                response = requests.put(url, headers=headers, json={"merge_method": "squash"})
+                s.set(status=response.status_code, output_bytes=len(response.content or b""))
+        finally:
+            # Exceções (rede, timeout) também são registradas, como falha
+            failed = response is None or response.status_code >= 400
+            output_bytes = len(response.content or b"") if response is not None else 0
+            get_metrics().observe("http", "PUT /pulls/{number}/merge", repo_path, time.perf_counter() - start,
+                                  output_bytes, failed)
 
         if response.status_code == 200:
             msg = f"✅ PR #{pr_number} mesclado com sucesso!"
@@ -120,31 +521,13 @@ def merge_pull_request(repo_path: Path, pr_number: int) -> str:
 def get_default_main_branch(repo_path: Path) -> str:
     """
     Detecta automaticamente a branch principal (ex: main, master, develop, etc.).
-    Verifica a configuração remota e retorna o nome correto.
+    Usa o HEAD do remoto e, na falta dele, a branch remota mais provável
+    (ver core.topology; resultado em cache até as refs mudarem).
     """
-    try:
-        logger.debug("Detectando branch principal...")
-        # 1️⃣ tenta ler a branch padrão definida no remoto
-        result = run_git_command(repo_path, ["symbolic-ref", "refs/remotes/origin/HEAD"])
-        # Exemplo de saída: "refs/remotes/origin/main"
-        branch = result.split("/")[-1].strip()
-        logger.info(f"Branch principal detectada: {branch}")
-        return branch
-    except (GitCommandError, Exception) as e:
-        logger.debug(f"Falha ao detectar branch via symbolic-ref: {e}, usando fallback...")
-        # 2️⃣ fallback — verifica quais branches existem e escolhe a mais provável
-        remotas = run_git_command(repo_path, ["branch", "-r"]).splitlines()
-        remotas = [b.strip().replace("origin/", "") for b in remotas if "origin/" in b]
-
-        for name in ["main", "master", "develop", "production"]:
-            if name in remotas:
-                logger.info(f"Branch principal (fallback 1): {name}")
-                return name
-
-        # 3️⃣ fallback final — retorna a primeira da lista
-        if remotas:
-            logger.info(f"Branch principal (fallback 2): {remotas[0]}")
-            return remotas[0]
-
-        logger.warning("Nenhuma branch principal detectada, usando 'main'")
-        return "main"
+    # Import tardio: core.topology depende deste módulo
+    from core.topology import get_repo_topology
+
+    logger.debug("Detectando branch principal...")
+    branch = get_repo_topology(repo_path).default_branch
+    logger.info(f"Branch principal detectada: {branch}")
+    return branch
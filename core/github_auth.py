@@ -107,7 +107,7 @@ def get_github_token() -> str:
                     logger.info("✅ Autenticado via Git Credential Manager")
                     return token
     except Exception as e:
-        logger.debug(f"Git Credential Manager não disponível: {e}")
+        logger.debug("Git Credential Manager não disponível: %s", e)
 
     # 3️⃣ Último recurso: .env (apenas se estiver vazio ou comentado)
     try:
@@ -122,7 +122,7 @@ def get_github_token() -> str:
             )
             return token
     except Exception as e:
-        logger.debug(f"Erro ao carregar .env: {e}")
+        logger.debug("Erro ao carregar .env: %s", e)
 
     # Nenhum método funcionou
     raise GitHubAuthError(
@@ -147,7 +147,7 @@ def get_github_user() -> str:
 
         if result.returncode == 0:
             username = result.stdout.strip()
-            logger.debug(f"Usuário GitHub: {username}")
+            logger.debug("Usuário GitHub: %s", username)
             return username
         else:
             raise GitHubAuthError("Erro ao obter usuário GitHub")
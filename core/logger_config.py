@@ -1,11 +1,17 @@
 """
 Sistema de logging centralizado para o projeto.
 Mantém logs tanto em arquivo quanto em memória para UI.
+
+Os handlers de arquivo e de UI ficam atrás de um QueueHandler: as threads
+que registram logs apenas enfileiram o registro, e um QueueListener em
+background faz a escrita em disco (e a rotação) fora do caminho crítico.
 """
+import atexit
 import logging
 import logging.handlers
+import queue
 from pathlib import Path
-from datetime import datetime
+from typing import Optional
 
 
 class UILogHandler(logging.Handler):
@@ -29,17 +35,60 @@ class UILogHandler(logging.Handler):
         self.logs.clear()
 
 
-def setup_logging() -> logging.Logger:
-    """Configura logging com arquivo rotativo + handler para UI."""
+# Listeners em background que consomem as filas de logs (um por processo)
+_listener: Optional[logging.handlers.QueueListener] = None
+_trace_listener: Optional[logging.handlers.QueueListener] = None
 
-    # Criar diretório de logs se não existir
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
+
+def _stop_listener():
+    """Esvazia as filas e encerra os listeners (chamado no encerramento do processo)."""
+    global _listener, _trace_listener
+    for listener in (_listener, _trace_listener):
+        if listener is not None:
+            listener.stop()
+    _listener = None
+    _trace_listener = None
+
+
+def _setup_trace_logging(log_dir: Path):
+    """Configura o logger de spans: linhas JSON num arquivo rotativo próprio."""
+    global _trace_listener
+
+    trace_logger = logging.getLogger("git_automation.trace")
+    trace_logger.setLevel(logging.INFO)
+    # Spans não devem aparecer no log textual nem na UI
+    trace_logger.propagate = False
+
+    trace_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "trace.jsonl",
+        maxBytes=5 * 1024 * 1024,  # 5MB
+        backupCount=3,
+        encoding="utf-8"
+    )
+    trace_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    trace_queue = queue.SimpleQueue()
+    trace_logger.addHandler(logging.handlers.QueueHandler(trace_queue))
+    _trace_listener = logging.handlers.QueueListener(trace_queue, trace_handler)
+    _trace_listener.start()
+
+
+def setup_logging() -> logging.Logger:
+    """Configura logging com arquivo rotativo + handler para UI (via fila)."""
+    global _listener
 
     # Criar logger principal
     logger = logging.getLogger("git_automation")
     logger.setLevel(logging.DEBUG)
 
+    # Já configurado: não duplicar handlers nem listeners
+    if _listener is not None:
+        return logger
+
+    # Criar diretório de logs se não existir
+    log_dir = Path("logs")
+    log_dir.mkdir(exist_ok=True)
+
     # Handler para arquivo com rotação (máx 5 arquivos de 1MB)
     file_handler = logging.handlers.RotatingFileHandler(
         log_dir / "git_automation.log",
@@ -61,9 +110,16 @@ def setup_logging() -> logging.Logger:
     file_handler.setFormatter(formatter)
     ui_handler.setFormatter(formatter)
 
-    # Adicionar handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(ui_handler)
+    # As threads chamadoras só enfileiram; o listener grava em disco/UI
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, ui_handler, respect_handler_level=True
+    )
+    _listener.start()
+    _setup_trace_logging(log_dir)
+    atexit.register(_stop_listener)
 
     return logger
 
@@ -75,9 +131,9 @@ def get_logger() -> logging.Logger:
 
 def get_ui_handler() -> UILogHandler:
     """Retorna handler de UI para capturar logs."""
-    logger = logging.getLogger("git_automation")
-    for handler in logger.handlers:
+    handlers = list(_listener.handlers) if _listener is not None else []
+    handlers += logging.getLogger("git_automation").handlers
+    for handler in handlers:
         if isinstance(handler, UILogHandler):
             return handler
     return None
-
@@ -0,0 +1,339 @@
+"""
+Motor de sincronização sem checkout.
+
+Calcula merges e rebases direto no banco de objetos, sem tocar no índice
+nem no diretório de trabalho:
+- merge: `git merge-tree --write-tree` + `git commit-tree` (git >= 2.38);
+- rebase: `git replay` (git >= 2.44) ou commit a commit com
+  `merge-tree --merge-base` + `commit-tree` (git >= 2.40).
+A branch é atualizada atomicamente com `update-ref <ref> <novo> <antigo>`
+(falha se outro processo alterou a ref no meio do caminho).
+"""
+import re
+import subprocess
+from functools import lru_cache
+from typing import FrozenSet, List, NamedTuple, Optional, Tuple
+from core.git_operations import iter_git_records, run_git_command, run_git_command_with_status, GitCommandError
+from core.logger_config import get_logger
+
+logger = get_logger()
+
+# Versões mínimas do git para cada recurso
+WRITE_TREE_VERSION = (2, 38)
+MERGE_BASE_VERSION = (2, 40)
+REPLAY_VERSION = (2, 44)
+
+# Estágio dos ProgressEvent de aviso antecipado de sobreposição de caminhos
+OVERLAP_WARNING_STAGE = "Possível conflito"
+
+_VERSION_RE = re.compile(r"(\d+)\.(\d+)(?:\.(\d+))?")
+
+
+class MergeEngineUnavailable(GitCommandError):
+    """A versão do git instalada não permite a operação sem checkout."""
+    pass
+
+
+class MergeTreeResult(NamedTuple):
+    """Resultado de `git merge-tree --write-tree`."""
+    tree: str
+    conflicts: Tuple[str, ...]
+    messages: str
+
+    @property
+    def clean(self) -> bool:
+        return not self.conflicts
+
+
+class SyncResult(NamedTuple):
+    """Resultado da sincronização de uma branch com a base."""
+    branch: str
+    strategy: str
+    old_sha: str
+    new_sha: str
+    method: str                        # "up-to-date", "fast-forward", "merge-tree", "replay", "merge-tree-replay"
+    conflicts: Tuple[str, ...] = ()
+
+    @property
+    def changed(self) -> bool:
+        return self.old_sha != self.new_sha
+
+    @property
+    def clean(self) -> bool:
+        return not self.conflicts
+
+
+@lru_cache(maxsize=1)
+def git_version() -> Tuple[int, int, int]:
+    """Versão do git instalado (0, 0, 0 se não for possível detectar)."""
+    try:
+        output = subprocess.run(["git", "version"], capture_output=True, text=True).stdout
+    except OSError:
+        return (0, 0, 0)
+    match = _VERSION_RE.search(output)
+    if not match:
+        return (0, 0, 0)
+    return (int(match.group(1)), int(match.group(2)), int(match.group(3) or 0))
+
+
+def supports_strategy(strategy: str) -> bool:
+    """Indica se a estratégia pode ser aplicada sem checkout com o git instalado."""
+    version = git_version()
+    if strategy == "merge":
+        return version >= WRITE_TREE_VERSION
+    if strategy == "rebase":
+        return version >= MERGE_BASE_VERSION
+    return False
+
+
+def merge_tree(repo_path: str, ours: str, theirs: str, merge_base: Optional[str] = None) -> MergeTreeResult:
+    """
+    Calcula a árvore do merge de `ours` com `theirs` sem checkout.
+
+    Raises:
+        GitCommandError: erro do git (código de saída diferente de 0/1).
+    """
+    cmd = ["merge-tree", "--write-tree", "-z", "--name-only"]
+    if merge_base:
+        cmd.append(f"--merge-base={merge_base}")
+    result = run_git_command_with_status(repo_path, cmd + [ours, theirs])
+    if result.returncode not in (0, 1):
+        raise GitCommandError(result.stderr.strip() or f"merge-tree falhou ({result.returncode})")
+    head, _, messages = result.stdout.partition("\0\0")
+    fields = head.split("\0")
+    conflicts = tuple(dict.fromkeys(f for f in fields[1:] if f))
+    return MergeTreeResult(fields[0], conflicts, messages.replace("\0", "\n").strip())
+
+
+def _resolve_pair(repo_path: str, first: str, second: str) -> Tuple[str, str]:
+    """Resolve duas refs para SHAs de commit num único rev-parse."""
+    shas = run_git_command(repo_path, ["rev-parse", f"{first}^{{commit}}", f"{second}^{{commit}}"]).split()
+    if len(shas) != 2:
+        raise GitCommandError(f"Não foi possível resolver '{first}' e '{second}'.")
+    return shas[0], shas[1]
+
+
+class PathOverlap(NamedTuple):
+    """Caminhos alterados desde a base de merge em cada lado e sua interseção."""
+    merge_base: str
+    ours: FrozenSet[str]
+    theirs: FrozenSet[str]
+    overlap: Tuple[str, ...]
+    certain: bool              # False: sem base única (histórias sem relação ou criss-cross)
+
+    @property
+    def disjoint(self) -> bool:
+        """Sem interseção: um merge/rebase entre os lados não pode conflitar."""
+        return self.certain and not self.overlap
+
+
+def changed_paths(repo_path: str, since: str, until: str) -> FrozenSet[str]:
+    """Caminhos alterados entre dois commits (`diff --name-only -z`, sem detecção de renomeação)."""
+    records = iter_git_records(repo_path, ["diff", "--name-only", "--no-renames", "-z", since, until], encoding="fs")
+    return frozenset(p for p in records if p)
+
+
+def _parents(paths: FrozenSet[str]) -> set:
+    dirs = set()
+    for path in paths:
+        parts = path.split("/")[:-1]
+        for i in range(1, len(parts) + 1):
+            dirs.add("/".join(parts[:i]))
+    return dirs
+
+
+@lru_cache(maxsize=4096)
+def path_overlap(repo_path: str, ours_sha: str, theirs_sha: str) -> PathOverlap:
+    """
+    Pré-filtro barato de conflitos: interseção dos caminhos alterados desde
+    a base de merge nos dois lados (memorizado pelo par de SHAs).
+
+    Também conta como sobreposição um arquivo de um lado que é diretório no
+    outro (conflito arquivo/diretório).
+    """
+    bases = run_git_command_with_status(repo_path, ["merge-base", "--all", ours_sha, theirs_sha]).stdout.split()
+    if len(bases) != 1:
+        return PathOverlap("", frozenset(), frozenset(), (), False)
+    merge_base = bases[0]
+    ours = changed_paths(repo_path, merge_base, ours_sha)
+    theirs = changed_paths(repo_path, merge_base, theirs_sha)
+    overlap = (ours & theirs) | (ours & _parents(theirs)) | (theirs & _parents(ours))
+    return PathOverlap(merge_base, ours, theirs, tuple(sorted(overlap)), True)
+
+
+def overlapping_paths(repo_path: str, ours: str, theirs: str) -> PathOverlap:
+    """path_overlap() para refs quaisquer (resolve os SHAs antes)."""
+    ours_sha, theirs_sha = _resolve_pair(repo_path, ours, theirs)
+    return path_overlap(str(repo_path), ours_sha, theirs_sha)
+
+
+@lru_cache(maxsize=4096)
+def conflicts_between(repo_path: str, base_sha: str, compare_sha: str) -> Tuple[str, ...]:
+    """Conflitos entre dois commits já resolvidos (memorizado pelo par de SHAs)."""
+    # Lados sem caminhos em comum não conflitam: dispensa o merge-tree
+    if path_overlap(repo_path, compare_sha, base_sha).disjoint:
+        return ()
+    return merge_tree(repo_path, compare_sha, base_sha).conflicts
+
+
+def conflicted_paths(repo_path: str, base: str, compare: str) -> Tuple[str, ...]:
+    """
+    Arquivos que conflitariam ao mesclar `compare` em `base` (vazio = merge limpo).
+
+    As refs são resolvidas para SHAs; como commits são imutáveis, o resultado
+    fica memorizado pelo par (base_sha, compare_sha).
+    """
+    base_sha, compare_sha = _resolve_pair(repo_path, base, compare)
+    return conflicts_between(str(repo_path), base_sha, compare_sha)
+
+
+def commit_tree(repo_path: str, tree: str, parents: List[str], message: str,
+                author: Optional[Tuple[str, str, str]] = None) -> str:
+    """
+    Cria um commit a partir de uma árvore e retorna o SHA.
+
+    author: (nome, email, data) para preservar a autoria original no rebase.
+    """
+    cmd = ["commit-tree", tree]
+    for parent in parents:
+        cmd += ["-p", parent]
+    cmd += ["-m", message]
+    env = None
+    if author:
+        name, email, date = author
+        env = {"GIT_AUTHOR_NAME": name, "GIT_AUTHOR_EMAIL": email, "GIT_AUTHOR_DATE": date}
+    result = run_git_command_with_status(repo_path, cmd, env=env)
+    if result.returncode != 0:
+        raise GitCommandError(result.stderr.strip())
+    return result.stdout.strip()
+
+
+def update_ref(repo_path: str, ref: str, new_sha: str, old_sha: str, reason: str):
+    """Atualiza a ref apenas se ela ainda apontar para old_sha (compare-and-swap)."""
+    run_git_command(repo_path, ["update-ref", "-m", reason, ref, new_sha, old_sha])
+
+
+def _rev(repo_path: str, ref: str) -> str:
+    return run_git_command(repo_path, ["rev-parse", "--verify", f"{ref}^{{commit}}"])
+
+
+def _is_ancestor(repo_path: str, ancestor: str, descendant: str) -> bool:
+    return run_git_command_with_status(repo_path, ["merge-base", "--is-ancestor", ancestor, descendant]).returncode == 0
+
+
+def merge_branch(repo_path: str, branch: str, upstream: str, message: Optional[str] = None) -> SyncResult:
+    """Mescla `upstream` em refs/heads/<branch> sem checkout (fast-forward quando possível)."""
+    if not supports_strategy("merge"):
+        raise MergeEngineUnavailable("merge-tree --write-tree requer git >= 2.38.")
+    ref = f"refs/heads/{branch}"
+    old = _rev(repo_path, ref)
+    up = _rev(repo_path, upstream)
+
+    if _is_ancestor(repo_path, up, old):
+        return SyncResult(branch, "merge", old, old, "up-to-date")
+    if _is_ancestor(repo_path, old, up):
+        update_ref(repo_path, ref, up, old, f"merge {upstream}: Fast-forward")
+        return SyncResult(branch, "merge", old, up, "fast-forward")
+
+    result = merge_tree(repo_path, old, up)
+    if not result.clean:
+        return SyncResult(branch, "merge", old, old, "merge-tree", result.conflicts)
+    new = commit_tree(repo_path, result.tree, [old, up], message or f"Merge branch '{upstream}' into {branch}")
+    update_ref(repo_path, ref, new, old, f"merge {upstream}: Merge made by merge-tree")
+    return SyncResult(branch, "merge", old, new, "merge-tree")
+
+
+def _replay(repo_path: str, branch: str, upstream_sha: str) -> Optional[str]:
+    """Rebase via `git replay`; retorna o novo SHA ou None se houver conflito."""
+    result = run_git_command_with_status(
+        repo_path, ["replay", "--onto", upstream_sha, f"{upstream_sha}..refs/heads/{branch}"]
+    )
+    if result.returncode != 0:
+        return None
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and parts[0] == "update" and parts[1] == f"refs/heads/{branch}":
+            return parts[2]
+    return None
+
+
+def _empty_base(repo_path: str) -> str:
+    """
+    Commit sem pais com a árvore vazia, usado como merge-base ao reaplicar um
+    commit raiz (--merge-base exige um commit até o git 2.45).
+    """
+    tree = run_git_command_with_status(repo_path, ["mktree"], input="")
+    if tree.returncode != 0:
+        raise GitCommandError(tree.stderr.strip())
+    return commit_tree(repo_path, tree.stdout.strip(), [], "base vazia")
+
+
+def _replay_commits(repo_path: str, old: str, up: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Reaplica os commits de `old` que não estão em `up`, um a um, com
+    merge-tree --merge-base. Retorna (novo SHA, conflitos).
+    """
+    # Mesmos commits que o rebase escolheria: sem merges e sem patches já aplicados na base
+    # Lidos em stream: com muitos commits a lista inteira nunca fica em memória
+    records = iter_git_records(repo_path, [
+        "log", "-z", "--reverse", "--no-merges", "--right-only", "--cherry-pick", "--date=raw",
+        "--format=%H%x1f%P%x1f%an%x1f%ae%x1f%ad%x1f%B", f"{up}...{old}",
+    ], encoding="utf-8")
+    current = up
+    current_tree = None
+    for record in records:
+        if not record.strip():
+            continue
+        sha, parents, name, email, date, message = record.split("\x1f", 5)
+        if current_tree is None:
+            current_tree = run_git_command(repo_path, ["rev-parse", f"{up}^{{tree}}"])
+        # Commit raiz: a base é a árvore vazia (todo o conteúdo entra como adição)
+        merge_base = parents.split()[0] if parents.strip() else _empty_base(repo_path)
+        result = merge_tree(repo_path, current, sha, merge_base=merge_base)
+        if not result.clean:
+            logger.debug("Conflito ao reaplicar %s: %s", sha[:8], result.conflicts)
+            records.close()
+            return current, result.conflicts
+        if result.tree == current_tree:
+            # Commit ficou vazio (mudança já presente na base): rebase o descarta
+            continue
+        current = commit_tree(repo_path, result.tree, [current], message.rstrip("\n"), (name, email, date))
+        current_tree = result.tree
+    return current, ()
+
+
+def rebase_branch(repo_path: str, branch: str, upstream: str) -> SyncResult:
+    """Rebaseia refs/heads/<branch> sobre `upstream` sem checkout."""
+    if not supports_strategy("rebase"):
+        raise MergeEngineUnavailable("Rebase sem checkout requer git >= 2.40 (merge-tree --merge-base).")
+    ref = f"refs/heads/{branch}"
+    old = _rev(repo_path, ref)
+    up = _rev(repo_path, upstream)
+
+    if _is_ancestor(repo_path, up, old):
+        return SyncResult(branch, "rebase", old, old, "up-to-date")
+    if _is_ancestor(repo_path, old, up):
+        update_ref(repo_path, ref, up, old, f"rebase (finish): {ref} onto {up}")
+        return SyncResult(branch, "rebase", old, up, "fast-forward")
+
+    method, new = "replay", None
+    if git_version() >= REPLAY_VERSION:
+        new = _replay(repo_path, branch, up)
+    if new is None:
+        # Sem git replay (ou com conflito nele): commit a commit, identificando os arquivos
+        method = "merge-tree-replay"
+        new, conflicts = _replay_commits(repo_path, old, up)
+        if conflicts:
+            return SyncResult(branch, "rebase", old, old, method, conflicts)
+
+    update_ref(repo_path, ref, new, old, f"rebase (finish): {ref} onto {up}")
+    return SyncResult(branch, "rebase", old, new, method)
+
+
+def sync_branch(repo_path: str, branch: str, upstream: str, strategy: str) -> SyncResult:
+    """Aplica `strategy` ("rebase" ou "merge") de `upstream` em `branch` sem checkout."""
+    if strategy == "rebase":
+        return rebase_branch(repo_path, branch, upstream)
+    if strategy == "merge":
+        return merge_branch(repo_path, branch, upstream)
+    raise GitCommandError(f"Strategy inválida: {strategy}. Use 'rebase' ou 'merge'.")
@@ -0,0 +1,215 @@
+"""
+Métricas em processo para comandos Git e chamadas HTTP ao GitHub.
+
+Agrega, por repositório e por subcomando, a quantidade de chamadas, falhas,
+bytes de saída e um histograma de latência (com estimativas de p50/p95/p99).
+Os dados ficam disponíveis via get_metrics() e podem ser exportados no
+formato texto do OpenMetrics (ex.: para o textfile collector do node_exporter).
+"""
+import bisect
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Limites superiores (em segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+
+class LatencyHistogram:
+    """Histograma de buckets fixos; quantis estimados por interpolação linear."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # último bucket = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estima o quantil q (0..1) a partir dos buckets."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if n and cumulative + n >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                if i >= len(LATENCY_BUCKETS):
+                    # Bucket +Inf: sem limite superior, usa o limite inferior
+                    return lower
+                upper = LATENCY_BUCKETS[i]
+                return lower + (upper - lower) * ((rank - cumulative) / n)
+            cumulative += n
+        return LATENCY_BUCKETS[-1]
+
+
+class CommandStats:
+    """Contadores de um (repositório, tipo, comando)."""
+
+    __slots__ = ("calls", "failures", "output_bytes", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.output_bytes = 0
+        self.latency = LatencyHistogram()
+
+
+class MetricsRegistry:
+    """Registro thread-safe de métricas por (repo, kind, command)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str, str], CommandStats] = {}
+
+    def observe(self, kind: str, command: str, repo: str, seconds: float,
+                output_bytes: int = 0, failed: bool = False):
+        """Registra uma execução (kind: 'git' ou 'http')."""
+        key = (str(repo), kind, command)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = CommandStats()
+            stats.calls += 1
+            stats.output_bytes += output_bytes
+            if failed:
+                stats.failures += 1
+            stats.latency.observe(seconds)
+
+    def snapshot(self, repo: Optional[str] = None) -> List[Dict]:
+        """
+        Retorna as métricas agregadas, ordenadas pelo tempo total (maior primeiro).
+
+        Cada item: repo, kind, command, calls, failures, output_bytes,
+        total_seconds, p50, p95, p99.
+        """
+        with self._lock:
+            items = [(k, s) for k, s in self._stats.items() if repo is None or k[0] == str(repo)]
+            rows = [
+                {
+                    "repo": k[0],
+                    "kind": k[1],
+                    "command": k[2],
+                    "calls": s.calls,
+                    "failures": s.failures,
+                    "output_bytes": s.output_bytes,
+                    "total_seconds": s.latency.total,
+                    "p50": s.latency.quantile(0.50),
+                    "p95": s.latency.quantile(0.95),
+                    "p99": s.latency.quantile(0.99),
+                }
+                for k, s in items
+            ]
+        rows.sort(key=lambda r: r["total_seconds"], reverse=True)
+        return rows
+
+    def reset(self):
+        """Zera todas as métricas."""
+        with self._lock:
+            self._stats.clear()
+
+    def to_openmetrics(self) -> str:
+        """Serializa as métricas no formato texto do OpenMetrics."""
+        with self._lock:
+            items = sorted(self._stats.items())
+            lines = []
+
+            def family(name, mtype, help_text):
+                lines.append(f"# TYPE {name} {mtype}")
+                lines.append(f"# HELP {name} {help_text}")
+
+            family("git_automation_command_calls", "counter", "Execucoes por comando.")
+            for key, s in items:
+                lines.append(f"git_automation_command_calls_total{{{_labels(key)}}} {s.calls}")
+            family("git_automation_command_failures", "counter", "Execucoes com falha por comando.")
+            for key, s in items:
+                lines.append(f"git_automation_command_failures_total{{{_labels(key)}}} {s.failures}")
+            family("git_automation_command_output_bytes", "counter", "Bytes de saida por comando.")
+            for key, s in items:
+                lines.append(f"git_automation_command_output_bytes_total{{{_labels(key)}}} {s.output_bytes}")
+            family("git_automation_command_duration_seconds", "histogram", "Latencia por comando.")
+            for key, s in items:
+                labels = _labels(key)
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS, s.latency.counts):
+                    cumulative += n
+                    lines.append(
+                        f'git_automation_command_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'git_automation_command_duration_seconds_bucket{{{labels},le="+Inf"}} {s.latency.count}'
+                )
+                lines.append(f"git_automation_command_duration_seconds_sum{{{labels}}} {s.latency.total}")
+                lines.append(f"git_automation_command_duration_seconds_count{{{labels}}} {s.latency.count}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, path) -> None:
+        """Grava o arquivo OpenMetrics de forma atômica (tmp + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".metrics_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.to_openmetrics())
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: Tuple[str, str, str]) -> str:
+    repo, kind, command = key
+    return f'repo="{_escape(repo)}",kind="{_escape(kind)}",command="{_escape(command)}"'
+
+
+class OpenMetricsExporter(threading.Thread):
+    """Thread em background que grava periodicamente o arquivo OpenMetrics."""
+
+    def __init__(self, path, interval: float = 30.0, registry: Optional[MetricsRegistry] = None):
+        super().__init__(daemon=True, name="openmetrics-exporter")
+        self.path = path
+        self.interval = interval
+        self.registry = registry or get_metrics()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self._write()
+        self._write()
+
+    def _write(self):
+        try:
+            self.registry.write_openmetrics(self.path)
+        except Exception:
+            # Exportação é opcional: nunca derrubar a aplicação
+            pass
+
+    def stop(self):
+        """Solicita a parada (grava uma última vez antes de sair)."""
+        self._stop_event.set()
+
+
+# Instância global de métricas
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Retorna o registro global de métricas."""
+    return _metrics
@@ -0,0 +1,219 @@
+"""
+Prefetch em segundo plano.
+
+Busca periodicamente todas as branches do remoto para um namespace privado
+(refs/prefetch/remotes/<remote>/*), como a tarefa "prefetch" do
+`git maintenance`: as refs de rastreamento do usuário não são alteradas.
+Quando uma operação precisa de origin/<branch>, o FetchPlanner promove a
+ref pré-buscada (somente fast-forward) e, se o prefetch for recente, nem
+chega a ir à rede; caso contrário resta apenas um delta pequeno para baixar.
+"""
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from core.cancellation import CancellationToken, operation_scope
+from core.git_operations import run_git_command, GitCommandError
+from core.logger_config import get_logger
+from utils.worker_thread import get_scheduler, TaskPriority
+
+logger = get_logger()
+
+PREFETCH_NAMESPACE = "refs/prefetch/remotes"
+
+# Intervalo adaptativo (segundos): volta ao mínimo quando o remoto muda e
+# dobra a cada rodada sem mudanças, até o máximo
+MIN_INTERVAL = 60
+MAX_INTERVAL = 900
+
+# Prefetch mais recente que isso dispensa o fetch das operações
+TRUST_WINDOW = 60
+
+_state_lock = threading.Lock()
+_last_prefetch: Dict[Tuple[str, str], float] = {}  # (repo, remote) -> time.monotonic()
+
+
+def _prefix(remote: str) -> str:
+    return f"{PREFETCH_NAMESPACE}/{remote}/"
+
+
+def _list_refs(repo_path: str, *patterns: str) -> Dict[str, str]:
+    """refname -> sha para as refs sob os prefixos informados (um único for-each-ref)."""
+    raw = run_git_command(repo_path, ["for-each-ref", "--format=%(objectname) %(refname)"] + list(patterns))
+    refs = {}
+    for line in raw.splitlines():
+        sha, _, ref = line.partition(" ")
+        if ref:
+            refs[ref] = sha
+    return refs
+
+
+def prefetch(repo_path: str, remote: str = "origin") -> Dict[str, Tuple[str, str]]:
+    """
+    Busca todas as branches do remoto para o namespace privado.
+
+    Returns:
+        branch -> (sha antigo, sha novo) das refs pré-buscadas que mudaram
+        ("" representa ref criada ou removida).
+    """
+    prefix = _prefix(remote)
+    before = _list_refs(repo_path, prefix)
+    # --refmap= desativa a atualização oportunista de refs/remotes/ (como o git maintenance)
+    run_git_command(repo_path, [
+        "fetch", remote, "--prune", "--no-tags", "--no-write-fetch-head", "--refmap=",
+        f"+refs/heads/*:{prefix}*",
+    ])
+    after = _list_refs(repo_path, prefix)
+    with _state_lock:
+        _last_prefetch[(str(repo_path), remote)] = time.monotonic()
+
+    changes = {}
+    for ref in before.keys() | after.keys():
+        old, new = before.get(ref, ""), after.get(ref, "")
+        if old != new:
+            changes[ref[len(prefix):]] = (old, new)
+    return changes
+
+
+def prefetch_age(repo_path: str, remote: str = "origin") -> Optional[float]:
+    """Segundos desde o último prefetch bem-sucedido (None se nunca houve)."""
+    with _state_lock:
+        last = _last_prefetch.get((str(repo_path), remote))
+    return None if last is None else time.monotonic() - last
+
+
+def forget_prefetch(repo_path: str = None):
+    """Descarta o registro de prefetch (de um repositório ou de todos)."""
+    with _state_lock:
+        if repo_path is None:
+            _last_prefetch.clear()
+        else:
+            for key in [k for k in _last_prefetch if k[0] == str(repo_path)]:
+                del _last_prefetch[key]
+
+
+def promote_prefetched(repo_path: str, branches: Iterable[str], remote: str = "origin",
+                       max_age: float = TRUST_WINDOW) -> Tuple[Dict[str, Tuple[str, str]], List[str]]:
+    """
+    Copia refs pré-buscadas para refs/remotes/<remote>/ se o prefetch for recente.
+
+    A ref de rastreamento só avança (fast-forward); se ela estiver à frente ou
+    divergente (ex.: push feito depois do prefetch), a branch fica de fora
+    e deve ser buscada normalmente.
+
+    Returns:
+        (promovidas, ausentes): promovidas é branch -> (sha antigo, sha novo);
+        ausentes são branches que não existiam no remoto no momento do prefetch.
+        Sem prefetch recente retorna ({}, []) sem executar nenhum comando.
+    """
+    branches = list(branches)
+    age = prefetch_age(repo_path, remote)
+    if age is None or age > max_age or not branches:
+        return {}, []
+
+    prefix = _prefix(remote)
+    tracking_prefix = f"refs/remotes/{remote}/"
+    try:
+        refs = _list_refs(repo_path, prefix, tracking_prefix)
+    except GitCommandError:
+        return {}, []
+
+    promoted, absent = {}, []
+    for branch in branches:
+        tracking_ref = tracking_prefix + branch
+        new = refs.get(prefix + branch)
+        old = refs.get(tracking_ref, "")
+        if new is None:
+            if not old:
+                absent.append(branch)
+            continue
+        if old and old != new:
+            try:
+                run_git_command(repo_path, ["merge-base", "--is-ancestor", old, new])
+            except GitCommandError:
+                # Ref local à frente ou divergente: deixa para o fetch real
+                continue
+        if old != new:
+            try:
+                run_git_command(repo_path, ["update-ref", "-m", "prefetch: promote", tracking_ref, new, old])
+            except GitCommandError:
+                # Ref alterada por outro processo neste meio tempo
+                continue
+        promoted[branch] = (old, new)
+
+    if promoted or absent:
+        logger.debug("Prefetch (%.0fs atrás) aproveitado: %s; ausentes: %s", age, list(promoted), absent)
+    return promoted, absent
+
+
+class Prefetcher:
+    """
+    Prefetch periódico de um repositório, em prioridade de manutenção.
+
+    Uso:
+        prefetcher = Prefetcher(repo)
+        prefetcher.start()
+        ...
+        prefetcher.stop()
+    """
+
+    def __init__(self, repo_path: str, remote: str = "origin",
+                 min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL):
+        self.repo_path = repo_path
+        self.remote = remote
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._token = CancellationToken()
+        self._stop_event = threading.Event()
+        self._future = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Inicia o laço em background (primeira rodada imediata)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True, name=f"prefetch-{self.remote}")
+            self._thread.start()
+
+    def stop(self):
+        """Interrompe o laço e encerra um fetch em andamento."""
+        self._stop_event.set()
+        future = self._future
+        if future is not None:
+            future.cancel()
+        self._token.cancel()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            if self._stop_event.wait(self.interval):
+                break
+
+    def _prefetch(self) -> Dict[str, Tuple[str, str]]:
+        with operation_scope(self._token):
+            return prefetch(self.repo_path, self.remote)
+
+    def run_once(self) -> Dict[str, Tuple[str, str]]:
+        """Executa um prefetch no scheduler e ajusta o intervalo."""
+        self._future = get_scheduler().submit(
+            self._prefetch, repo=self.repo_path, mutating=False, priority=TaskPriority.MAINTENANCE
+        )
+        try:
+            changes = self._future.result()
+        except Exception as e:
+            if not self._stop_event.is_set():
+                logger.debug("Prefetch de %s falhou: %s", self.repo_path, e)
+            # Rede indisponível também conta como "sem mudanças": recua
+            changes = {}
+        finally:
+            self._future = None
+
+        if changes:
+            self.interval = self.min_interval
+            logger.debug("Prefetch de %s: %d ref(s) alteradas", self.repo_path, len(changes))
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        return changes
@@ -0,0 +1,341 @@
+"""
+Push de várias branches num único `git push --porcelain`, com o resultado
+interpretado por ref (uma rejeição não esconde o sucesso das demais).
+
+Operações que atualizam várias branches (ex.: atualização em massa) reúnem
+os pushes num PushBatch, enviado num único push ao final, repetindo apenas as
+refs rejeitadas por falhas transitórias.
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from core.git_operations import (
+    run_git_command_with_status, GitCommandCancelled, GitCommandError, GitCommandTimeout,
+)
+from core.logger_config import get_logger
+
+logger = get_logger()
+
+# Orçamento de caracteres de refs por chamada (linha de comando segura também no Windows, ~32k)
+MAX_ARGS_CHARS = 30000
+
+# Flags da saída --porcelain do git push
+PUSH_FLAGS = {
+    " ": "fast-forward",
+    "+": "forçado",
+    "-": "removida",
+    "*": "nova",
+    "!": "rejeitada",
+    "=": "em dia",
+}
+
+
+class PushRefResult(NamedTuple):
+    """Resultado de uma ref no `git push --porcelain`."""
+    flag: str          # ' ', '+', '-', '*', '!' ou '='
+    source: str        # ref local (vazio em remoções)
+    destination: str   # ref remota (ex.: refs/heads/feature/x)
+    summary: str       # ex.: "abc123..def456", "[rejected]", "[up to date]"
+    reason: str        # motivo entre parênteses (ex.: "stale info"), se houver
+
+    @property
+    def ok(self) -> bool:
+        return self.flag != "!"
+
+    @property
+    def branch(self) -> str:
+        return self.destination[len("refs/heads/"):] if self.destination.startswith("refs/heads/") else self.destination
+
+    @property
+    def description(self) -> str:
+        text = PUSH_FLAGS.get(self.flag, self.summary)
+        return f"{text} ({self.reason})" if self.reason else text
+
+
+def parse_push_porcelain(output: str) -> List[PushRefResult]:
+    """
+    Interpreta a saída de `git push --porcelain`.
+
+    Formato de cada linha de ref: "<flag>\\t<origem>:<destino>\\t<resumo> (<motivo>)";
+    as linhas "To <url>" e "Done" são ignoradas.
+    """
+    results = []
+    for line in output.splitlines():
+        if len(line) < 2 or line[1] != "\t":
+            continue
+        parts = line.split("\t")
+        if len(parts) < 3:
+            continue
+        flag, refs, summary = parts[0], parts[1], parts[2]
+        source, _, destination = refs.partition(":")
+        reason = ""
+        if summary.endswith(")") and " (" in summary:
+            summary, _, reason = summary[:-1].partition(" (")
+        results.append(PushRefResult(flag, source, destination, summary, reason))
+    return results
+
+
+def chunk_args(args: Iterable[str], budget: Optional[int] = None,
+               size: Callable[[str], int] = len) -> Iterable[List[str]]:
+    """
+    Divide argumentos em blocos cuja soma de tamanhos cabe em `budget` (padrão MAX_ARGS_CHARS).
+
+    size: tamanho de cada item na linha de comando (padrão: o próprio texto);
+        permite agrupar itens que viram mais de um argumento.
+    """
+    budget = budget or MAX_ARGS_CHARS
+    chunk, total = [], 0
+    for arg in args:
+        n = size(arg) + 1
+        if chunk and total + n > budget:
+            yield chunk
+            chunk, total = [], 0
+        chunk.append(arg)
+        total += n
+    if chunk:
+        yield chunk
+
+
+def _lease_args(branches: Iterable[str], expected: Dict[str, str]) -> List[str]:
+    return [f"--force-with-lease=refs/heads/{b}:{expected[b]}" for b in branches if b in expected]
+
+
+def chunk_branches(branches: Iterable[str], refspec: str,
+                   expected: Dict[str, str]) -> Iterable[List[str]]:
+    """
+    Blocos de branches para pushes multi-refspec: cada branch conta o seu
+    refspec (`refspec.format(b=branch)`) e o --force-with-lease, quando houver.
+    """
+    def size(branch: str) -> int:
+        lease = sum(len(a) + 1 for a in _lease_args([branch], expected))
+        return len(refspec.format(b=branch)) + lease
+    return chunk_args(branches, size=size)
+
+
+def push_branches(repo_path: str, branches: Iterable[str], remote: str = "origin",
+                  expected: Optional[Dict[str, str]] = None, atomic: bool = False,
+                  set_upstream: bool = False, dry_run: bool = False) -> List[PushRefResult]:
+    """
+    Envia várias branches num único push (em blocos, se a linha de comando
+    não couber em MAX_ARGS_CHARS) e retorna o resultado por ref.
+
+    Args:
+        branches: branches locais a enviar (mesmo nome no remoto)
+        expected: branch -> SHA esperado no remoto para --force-with-lease
+            ("" exige que a branch ainda não exista); branches ausentes do
+            dicionário são enviadas sem force
+        atomic: tudo ou nada (--atomic)
+        set_upstream: configura o rastreamento (-u)
+        dry_run: apenas simula (--dry-run)
+
+    Raises:
+        GitCommandError: se o primeiro bloco falhar sem relatar nenhuma ref (rede,
+            remoto inválido); nos blocos seguintes a falha vira refs rejeitadas.
+    """
+    branches = list(dict.fromkeys(branches))
+    if not branches:
+        return []
+    expected = expected or {}
+    chunks = list(chunk_branches(branches, "refs/heads/{b}:refs/heads/{b}", expected))
+    if atomic and len(chunks) > 1:
+        logger.warning("Push em %d blocos: --atomic vale dentro de cada bloco.", len(chunks))
+    refs: List[PushRefResult] = []
+    for names in chunks:
+        cmd = ["push", "--porcelain"]
+        if atomic:
+            cmd.append("--atomic")
+        if set_upstream:
+            cmd.append("-u")
+        if dry_run:
+            cmd.append("--dry-run")
+        cmd += _lease_args(names, expected)
+        cmd.append(remote)
+        cmd += [f"refs/heads/{b}:refs/heads/{b}" for b in names]
+
+        result = run_git_command_with_status(repo_path, cmd)
+        chunk_refs = parse_push_porcelain(result.stdout)
+        if result.returncode != 0 and not chunk_refs:
+            if not refs:
+                raise GitCommandError(result.stderr.strip())
+            # Blocos anteriores já foram enviados: este vira refs rejeitadas
+            reason = (result.stderr.strip().splitlines() or ["falha no push"])[-1]
+            chunk_refs = [PushRefResult("!", f"refs/heads/{b}", f"refs/heads/{b}", "[rejected]", reason)
+                          for b in names]
+        refs += chunk_refs
+
+    rejected = [r for r in refs if not r.ok]
+    if rejected:
+        logger.warning("Push: %d de %d ref(s) rejeitadas: %s", len(rejected), len(refs),
+                       ", ".join(f"{r.branch} ({r.reason or r.summary})" for r in rejected))
+    else:
+        logger.debug("Push de %d ref(s) concluído em %d bloco(s)", len(refs), len(chunks))
+    return refs
+
+
+def delete_remote_branches(repo_path: str, branches: Iterable[str], remote: str = "origin",
+                           expected: Optional[Dict[str, str]] = None, atomic: bool = False,
+                           dry_run: bool = False) -> List[PushRefResult]:
+    """
+    Remove várias branches do remoto com pushes multi-refspec
+    (`git push --porcelain <remote> :refs/heads/a :refs/heads/b ...`), em blocos.
+
+    Args:
+        branches: branches remotas (nome curto)
+        expected: branch -> SHA esperado no remoto (--force-with-lease); evita
+            apagar uma branch que alguém atualizou depois do último fetch
+        atomic: tudo ou nada por bloco (--atomic); com muitas branches há mais
+            de um bloco e a atomicidade vale dentro de cada um
+        dry_run: apenas planeja (--dry-run), sem alterar o remoto
+
+    Returns:
+        Resultado por ref, de todos os blocos. Em falha sem refs relatadas
+        (rede, remoto inválido) o bloco vira refs rejeitadas com o erro como motivo.
+    """
+    branches = list(dict.fromkeys(branches))
+    expected = expected or {}
+    results: List[PushRefResult] = []
+    chunks = list(chunk_branches(branches, ":refs/heads/{b}", expected))
+    if atomic and len(chunks) > 1:
+        logger.warning("Deleção remota em %d blocos: --atomic vale dentro de cada bloco.", len(chunks))
+    for names in chunks:
+        cmd = ["push", "--porcelain"]
+        if atomic:
+            cmd.append("--atomic")
+        if dry_run:
+            cmd.append("--dry-run")
+        cmd += _lease_args(names, expected)
+        cmd.append(remote)
+        cmd += [f":refs/heads/{b}" for b in names]
+
+        result = run_git_command_with_status(repo_path, cmd)
+        refs = parse_push_porcelain(result.stdout)
+        if result.returncode != 0 and not refs:
+            reason = (result.stderr.strip().splitlines() or ["falha no push"])[-1]
+            refs = [PushRefResult("!", "", f"refs/heads/{b}", "[rejected]", reason) for b in names]
+        results += refs
+
+    rejected = [r for r in results if not r.ok]
+    action = "planejada(s)" if dry_run else "removida(s)"
+    logger.info("Deleção remota: %d ref(s) %s, %d rejeitada(s) em %d push(es).",
+                len(results) - len(rejected), action, len(rejected), len(chunks))
+    return results
+
+
+# Motivos de rejeição que costumam passar numa nova tentativa (trava no servidor, rede)
+_TRANSIENT_MARKERS = ("lock", "timed out", "timeout", "temporar", "try again", "hung up",
+                      "connection", "could not read from remote")
+
+# Falhas sem refs relatadas que indicam problema de rede (e não de autenticação ou do remoto)
+_NETWORK_MARKERS = ("could not resolve host", "unable to access", "connection", "timed out",
+                    "hung up", "early eof", "network", "temporar", "try again")
+_AUTH_MARKERS = ("permission denied", "authentication failed", "returned error: 401",
+                 "returned error: 403")
+
+def is_transient(ref: PushRefResult) -> bool:
+    """Rejeição que vale repetir (não inclui lease desatualizado nem non-fast-forward)."""
+    text = f"{ref.summary} {ref.reason}".lower()
+    return not ref.ok and any(marker in text for marker in _TRANSIENT_MARKERS)
+
+
+def is_network_error(error: GitCommandError) -> bool:
+    """Falha de conexão com o remoto (vale repetir); autenticação e hooks não entram."""
+    text = str(error).lower()
+    if any(marker in text for marker in _AUTH_MARKERS):
+        return False
+    return any(marker in text for marker in _NETWORK_MARKERS)
+
+
+class PushBatch:
+    """
+    Acumula atualizações de refs e as envia num único `git push --porcelain`.
+
+    Uso:
+        batch = PushBatch(repo)
+        batch.add("feature/a", expected="<sha remoto>")   # --force-with-lease
+        batch.add("feature/b")                            # push normal (fast-forward)
+        batch.add("feature/nova", expected="", set_upstream=True)
+        refs = batch.flush()
+    """
+
+    def __init__(self, repo_path: str, remote: str = "origin", atomic: bool = False,
+                 retries: int = 2, retry_delay: float = 1.0):
+        self.repo_path = repo_path
+        self.remote = remote
+        self.atomic = atomic
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.results: List[PushRefResult] = []
+        self._lock = threading.Lock()
+        self._expected: Dict[str, Optional[str]] = {}
+        self._upstream: set = set()
+
+    @property
+    def pending(self) -> List[str]:
+        with self._lock:
+            return list(self._expected)
+
+    def add(self, branch: str, expected: Optional[str] = None, set_upstream: bool = False) -> "PushBatch":
+        """
+        Enfileira a branch (a última chamada para a mesma branch prevalece).
+
+        expected: SHA esperado no remoto para --force-with-lease ("" exige que a
+            branch não exista); None envia sem force.
+        """
+        with self._lock:
+            self._expected.pop(branch, None)
+            self._expected[branch] = expected
+            if set_upstream:
+                self._upstream.add(branch)
+        return self
+
+    def _push(self, branches: List[str], expected: Dict[str, str]) -> List[PushRefResult]:
+        try:
+            return push_branches(self.repo_path, branches, self.remote, expected=expected, atomic=self.atomic)
+        except (GitCommandCancelled, GitCommandTimeout):
+            raise
+        except GitCommandError as e:
+            # Sem refs relatadas: só falhas de rede viram rejeições transitórias (repetidas);
+            # autenticação, hooks e remoto inválido sobem como erro
+            if not is_network_error(e):
+                raise
+            reason = f"connection failed: {(str(e).strip().splitlines() or [''])[-1]}"
+            return [PushRefResult("!", f"refs/heads/{b}", f"refs/heads/{b}", "[rejected]", reason) for b in branches]
+
+    def flush(self) -> List[PushRefResult]:
+        """
+        Envia o lote; refs com rejeição transitória são repetidas (só elas).
+
+        Raises:
+            GitCommandError: falha sem refs relatadas que não é de rede
+                (autenticação, remoto inválido), cancelamento ou tempo esgotado.
+        """
+        with self._lock:
+            expected_all = dict(self._expected)
+            upstream = set(self._upstream)
+            self._expected.clear()
+            self._upstream.clear()
+        order = list(expected_all)
+        if not order:
+            return []
+        expected = {b: sha for b, sha in expected_all.items() if sha is not None}
+
+        results: Dict[str, PushRefResult] = {}
+        todo = order
+        for attempt in range(self.retries + 1):
+            if attempt:
+                logger.info("Repetindo push de %d ref(s) rejeitada(s): %s", len(todo), ", ".join(todo))
+                time.sleep(self.retry_delay * attempt)
+            for ref in self._push(todo, {b: expected[b] for b in todo if b in expected}):
+                results[ref.branch] = ref
+            # Com --atomic as demais refs caem junto: repetir só faria sentido para o lote todo
+            todo = [b for b in todo if b in results and is_transient(results[b])]
+            if not todo or self.atomic:
+                break
+
+        for branch in upstream:
+            if branch in results and results[branch].ok:
+                run_git_command_with_status(self.repo_path, [
+                    "branch", f"--set-upstream-to={self.remote}/{branch}", branch,
+                ])
+        self.results = [results[b] for b in order if b in results]
+        return self.results
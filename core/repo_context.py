@@ -0,0 +1,146 @@
+"""
+Sessão de um repositório: caminhos resolvidos uma única vez e um cache
+próprio. Topologia, prefetch e pool de worktrees continuam nos registros
+globais de cada módulo (por caminho); `close()` apenas libera as entradas
+deste repositório neles.
+
+Os serviços continuam recebendo `repo_path`; um RepoContext pode ser passado
+no lugar do caminho (implementa `__fspath__`/`__str__`), e os módulos que
+conhecem o contexto aproveitam o que já foi resolvido.
+
+Uso:
+    repo = get_repo_context("/caminho/do/repo")
+    update_branch(repo, "feature/x")
+    release_repo_context(repo)      # ao trocar de repositório
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from core.cache import SimpleCache
+from core.dirty_check import invalidate_dirty
+from core.git_operations import run_git_command, GitCommandError
+from core.logger_config import get_logger
+from core.metrics import get_metrics
+from core.prefetch import forget_prefetch
+from core.topology import invalidate_topology
+from core.worktree_pool import close_worktree_pool
+from utils.repo_utils import RepoInfo, read_repo_info
+
+logger = get_logger()
+
+
+class RepoContext:
+    """
+    Repositório aberto na sessão.
+
+    Guarda só o que foi resolvido (caminhos, remotos, config) e o cache; não
+    mantém locks nem processos auxiliares.
+
+    Atributos:
+        root: raiz do worktree (também é o valor de `os.fspath(ctx)`)
+        git_dir: diretório git deste worktree
+        common_dir: diretório git comum (refs, objetos, config)
+        cache: cache próprio (usado por core.cache.cached e pelo FetchPlanner)
+    """
+
+    def __init__(self, root: str, git_dir: str, common_dir: str):
+        self.root = root
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self.cache = SimpleCache()
+        self.closed = False
+        self._remotes: Optional[Tuple[str, ...]] = None
+        self._repo_info: Optional[RepoInfo] = None
+
+    @classmethod
+    def open(cls, path: str) -> "RepoContext":
+        """Resolve raiz, git dir e common dir num único `git rev-parse`."""
+        raw = run_git_command(str(path), [
+            "rev-parse", "--path-format=absolute", "--show-toplevel", "--git-dir", "--git-common-dir",
+        ])
+        lines = raw.splitlines()
+        if len(lines) != 3:
+            raise GitCommandError(f"'{path}' não é um worktree Git válido.")
+        return cls(*(os.path.normpath(line) for line in lines))
+
+    def __fspath__(self) -> str:
+        return self.root
+
+    def __str__(self) -> str:
+        return self.root
+
+    def __repr__(self) -> str:
+        return f"RepoContext({self.root!r})"
+
+    @property
+    def remotes(self) -> Tuple[str, ...]:
+        """Remotos configurados (lidos uma vez)."""
+        if self._remotes is None:
+            self._remotes = tuple(r for r in run_git_command(self.root, ["remote"]).splitlines() if r)
+        return self._remotes
+
+    @property
+    def repo_info(self) -> RepoInfo:
+        """user/repo do GitHub a partir do config (lido uma vez)."""
+        if self._repo_info is None:
+            self._repo_info = read_repo_info(os.path.join(self.common_dir, "config"))
+        return self._repo_info
+
+    def metrics(self) -> List[Dict]:
+        """Métricas dos comandos executados neste repositório."""
+        return get_metrics().snapshot(repo=self.root)
+
+    def refresh(self):
+        """Descarta o que foi lido do repositório (remotos, config, caches)."""
+        self._remotes = None
+        self._repo_info = None
+        self.cache.clear()
+        invalidate_topology(self.root)
+        invalidate_dirty(self.root)
+
+    def close(self):
+        """Descarta o cache e libera as entradas do repositório nos registros globais (topologia, prefetch, pool)."""
+        if self.closed:
+            return
+        self.closed = True
+        self.refresh()
+        forget_prefetch(self.root)
+        close_worktree_pool(self.root)
+        logger.debug("Contexto de '%s' encerrado", self.root)
+
+
+_contexts: Dict[str, RepoContext] = {}
+_contexts_lock = threading.Lock()
+
+
+def get_repo_context(repo) -> RepoContext:
+    """Retorna o contexto do repositório (um por raiz, reutilizado na sessão)."""
+    if isinstance(repo, RepoContext) and not repo.closed:
+        return repo
+    key = os.path.abspath(os.fspath(repo))
+    with _contexts_lock:
+        ctx = _contexts.get(key)
+        if ctx is not None and not ctx.closed:
+            return ctx
+    ctx = RepoContext.open(key)
+    with _contexts_lock:
+        # Outra thread pode ter aberto o mesmo repositório nesse meio tempo
+        existing = _contexts.get(ctx.root)
+        if existing is not None and not existing.closed:
+            return existing
+        _contexts[ctx.root] = ctx
+        if key != ctx.root:
+            _contexts[key] = ctx
+    return ctx
+
+
+def release_repo_context(repo):
+    """Encerra e esquece o contexto do repositório (ex.: ao trocar de repositório)."""
+    key = os.path.abspath(os.fspath(repo))
+    with _contexts_lock:
+        ctx = repo if isinstance(repo, RepoContext) else _contexts.get(key)
+        if ctx is None:
+            return
+        for k in [k for k, v in _contexts.items() if v is ctx]:
+            del _contexts[k]
+    ctx.close()
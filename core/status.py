@@ -0,0 +1,216 @@
+"""
+Status estruturado do worktree a partir de `git status --porcelain=v2 -z --branch`.
+
+A saída é lida do pipe em blocos e processada registro a registro (separados
+por NUL): a saída completa nunca é montada numa string, e cada entrada é um
+objeto com `__slots__`. Repositórios com 100 mil arquivos alterados podem ser
+resumidos em memória constante (`summarize_status`).
+
+Caminhos são decodificados com `os.fsdecode` (nomes que não são UTF-8 são
+preservados via surrogateescape).
+"""
+import os
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+from core.git_operations import split_records, stream_git_command
+from core.logger_config import get_logger
+
+logger = get_logger()
+
+
+class StatusEntry:
+    """Entrada da saída v2; `xy` é o par índice/worktree ('.' = sem alteração)."""
+    __slots__ = ("xy", "path")
+    kind = ""
+
+    def __init__(self, xy: str, path: str):
+        self.xy = xy
+        self.path = path
+
+    @property
+    def staged(self) -> bool:
+        return self.xy[0] not in ".?!"
+
+    @property
+    def unstaged(self) -> bool:
+        return self.xy[1] not in ".?!"
+
+    @property
+    def display(self) -> str:
+        """Linha para exibição: 'XY caminho'."""
+        return f"{self.xy} {self.path}"
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.xy!r}, {self.path!r})"
+
+
+class OrdinaryEntry(StatusEntry):
+    """Arquivo rastreado alterado ('1 ...')."""
+    __slots__ = ()
+    kind = "ordinary"
+
+
+class RenamedEntry(StatusEntry):
+    """Arquivo renomeado ou copiado ('2 ...'); `score` é ex.: 'R100' ou 'C75'."""
+    __slots__ = ("orig_path", "score")
+    kind = "renamed"
+
+    def __init__(self, xy: str, path: str, orig_path: str, score: str):
+        super().__init__(xy, path)
+        self.orig_path = orig_path
+        self.score = score
+
+    @property
+    def display(self) -> str:
+        return f"{self.xy} {self.orig_path} -> {self.path}"
+
+    def __repr__(self) -> str:
+        return f"RenamedEntry({self.xy!r}, {self.orig_path!r} -> {self.path!r})"
+
+
+class UnmergedEntry(StatusEntry):
+    """Arquivo em conflito ('u ...')."""
+    __slots__ = ()
+    kind = "unmerged"
+
+
+class UntrackedEntry(StatusEntry):
+    """Arquivo não rastreado ('? ...')."""
+    __slots__ = ()
+    kind = "untracked"
+
+    def __init__(self, path: str):
+        super().__init__("??", path)
+
+
+class BranchInfo:
+    """Cabeçalhos '# branch.*' (presentes com --branch)."""
+    __slots__ = ("oid", "head", "upstream", "ahead", "behind")
+
+    def __init__(self):
+        self.oid = ""           # "" quando ainda não há commits
+        self.head = ""          # "" quando o HEAD está destacado
+        self.upstream = ""
+        self.ahead = 0
+        self.behind = 0
+
+    def __repr__(self) -> str:
+        return f"BranchInfo(head={self.head!r}, upstream={self.upstream!r}, +{self.ahead}/-{self.behind})"
+
+
+StatusRecord = Union[StatusEntry, BranchInfo]
+
+
+def parse_status_v2(chunks: Iterable[bytes]) -> Iterator[StatusRecord]:
+    """
+    Interpreta a saída de `git status --porcelain=v2 -z [--branch]`.
+
+    Args:
+        chunks: blocos de bytes na ordem em que saem do git (podem cortar
+            registros ao meio)
+
+    Yields:
+        BranchInfo (uma vez, após os cabeçalhos, se houver) e as entradas
+        OrdinaryEntry / RenamedEntry / UnmergedEntry / UntrackedEntry.
+        Entradas ignoradas ('!') são descartadas.
+    """
+    records = split_records(chunks)
+    branch = None
+    for record in records:
+        tag = record[:1]
+        if tag == b"#":
+            branch = branch or BranchInfo()
+            # "# branch.<chave> <valor>"
+            _, key, value = (record.decode("utf-8", errors="replace").split(" ", 2) + [""])[:3]
+            if key == "branch.oid":
+                branch.oid = "" if value == "(initial)" else value
+            elif key == "branch.head":
+                branch.head = "" if value == "(detached)" else value
+            elif key == "branch.upstream":
+                branch.upstream = value
+            elif key == "branch.ab":
+                ahead, _, behind = value.partition(" ")
+                branch.ahead, branch.behind = abs(int(ahead or 0)), abs(int(behind or 0))
+            continue
+        if branch is not None:
+            yield branch
+            branch = None
+        if tag == b"1":
+            # 1 XY sub mH mI mW hH hI path
+            parts = record.split(b" ", 8)
+            yield OrdinaryEntry(parts[1].decode("ascii"), os.fsdecode(parts[8]))
+        elif tag == b"2":
+            # 2 XY sub mH mI mW hH hI Xscore path NUL origPath
+            parts = record.split(b" ", 9)
+            orig = next(records, b"")
+            yield RenamedEntry(parts[1].decode("ascii"), os.fsdecode(parts[9]), os.fsdecode(orig),
+                               parts[8].decode("ascii"))
+        elif tag == b"u":
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path
+            parts = record.split(b" ", 10)
+            yield UnmergedEntry(parts[1].decode("ascii"), os.fsdecode(parts[10]))
+        elif tag == b"?":
+            yield UntrackedEntry(os.fsdecode(record[2:]))
+    if branch is not None:
+        yield branch
+
+
+def iter_status(repo_path, untracked: str = "normal") -> Iterator[StatusRecord]:
+    """
+    Entradas do status do worktree, produzidas enquanto o git ainda escreve.
+
+    Args:
+        untracked: modo de --untracked-files ("no", "normal" ou "all")
+
+    Raises:
+        GitCommandError: se o git status falhar.
+    """
+    return parse_status_v2(stream_git_command(str(repo_path), [
+        "status", "--porcelain=v2", "-z", "--branch", f"--untracked-files={untracked}",
+    ]))
+
+
+class StatusSummary(NamedTuple):
+    """Contagens do status; `sample` guarda as primeiras entradas (para mensagens)."""
+    branch: Optional[BranchInfo]
+    changed: int        # rastreados com alguma alteração (índice e/ou worktree)
+    staged: int
+    unstaged: int
+    untracked: int
+    conflicted: int
+    sample: Tuple[StatusEntry, ...]
+    conflicts: Tuple[str, ...]
+
+    @property
+    def clean(self) -> bool:
+        return not (self.changed or self.untracked or self.conflicted)
+
+    def describe(self) -> str:
+        """Linhas das primeiras entradas, com '...' quando há mais."""
+        total = self.changed + self.untracked + self.conflicted
+        lines = [entry.display for entry in self.sample]
+        if total > len(lines):
+            lines.append(f"... e mais {total - len(lines)} arquivo(s)")
+        return "\n".join(lines)
+
+
+def summarize_status(repo_path, sample: int = 10, untracked: str = "normal") -> StatusSummary:
+    """Resume o status num único passe pela saída (memória constante)."""
+    branch, kept, conflicts = None, [], []
+    changed = staged = unstaged = n_untracked = conflicted = 0
+    for record in iter_status(repo_path, untracked):
+        if isinstance(record, BranchInfo):
+            branch = record
+            continue
+        if isinstance(record, UnmergedEntry):
+            conflicted += 1
+            if len(conflicts) < sample:
+                conflicts.append(record.path)
+        elif isinstance(record, UntrackedEntry):
+            n_untracked += 1
+        else:
+            changed += 1
+            staged += record.staged
+            unstaged += record.unstaged
+        if len(kept) < sample:
+            kept.append(record)
+    return StatusSummary(branch, changed, staged, unstaged, n_untracked, conflicted, tuple(kept), tuple(conflicts))
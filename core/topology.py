@@ -0,0 +1,152 @@
+"""
+Topologia do repositório: branch padrão do remoto, branch base e branches
+protegidas, calculadas a partir de um único `git for-each-ref`.
+
+O resultado fica em cache até as refs mudarem: a impressão digital é o mtime
+dos diretórios de refs/heads e refs/remotes e do packed-refs (toda criação,
+remoção ou atualização de ref passa por um rename nesses diretórios).
+"""
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from core.git_operations import run_git_command
+from core.logger_config import get_logger
+from utils.settings import get_protected_branches
+
+logger = get_logger()
+
+# Ordem de preferência de cada detecção
+DEFAULT_BRANCH_CANDIDATES = ("main", "master", "develop", "production")
+BASE_BRANCH_CANDIDATES = ("develop", "main", "master")
+CREATION_BASE_CANDIDATES = ("main", "master")
+FALLBACK_BRANCH = "main"
+
+
+class RepoTopology(NamedTuple):
+    """Branches relevantes do repositório (nomes curtos, sem 'origin/')."""
+    default_branch: str                 # HEAD do remoto (ou a mais provável)
+    base_branch: str                    # base de sincronização: develop > main > master
+    creation_base: str                  # base para novas branches: main > master > base_branch
+    protected: Tuple[str, ...]          # configuradas pelo usuário + default_branch
+    local_branches: Tuple[str, ...]
+    remote_branches: Tuple[str, ...]
+
+
+class _Snapshot(NamedTuple):
+    remote_head: str
+    local_branches: Tuple[str, ...]
+    remote_branches: Tuple[str, ...]
+
+
+_cache: Dict[Tuple[str, str], Tuple[tuple, _Snapshot]] = {}
+_lock = threading.Lock()
+
+
+def _common_dir(repo_path: str) -> Optional[str]:
+    """Diretório git comum (onde ficam as refs), inclusive para worktrees vinculados."""
+    dot_git = os.path.join(repo_path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    if not os.path.isfile(dot_git):
+        return None
+    try:
+        with open(dot_git, encoding="utf-8") as f:
+            content = f.read().strip()
+        if not content.startswith("gitdir:"):
+            return None
+        git_dir = os.path.join(repo_path, content[len("gitdir:"):].strip())
+        commondir = os.path.join(git_dir, "commondir")
+        if os.path.isfile(commondir):
+            with open(commondir, encoding="utf-8") as f:
+                git_dir = os.path.join(git_dir, f.read().strip())
+        return os.path.normpath(git_dir)
+    except OSError:
+        return None
+
+
+def _refs_fingerprint(repo_path) -> Optional[tuple]:
+    """mtimes das refs; None quando não é possível calcular (sem cache)."""
+    # RepoContext já traz o diretório comum resolvido
+    common = getattr(repo_path, "common_dir", None) or _common_dir(str(repo_path))
+    if not common:
+        return None
+    stamps = []
+    packed = os.path.join(common, "packed-refs")
+    try:
+        st = os.stat(packed)
+        stamps.append((packed, st.st_mtime_ns, st.st_size))
+    except OSError:
+        stamps.append((packed, 0, 0))
+    for sub in ("heads", "remotes"):
+        for dirpath, _, _ in os.walk(os.path.join(common, "refs", sub)):
+            try:
+                stamps.append((dirpath, os.stat(dirpath).st_mtime_ns))
+            except OSError:
+                continue
+    return tuple(stamps)
+
+
+def _take_snapshot(repo_path: str, remote: str) -> _Snapshot:
+    """Branches locais, remotas e HEAD do remoto num único for-each-ref."""
+    remote_prefix = f"refs/remotes/{remote}/"
+    raw = run_git_command(repo_path, [
+        "for-each-ref", "--format=%(refname) %(symref)", "refs/heads", remote_prefix.rstrip("/"),
+    ])
+    head, local, remote_branches = "", [], []
+    for line in raw.splitlines():
+        ref, _, symref = line.partition(" ")
+        if ref.startswith("refs/heads/"):
+            local.append(ref[len("refs/heads/"):])
+        elif ref == f"{remote_prefix}HEAD":
+            head = symref[len(remote_prefix):] if symref.startswith(remote_prefix) else ""
+        elif ref.startswith(remote_prefix):
+            remote_branches.append(ref[len(remote_prefix):])
+    return _Snapshot(head, tuple(local), tuple(remote_branches))
+
+
+def _first(candidates: Tuple[str, ...], available: List[str]) -> str:
+    return next((name for name in candidates if name in available), "")
+
+
+def _build(snapshot: _Snapshot) -> RepoTopology:
+    remotes = list(snapshot.remote_branches)
+    fallback = remotes[0] if remotes else FALLBACK_BRANCH
+    default = snapshot.remote_head or _first(DEFAULT_BRANCH_CANDIDATES, remotes) or fallback
+    base = _first(BASE_BRANCH_CANDIDATES, remotes) or FALLBACK_BRANCH
+    creation = _first(CREATION_BASE_CANDIDATES, remotes) or base
+    protected = tuple(dict.fromkeys(list(get_protected_branches()) + [default]))
+    return RepoTopology(default, base, creation, protected, snapshot.local_branches, snapshot.remote_branches)
+
+
+def get_repo_topology(repo_path: str, remote: str = "origin") -> RepoTopology:
+    """
+    Retorna a topologia do repositório, recalculando só quando as refs mudam.
+
+    Raises:
+        GitCommandError: se o for-each-ref falhar.
+    """
+    key = (os.path.abspath(str(repo_path)), remote)
+    fingerprint = _refs_fingerprint(repo_path)
+    with _lock:
+        entry = _cache.get(key)
+    if fingerprint is not None and entry and entry[0] == fingerprint:
+        return _build(entry[1])
+
+    snapshot = _take_snapshot(str(repo_path), remote)
+    if fingerprint is not None:
+        with _lock:
+            _cache[key] = (fingerprint, snapshot)
+    topology = _build(snapshot)
+    logger.debug("Topologia de '%s': padrão=%s, base=%s", repo_path, topology.default_branch, topology.base_branch)
+    return topology
+
+
+def invalidate_topology(repo_path: Optional[str] = None):
+    """Descarta a topologia em cache (de um repositório ou de todos)."""
+    with _lock:
+        if repo_path is None:
+            _cache.clear()
+            return
+        path = os.path.abspath(str(repo_path))
+        for key in [k for k in _cache if k[0] == path]:
+            del _cache[key]
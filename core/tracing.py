@@ -0,0 +1,180 @@
+"""
+Rastreamento estruturado de operações com tempo por etapa (spans).
+
+Cada operação de serviço (update_branch, create_branch, create_pr...) abre um
+span; comandos Git e chamadas HTTP executados dentro dela viram spans filhos
+com duração, código de saída e tamanho da saída.
+
+Os spans são gravados como linhas JSON (formato "trace event" do Chrome) em
+logs/trace.jsonl pelo logger "git_automation.trace", configurado em
+setup_logging. Use export_chrome_trace para gerar um arquivo que pode ser
+aberto em chrome://tracing ou https://ui.perfetto.dev.
+"""
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+TRACE_LOGGER_NAME = "git_automation.trace"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """Intervalo de tempo de uma etapa, com atributos e referência ao span pai."""
+
+    __slots__ = ("name", "kind", "span_id", "parent_id", "trace_id", "attrs",
+                 "start_wall", "_start", "duration", "error", "thread_id")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.attrs = dict(attrs)
+        self.start_wall = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.error = None
+        self.thread_id = threading.get_ident()
+
+    def set(self, **attrs):
+        """Adiciona/atualiza atributos do span (ex.: exit_code, output_bytes)."""
+        self.attrs.update(attrs)
+
+    def finish(self):
+        """Fecha o span registrando a duração."""
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._start
+
+    def to_event(self) -> Dict[str, Any]:
+        """Converte o span para um evento completo ("ph": "X") do formato Chrome trace."""
+        args = dict(self.attrs)
+        args.update(span_id=self.span_id, parent_id=self.parent_id, trace_id=self.trace_id)
+        if self.error is not None:
+            args["error"] = self.error
+        return {
+            "name": self.name,
+            "cat": self.kind,
+            "ph": "X",
+            "ts": int(self.start_wall * 1_000_000),
+            "dur": int((self.duration or 0.0) * 1_000_000),
+            "pid": os.getpid(),
+            "tid": self.thread_id,
+            "args": args,
+        }
+
+
+def get_trace_logger() -> logging.Logger:
+    """Retorna o logger dedicado aos spans."""
+    return logging.getLogger(TRACE_LOGGER_NAME)
+
+
+def current_span() -> Optional[Span]:
+    """Retorna o span ativo no contexto atual (ou None)."""
+    return _current_span.get()
+
+
+def _emit(s: Span):
+    trace_logger = get_trace_logger()
+    if trace_logger.isEnabledFor(logging.INFO):
+        trace_logger.info("%s", json.dumps(s.to_event(), ensure_ascii=False, default=str))
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attrs):
+    """
+    Abre um span filho do span atual.
+
+    Uso:
+        with span("git fetch", kind="git", args="fetch origin main") as s:
+            ...
+            s.set(exit_code=0, output_bytes=123)
+    """
+    s = Span(name, kind, _current_span.get(), attrs)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = str(e) or type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        s.finish()
+        _emit(s)
+
+
+def start_span(name: str, kind: str = "internal", **attrs) -> Span:
+    """
+    Cria um span filho do atual sem torná-lo o span ativo.
+
+    Para trechos que atravessam vários `next()` de um gerador (o `with span()`
+    não pode ficar aberto entre yields). Feche com end_span.
+    """
+    return Span(name, kind, _current_span.get(), attrs)
+
+
+def end_span(s: Span, error: Optional[BaseException] = None):
+    """Fecha e registra um span criado por start_span."""
+    if error is not None:
+        s.error = str(error) or type(error).__name__
+    s.finish()
+    _emit(s)
+
+
+def traced(name: Optional[str] = None, kind: str = "operation"):
+    """
+    Decorator que abre um span em volta de uma operação de serviço.
+
+    Uso:
+        @traced()
+        def update_branch(repo_path, branch, ...):
+            ...
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind=kind):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def load_trace(path) -> List[Dict[str, Any]]:
+    """Lê um arquivo de spans (uma linha JSON por span), ignorando linhas inválidas."""
+    events = []
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def export_chrome_trace(source, destination) -> int:
+    """
+    Converte logs/trace.jsonl para o formato JSON de objeto do Chrome trace
+    ({"traceEvents": [...]}), carregável no chrome://tracing e no Perfetto.
+
+    Retorna a quantidade de eventos exportados.
+    """
+    events = load_trace(source)
+    with Path(destination).open("w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return len(events)
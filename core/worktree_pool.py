@@ -0,0 +1,162 @@
+"""
+Pool de worktrees destacados (`git worktree add --detach`) por repositório.
+
+Operações de preview alugam um worktree, posicionado no commit desejado, e
+o devolvem ao final; o próximo aluguel apenas reposiciona o HEAD. Os
+worktrees compartilham o banco de objetos do repositório (nenhuma cópia) e,
+por estarem destacados, rebase/merge neles nunca movem branches reais.
+"""
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from core.git_operations import run_git_command, run_git_command_with_status, GitCommandError
+from core.logger_config import get_logger
+
+logger = get_logger()
+
+DEFAULT_POOL_SIZE = 2
+
+
+class WorktreePool:
+    """
+    Worktrees reutilizáveis de um repositório.
+
+    Uso:
+        pool = get_worktree_pool(repo)
+        with pool.lease("refs/heads/feature/x") as path:
+            run_git_command(path, ["rebase", "origin/develop"])
+    """
+
+    def __init__(self, repo_path: str, max_size: int = DEFAULT_POOL_SIZE, root: Optional[str] = None):
+        self.repo_path = str(repo_path)
+        self.max_size = max_size
+        digest = hashlib.sha1(os.path.abspath(self.repo_path).encode("utf-8")).hexdigest()[:12]
+        self.root = root or os.path.join(tempfile.gettempdir(), "automatizar_worktrees", digest)
+        self._cond = threading.Condition()
+        self._idle: List[str] = []
+        self._all: List[str] = []
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        with self._cond:
+            return len(self._all)
+
+    def _acquire(self) -> Tuple[str, bool]:
+        """Retorna (caminho, novo?) — reaproveita um ocioso, cria um novo ou espera."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise GitCommandError("Pool de worktrees encerrado.")
+                if self._idle:
+                    return self._idle.pop(), False
+                if len(self._all) < self.max_size:
+                    path = os.path.join(self.root, f"wt{len(self._all)}")
+                    while path in self._all:
+                        path += "_"
+                    self._all.append(path)
+                    return path, True
+                self._cond.wait()
+
+    def _discard(self, path: str):
+        """Remove um worktree do pool (ex.: estado irrecuperável)."""
+        with self._cond:
+            if path in self._all:
+                self._all.remove(path)
+            self._cond.notify()
+        logger.debug("Worktree '%s' descartado do pool", path)
+        result = run_git_command_with_status(self.repo_path, ["worktree", "remove", "--force", path])
+        if result.returncode != 0:
+            shutil.rmtree(path, ignore_errors=True)
+            run_git_command_with_status(self.repo_path, ["worktree", "prune"])
+
+    def _prepare(self, path: str, new: bool, commit: str):
+        if new or not os.path.isdir(path):
+            os.makedirs(self.root, exist_ok=True)
+            if os.path.exists(path):
+                shutil.rmtree(path, ignore_errors=True)
+                run_git_command_with_status(self.repo_path, ["worktree", "prune"])
+            run_git_command(self.repo_path, ["worktree", "add", "--detach", "--quiet", path, commit])
+            return
+        # Reaproveitado: reposiciona o HEAD e descarta qualquer sobra do uso anterior
+        run_git_command(path, ["checkout", "--detach", "--force", "--quiet", commit])
+        run_git_command(path, ["clean", "-ffdq"])
+
+    @contextmanager
+    def lease(self, commit: str):
+        """Aluga um worktree destacado em `commit`; devolve ao pool ao sair do bloco."""
+        path, new = self._acquire()
+        try:
+            self._prepare(path, new, commit)
+        except Exception:
+            self._discard(path)
+            raise
+        healthy = True
+        try:
+            yield path
+        finally:
+            # Aborta operações deixadas pela metade (conflito, cancelamento...)
+            for op in ("rebase", "merge", "cherry-pick"):
+                run_git_command_with_status(path, [op, "--abort"])
+            if run_git_command_with_status(path, ["status", "--porcelain"]).returncode != 0:
+                healthy = False
+            if healthy:
+                with self._cond:
+                    self._idle.append(path)
+                    self._cond.notify()
+            else:
+                self._discard(path)
+
+    def close(self):
+        """Remove todos os worktrees do pool."""
+        with self._cond:
+            self._closed = True
+            paths, self._all, self._idle = list(self._all), [], []
+            self._cond.notify_all()
+        for path in paths:
+            if run_git_command_with_status(self.repo_path, ["worktree", "remove", "--force", path]).returncode != 0:
+                shutil.rmtree(path, ignore_errors=True)
+        if paths:
+            run_git_command_with_status(self.repo_path, ["worktree", "prune"])
+
+
+_pools: Dict[str, WorktreePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worktree_pool(repo_path: str) -> WorktreePool:
+    """Retorna o pool de worktrees do repositório (criado sob demanda)."""
+    key = os.path.abspath(str(repo_path))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = _pools[key] = WorktreePool(repo_path)
+        return pool
+
+
+def close_worktree_pool(repo_path: str):
+    """Remove os worktrees do pool de um repositório (ex.: ao fechá-lo na sessão)."""
+    with _pools_lock:
+        pool = _pools.pop(os.path.abspath(str(repo_path)), None)
+    if pool is not None:
+        pool.close()
+
+
+def close_worktree_pools():
+    """Remove os worktrees de todos os pools (chamado ao encerrar o processo)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        try:
+            pool.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_worktree_pools)
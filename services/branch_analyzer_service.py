@@ -0,0 +1,271 @@
+"""
+Análise de branches para limpeza: classifica cada branch local e remota em
+mesclada, mesclada via squash, inativa (sem commits há N dias) ou ativa.
+
+- mesclada: `for-each-ref --merged` (um único comando para todas as refs)
+- squash: o patch-id do diff merge-base..ponta da branch coincide com o de
+  algum commit da base; os merge-bases de todas as pontas saem de um único
+  `rev-list --boundary`, os patch-ids da base de um único `log -p` e os das
+  branches de um único `diff-tree --stdin`, todos em cache pelos SHAs
+- inativa / ativa: data do último commit, lida no mesmo `for-each-ref`
+
+SHAs repetidos (branch local e origin/<branch> iguais) são analisados uma vez.
+"""
+import time
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from core.cancellation import cancellable, report_progress
+from core.git_operations import run_git_command, run_git_command_with_status, GitCommandError
+from core.logger_config import get_logger
+from core.topology import get_repo_topology
+from core.tracing import traced
+
+logger = get_logger()
+
+STATUS_MERGED = "mesclada"
+STATUS_SQUASHED = "squash"
+STATUS_STALE = "inativa"
+STATUS_ACTIVE = "ativa"
+
+DEFAULT_STALE_DAYS = 90
+
+_SECONDS_PER_DAY = 86400
+
+
+class BranchAnalysis(NamedTuple):
+    """Classificação de uma branch local ou remota."""
+    branch: str        # nome curto (ex.: feature/x)
+    remote: bool       # True para origin/<branch>
+    sha: str
+    status: str
+    age_days: int
+    detail: str = ""
+
+    @property
+    def name(self) -> str:
+        return f"origin/{self.branch}" if self.remote else self.branch
+
+    @property
+    def cleanup_candidate(self) -> bool:
+        """Mesclada, squash ou inativa: sugerida para remoção."""
+        return self.status != STATUS_ACTIVE
+
+
+def _patch_ids(repo_path: str, command: List[str], stdin: Optional[str] = None) -> Dict[str, str]:
+    """Executa `command` e passa a saída (diffs) pelo `git patch-id --stable`: commit -> patch-id."""
+    diff = run_git_command_with_status(repo_path, command, input=stdin)
+    if diff.returncode != 0:
+        raise GitCommandError(diff.stderr.strip() or f"Falha em 'git {command[0]}'.")
+    if not diff.stdout.strip():
+        return {}
+    result = run_git_command_with_status(repo_path, ["patch-id", "--stable"], input=diff.stdout)
+    if result.returncode != 0:
+        raise GitCommandError(result.stderr.strip())
+    ids = {}
+    for line in result.stdout.splitlines():
+        patch_id, _, commit = line.partition(" ")
+        if commit:
+            ids[commit] = patch_id
+    return ids
+
+
+@lru_cache(maxsize=64)
+def base_patch_ids(repo_path: str, base_sha: str, since_day: int) -> FrozenSet[str]:
+    """Patch-ids dos commits da base desde `since_day` (dias desde a época), num único `log -p`."""
+    ids = _patch_ids(repo_path, [
+        "log", "-p", "--no-merges", "--no-renames", "--format=%H", f"--since=@{since_day * _SECONDS_PER_DAY}", base_sha,
+    ])
+    return frozenset(ids.values())
+
+
+_merge_bases: Dict[Tuple[str, str, str], str] = {}   # (repo, base, ponta) -> merge-base ("" = sem ancestral comum)
+_MERGE_BASE_CACHE_LIMIT = 50000
+
+
+def _walk_merge_bases(repo_path: str, base_sha: str, tips: List[str]) -> Dict[str, str]:
+    """Merge-bases de `tips` com a base a partir de uma única caminhada `rev-list --boundary`."""
+    # Commits exclusivos das pontas (com os pais); as linhas "-<sha>" são a fronteira:
+    # commits da base onde as branches se ramificaram
+    result = run_git_command_with_status(
+        repo_path, ["rev-list", "--topo-order", "--parents", "--boundary", "--stdin"],
+        input="".join(f"{tip}\n" for tip in tips) + f"^{base_sha}\n",
+    )
+    if result.returncode != 0:
+        raise GitCommandError(result.stderr.strip() or "Falha em 'git rev-list'.")
+    parents: Dict[str, List[str]] = {}
+    boundary = set()
+    for line in result.stdout.splitlines():
+        if line.startswith("-"):
+            boundary.add(line[1:].split(" ", 1)[0])
+        elif line:
+            sha, *line_parents = line.split()
+            parents[sha] = line_parents
+
+    # --topo-order lista filhos antes dos pais: de trás para frente, cada commit
+    # herda os pontos de ramificação alcançáveis pelos pais
+    forks: Dict[str, FrozenSet[str]] = {}
+    for sha in reversed(list(parents)):
+        reached = set()
+        for parent in parents[sha]:
+            reached |= {parent} if parent in boundary else forks.get(parent, frozenset())
+        forks[sha] = frozenset(reached)
+
+    bases = {}
+    for tip in tips:
+        if tip not in parents:
+            bases[tip] = tip          # ponta já contida na base
+            continue
+        reached = forks[tip]
+        if len(reached) > 1:
+            # A base foi mesclada na branch: vale o ponto de ramificação mais recente
+            independent = run_git_command_with_status(repo_path, ["merge-base", "--independent"] + sorted(reached))
+            reached = independent.stdout.split() if independent.returncode == 0 else sorted(reached)
+        bases[tip] = next(iter(reached), "")
+    return bases
+
+
+def merge_bases(repo_path: str, base_sha: str, tips: Iterable[str]) -> Dict[str, str]:
+    """
+    Merge-base de cada ponta com a base, num único `rev-list` para todas
+    (em vez de um `git merge-base` por branch); resultados ficam em cache.
+
+    Returns:
+        ponta -> merge-base ("" quando não há ancestral comum)
+    """
+    tips = list(dict.fromkeys(tips))
+    missing = [tip for tip in tips if (repo_path, base_sha, tip) not in _merge_bases]
+    if missing:
+        if len(_merge_bases) + len(missing) > _MERGE_BASE_CACHE_LIMIT:
+            _merge_bases.clear()
+        found = _walk_merge_bases(repo_path, base_sha, missing)
+        for tip in missing:
+            _merge_bases[(repo_path, base_sha, tip)] = found.get(tip, "")
+    return {tip: _merge_bases[(repo_path, base_sha, tip)] for tip in tips}
+
+
+_tip_patch_ids: Dict[Tuple[str, str, str], str] = {}   # (repo, ponta, merge-base) -> patch-id ("" = sem diff)
+_TIP_CACHE_LIMIT = 50000
+
+
+def tip_patch_ids(repo_path: str, pairs: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    Patch-id do diff agregado merge-base..ponta de cada branch (o que um squash
+    produziria), num único `diff-tree --stdin`; resultados ficam em cache.
+
+    Args:
+        pairs: (sha da ponta, sha do merge-base)
+
+    Returns:
+        ponta -> patch-id ("" quando a branch não altera nada em relação ao merge-base)
+    """
+    pairs = list(dict.fromkeys(pairs))
+    missing = [(tip, mb) for tip, mb in pairs if (repo_path, tip, mb) not in _tip_patch_ids]
+    if missing:
+        if len(_tip_patch_ids) + len(missing) > _TIP_CACHE_LIMIT:
+            _tip_patch_ids.clear()
+        # "<ponta> <merge-base>": diff-tree compara a ponta com o merge-base como se fosse o pai
+        ids = _patch_ids(repo_path, ["diff-tree", "--stdin", "-p", "--no-renames"],
+                         stdin="".join(f"{tip} {mb}\n" for tip, mb in missing))
+        for tip, mb in missing:
+            _tip_patch_ids[(repo_path, tip, mb)] = ids.get(tip, "")
+    return {tip: _tip_patch_ids[(repo_path, tip, mb)] for tip, mb in pairs}
+
+
+def _snapshot(repo_path: str, base_ref: str, include_remote: bool) -> Tuple[List[Tuple[str, bool, str, int]], set]:
+    """(branch, remota?, sha, data do commit) de todas as refs e o conjunto das já mescladas."""
+    patterns = ["refs/heads"] + (["refs/remotes/origin"] if include_remote else [])
+    raw = run_git_command(
+        repo_path, ["for-each-ref", "--format=%(objectname) %(committerdate:unix) %(refname)"] + patterns
+    )
+    merged_refs = set(run_git_command(
+        repo_path, ["for-each-ref", f"--merged={base_ref}", "--format=%(refname)"] + patterns
+    ).splitlines())
+    refs, merged = [], set()
+    for line in raw.splitlines():
+        parts = line.split(" ", 2)
+        if len(parts) != 3:
+            continue
+        sha, date, ref = parts
+        if ref.startswith("refs/heads/"):
+            entry = (ref[len("refs/heads/"):], False, sha, int(date or 0))
+        elif ref.startswith("refs/remotes/origin/") and ref != "refs/remotes/origin/HEAD":
+            entry = (ref[len("refs/remotes/origin/"):], True, sha, int(date or 0))
+        else:
+            continue
+        refs.append(entry)
+        if ref in merged_refs:
+            merged.add(entry[:2])
+    return refs, merged
+
+
+@traced()
+@cancellable
+def analyze_branches(repo_path: str, base_branch: Optional[str] = None, stale_days: int = DEFAULT_STALE_DAYS,
+                     include_remote: bool = True) -> List[BranchAnalysis]:
+    """
+    Classifica as branches locais (e remotas) para limpeza seletiva.
+
+    Branches protegidas (configuradas + padrão do remoto) e a própria base não
+    aparecem no resultado.
+
+    Args:
+        base_branch: base de comparação (None = base detectada em core.topology)
+        stale_days: dias sem commits para considerar a branch inativa
+        include_remote: inclui origin/* (a partir das refs locais, sem fetch)
+        cancel_token / on_progress: cancelamento e progresso (ver core.cancellation)
+
+    Returns:
+        Lista de BranchAnalysis: candidatas à limpeza primeiro, depois por nome.
+    """
+    repo_key = str(repo_path)
+    topology = get_repo_topology(repo_path)
+    base_branch = base_branch or topology.base_branch
+    base_ref = f"refs/remotes/origin/{base_branch}"
+    if run_git_command_with_status(repo_key, ["rev-parse", "--verify", "--quiet", base_ref]).returncode != 0:
+        base_ref = f"refs/heads/{base_branch}"
+    base_sha = run_git_command(repo_key, ["rev-parse", "--verify", f"{base_ref}^{{commit}}"])
+
+    excluded = set(topology.protected) | {base_branch}
+    refs, merged = _snapshot(repo_key, base_ref, include_remote)
+    refs = [r for r in refs if r[0] not in excluded]
+    now = time.time()
+
+    # Squash: só para o que não está mesclado; cada SHA uma única vez
+    candidates = sorted({sha: date for b, remote, sha, date in refs if (b, remote) not in merged}.items())
+    squashed: Dict[str, str] = {}
+    if candidates:
+        logger.info(f"Analisando {len(candidates)} branch(es) não mescladas contra '{base_branch}'...")
+        report_progress("Analisando branches", 0, f"{len(candidates)} branch(es)")
+        bases = merge_bases(repo_key, base_sha, [sha for sha, _ in candidates])
+        report_progress("Analisando branches", 50, "merge-bases calculados")
+
+        pairs = [(sha, mb) for sha, mb in bases.items() if mb]
+        tip_ids = tip_patch_ids(repo_key, pairs)
+        # O squash entra na base depois do último commit da branch
+        since_day = int(min(date for _, date in candidates) // _SECONDS_PER_DAY)
+        base_ids = base_patch_ids(repo_key, base_sha, since_day) if any(tip_ids.values()) else frozenset()
+        for sha, patch_id in tip_ids.items():
+            if not patch_id:
+                squashed[sha] = "sem alterações em relação à base"
+            elif patch_id in base_ids:
+                squashed[sha] = f"conteúdo já aplicado em {base_branch}"
+        report_progress("Analisando branches", 100, f"{len(candidates)} branch(es)")
+
+    results = []
+    for branch, remote, sha, date in refs:
+        age = max(0, int((now - date) // _SECONDS_PER_DAY)) if date else 0
+        if (branch, remote) in merged:
+            status, detail = STATUS_MERGED, f"contida em {base_branch}"
+        elif sha in squashed:
+            status, detail = STATUS_SQUASHED, squashed[sha]
+        elif age >= stale_days:
+            status, detail = STATUS_STALE, f"sem commits há {age} dia(s)"
+        else:
+            status, detail = STATUS_ACTIVE, ""
+        results.append(BranchAnalysis(branch, remote, sha, status, age, detail))
+
+    results.sort(key=lambda r: (not r.cleanup_candidate, r.name))
+    counts = ", ".join(f"{s}: {sum(1 for r in results if r.status == s)}"
+                       for s in (STATUS_MERGED, STATUS_SQUASHED, STATUS_STALE, STATUS_ACTIVE))
+    logger.info(f"Análise de branches concluída ({counts})")
+    return results
@@ -1,12 +1,20 @@
-from typing import List
-from core.git_operations import run_git_command, GitCommandError
+from typing import List, Optional
+from core.git_operations import get_checked_out_branches, run_git_command, GitCommandError
 from core.logger_config import get_logger
 from core.cache import cached
+from core.dirty_check import is_dirty
+from core.fetch_planner import FetchPlanner
+from core.merge_engine import (
+    conflicted_paths, overlapping_paths, supports_strategy, sync_branch, OVERLAP_WARNING_STAGE, PathOverlap,
+)
+from core.push import delete_remote_branches
+from core.status import summarize_status
+from core.topology import get_repo_topology
+from core.tracing import traced
+from core.worktree_pool import get_worktree_pool
+from core.cancellation import cancellable, report_progress
 from utils.settings import get_protected_branches as _get_protected_branches, get_default_strategy
 import json
-import shutil
-import tempfile
-import subprocess
 
 logger = get_logger()
 
@@ -17,7 +25,7 @@ def list_branches(repo_path: str) -> List[str]:
     try:
         raw = run_git_command(repo_path, ["branch"]).splitlines()
         branches = [b.replace("*", "").strip() for b in raw if b.strip()]
-        logger.debug(f"Branches locais encontradas: {branches}")
+        logger.debug("Branches locais encontradas: %s", branches)
         return branches
     except GitCommandError as e:
         logger.error(f"Erro ao listar branches: {e}")
@@ -31,19 +39,23 @@ def list_remote_branches(repo_path: str) -> List[str]:
         raw = run_git_command(repo_path, ["branch", "-r"]).splitlines()
         branches = [b.strip().replace("origin/", "") for b in raw if "origin/" in b]
         branches = sorted(set(branches))
-        logger.debug(f"Branches remotas encontradas: {branches}")
+        logger.debug("Branches remotas encontradas: %s", branches)
         return branches
     except GitCommandError as e:
         logger.error(f"Erro ao listar branches remotas: {e}")
         raise
 
 
+@traced()
+@cancellable
 def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy: str | None = None) -> str:
     """Atualiza a branch local sincronizando com a branch base.
 
     Fluxo:
-    - Faz checkout para `branch`.
-    - Faz fetch de `origin/<base_branch>` e `origin/<branch>`.
+    - Se `branch` não estiver checada, sincroniza sem checkout (core.merge_engine:
+      merge-tree/commit-tree/update-ref), quando a versão do git permitir.
+    - Caso contrário, faz checkout para `branch`.
+    - Faz fetch de `origin/<base_branch>` e `origin/<branch>` num único `git fetch`.
     - Aplica sincronização conforme `strategy`:
         - "rebase" (padrão): rebase local sobre `origin/<base_branch>` e push com --force-with-lease
         - "merge": merge de `origin/<base_branch>` (preserva merges) e push normal
@@ -53,6 +65,8 @@ def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy
         branch: branch local a atualizar
         base_branch: branch base (se None, detecta develop/main/master)
         strategy: "rebase" ou "merge"
+        cancel_token: CancellationToken opcional (interrompe fetch/push em andamento)
+        on_progress: callback opcional que recebe ProgressEvent de fetch/push
 
     Returns:
         Mensagem de sucesso.
@@ -63,6 +77,13 @@ def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy
     try:
         logger.info(f"Atualizando branch '{branch}' com estratégia '{strategy}'...")
 
+        # Branch que não está checada: sincroniza no banco de objetos, sem checkout
+        if _can_sync_without_checkout(repo_path, branch, strategy or get_default_strategy()):
+            return _update_branch_without_checkout(
+                repo_path, branch, base_branch or _get_default_base_branch(repo_path),
+                strategy or get_default_strategy()
+            )
+
         # Faz checkout para a branch alvo
         run_git_command(repo_path, ["checkout", branch])
 
@@ -75,8 +96,7 @@ def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy
             strategy = get_default_strategy()
 
         # Verifica alterações locais não commitadas (após checkout)
-        status = run_git_command(repo_path, ["status", "--porcelain"])
-        if status.strip():
+        if is_dirty(repo_path):
             msg = (
                 f"⚠️ Existem alterações locais em '{branch}'.\n"
                 "Faça commit ou descarte antes de atualizar."
@@ -84,35 +104,15 @@ def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy
             logger.warning(msg)
             raise GitCommandError(msg)
 
-        # Busca informações remotas mais recentes (base e a própria branch)
-        logger.debug(f"Fazendo fetch de origin/{base_branch} e origin/{branch}")
-        run_git_command(repo_path, ["fetch", "origin", base_branch])
-        run_git_command(repo_path, ["fetch", "origin", branch])
-
-        # Verifica se branch existe no remoto usando helper
-        remotas = list_remote_branches(repo_path)
-        remote_exists = branch in remotas
-
-
-        # Busca informações remotas mais recentes (base e a própria branch)
-        logger.debug(f"Fazendo fetch de origin/{base_branch} e origin/{branch}")
-        run_git_command(repo_path, ["fetch", "origin", base_branch])
-        run_git_command(repo_path, ["fetch", "origin", branch])
-
-
-        # Busca informações remotas mais recentes (base e a própria branch)
-        logger.debug(f"Fazendo fetch de origin/{base_branch} e origin/{branch}")
-        run_git_command(repo_path, ["fetch", "origin", base_branch])
-        run_git_command(repo_path, ["fetch", "origin", branch])
-
-        # Verifica se branch existe no remoto usando helper
-        remotas = list_remote_branches(repo_path)
-        remote_exists = branch in remotas
+        # Busca base e a própria branch num único fetch com refspecs explícitos
+        logger.debug("Fazendo fetch de origin/%s e origin/%s", base_branch, branch)
+        fetch_result = FetchPlanner(repo_path).add(base_branch).add(branch, optional=True).execute()
+        remote_exists = branch in fetch_result.available
 
         if not remote_exists:
             # Branch é nova: push inicial com tracking
             logger.info(f"Branch '{branch}' não existe no remoto. Fazendo push inicial com tracking...")
-            run_git_command(repo_path, ["push", "-u", "origin", branch])
+            _push_branch(repo_path, branch, "new")
             msg = f"✅ Branch '{branch}' criada e enviada ao remoto."
             logger.info(msg)
             return msg
@@ -121,6 +121,8 @@ def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy
         if strategy not in {"rebase", "merge"}:
             raise GitCommandError(f"Strategy inválida: {strategy}. Use 'rebase' ou 'merge'.")
 
+        _warn_overlapping_paths(repo_path, branch, f"origin/{base_branch}")
+
         if strategy == "rebase":
             logger.info(f"Rebaseando '{branch}' sobre origin/{base_branch}...")
             try:
@@ -139,7 +141,7 @@ def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy
                 raise GitCommandError(msg)
 
             # Force push seguro após rebase (preserva trabalho remoto se houver divergência)
-            run_git_command(repo_path, ["push", "origin", branch, "--force-with-lease"])
+            _push_branch(repo_path, branch, "lease")
             msg = f"✅ Branch '{branch}' sincronizada com '{base_branch}' via rebase."
 
         else:  # merge
@@ -155,7 +157,7 @@ def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy
                 raise GitCommandError(msg)
 
             # Push normal (merge preserva histórico)
-            run_git_command(repo_path, ["push", "origin", branch])
+            _push_branch(repo_path, branch, "plain")
             msg = f"✅ Branch '{branch}' sincronizada com '{base_branch}' via merge."
 
         logger.info(msg)
@@ -167,26 +169,95 @@ def update_branch(repo_path: str, branch: str, base_branch: str = None, strategy
         raise GitCommandError(f"Erro ao atualizar branch '{branch}': {e}")
 
 
+def _push_branch(repo_path: str, branch: str, mode: str):
+    """Push de `branch` para o origin.
+
+    mode: "plain" (push normal), "lease" (--force-with-lease) ou "new" (-u).
+    """
+    if mode == "new":
+        run_git_command(repo_path, ["push", "-u", "origin", branch])
+    elif mode == "lease":
+        run_git_command(repo_path, ["push", "origin", branch, "--force-with-lease"])
+    else:
+        run_git_command(repo_path, ["push", "origin", branch])
+
+
+def _warn_overlapping_paths(repo_path: str, branch: str, upstream: str) -> Optional[PathOverlap]:
+    """
+    Pré-filtro barato: avisa antes do rebase/merge quais arquivos mudaram nos dois lados.
+
+    Returns:
+        O PathOverlap calculado (`.disjoint`: nenhum conflito é possível) ou
+        None se não foi possível calculá-lo.
+    """
+    try:
+        result = overlapping_paths(repo_path, branch, upstream)
+    except GitCommandError:
+        return None
+    overlap = result.overlap
+    if overlap:
+        shown = ", ".join(overlap[:10]) + (f" (+{len(overlap) - 10})" if len(overlap) > 10 else "")
+        logger.warning(f"⚠️ '{branch}' e '{upstream}' alteram os mesmos arquivos: {shown}")
+        report_progress(OVERLAP_WARNING_STAGE, None, f"Possível conflito em: {shown}")
+    return result
+
+
+def _can_sync_without_checkout(repo_path: str, branch: str, strategy: str) -> bool:
+    """
+    A branch existe localmente, não está checada em nenhum worktree (o principal,
+    os do pool ou os do usuário) e o git suporta a estratégia sem checkout.
+    """
+    if not supports_strategy(strategy):
+        return False
+    try:
+        exists = run_git_command(repo_path, ["rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"])
+        checked_out = get_checked_out_branches(repo_path)
+    except GitCommandError:
+        return False
+    return bool(exists) and branch not in checked_out
+
+
+def _update_branch_without_checkout(repo_path: str, branch: str, base_branch: str, strategy: str) -> str:
+    """update_branch via merge-tree/commit-tree/update-ref: índice e diretório de trabalho intactos."""
+    fetch_result = FetchPlanner(repo_path).add(base_branch).add(branch, optional=True).execute()
+
+    if branch not in fetch_result.available:
+        logger.info(f"Branch '{branch}' não existe no remoto. Fazendo push inicial com tracking...")
+        _push_branch(repo_path, branch, "new")
+        msg = f"✅ Branch '{branch}' criada e enviada ao remoto."
+        logger.info(msg)
+        return msg
+
+    _warn_overlapping_paths(repo_path, branch, f"origin/{base_branch}")
+    logger.info(f"Sincronizando '{branch}' com origin/{base_branch} via {strategy} (sem checkout)...")
+    result = sync_branch(repo_path, branch, f"origin/{base_branch}", strategy)
+    if result.conflicts:
+        msg = (
+            f"⚠️ Conflito durante {strategy}: {', '.join(result.conflicts)}.\n"
+            "Nada foi alterado. Resolva os conflitos localmente ou use a resolução automática."
+        )
+        logger.warning(msg)
+        raise GitCommandError(msg)
+
+    _push_branch(repo_path, branch, "lease" if strategy == "rebase" else "plain")
+    msg = f"✅ Branch '{branch}' sincronizada com '{base_branch}' via {strategy}."
+    logger.info(msg)
+    return msg
+
+
 def _get_default_base_branch(repo_path: str) -> str:
     """Detecta a branch base padrão (develop ou main)."""
     try:
-        # Tentar branches comuns
-        for branch_name in ["develop", "main", "master"]:
-            try:
-                run_git_command(repo_path, ["rev-parse", "--verify", f"origin/{branch_name}"])
-                logger.debug(f"Branch base detectada: {branch_name}")
-                return branch_name
-            except GitCommandError:
-                continue
-
-        # Fallback para 'main' se nenhuma for encontrada
-        logger.warning("Nenhuma branch base padrão encontrada. Usando 'main'.")
-        return "main"
+        branch_name = get_repo_topology(repo_path).base_branch
+        logger.debug("Branch base detectada: %s", branch_name)
+        return branch_name
     except Exception as e:
         logger.warning(f"Erro ao detectar branch base: {e}. Usando 'main'.")
         return "main"
 
 
+@traced()
+@cancellable
 def create_branch(repo_path: str, branch_name: str, base_branch: str | None = None) -> str:
     """
     Cria uma nova branch com prefixo 'feature/'.
@@ -197,42 +268,25 @@ def create_branch(repo_path: str, branch_name: str, base_branch: str | None = No
         if not branch_name.startswith("feature/"):
             branch_name = f"feature/{branch_name}"
 
-        # Atualizar remotos primeiro para garantir que list_remote_branches retorne dados recentes
-        try:
-            run_git_command(repo_path, ["fetch", "origin"])
-        except GitCommandError:
-            logger.debug("Falha ao executar 'git fetch origin' antes de criar branch; prosseguindo com detecção local/remota existente.")
-
         # Se o usuário passou explicitamente a base, utilize-a; senão prefira main/master
+        # (detecção pelas refs de rastreamento locais, sem ida à rede)
         if not base_branch:
             try:
-                remotas = list_remote_branches(repo_path)
-            except Exception:
-                remotas = []
-
-            if "main" in remotas:
-                base_branch = "main"
-            elif "master" in remotas:
-                base_branch = "master"
-            else:
-                # fallback ao detector existente
+                base_branch = get_repo_topology(repo_path).creation_base
+            except GitCommandError:
                 base_branch = _get_default_base_branch(repo_path)
 
-        # Buscar remotas para base e para develop (manter ambos atualizados)
+        # Um único fetch para a base e para develop (manter ambos atualizados)
+        plan = FetchPlanner(repo_path).add(base_branch)
+        if base_branch != "develop":
+            # develop pode não existir no remoto
+            plan.add("develop", optional=True)
         try:
-            run_git_command(repo_path, ["fetch", "origin", base_branch])
+            plan.execute()
         except GitCommandError:
-            # Se fetch falhar, log e re-raise
             logger.warning(f"Falha ao buscar origin/{base_branch} antes de criar branch.")
             raise
 
-        # Também atualizar develop para segurança, caso base seja main/master
-        if base_branch != "develop":
-            try:
-                run_git_command(repo_path, ["fetch", "origin", "develop"])
-            except GitCommandError:
-                logger.debug("Não foi possível fetch origin/develop (pode não existir), prosseguindo.")
-
         # Fazer checkout para a branch base antes de criar a nova branch
         try:
             run_git_command(repo_path, ["checkout", base_branch])
@@ -255,6 +309,7 @@ def create_branch(repo_path: str, branch_name: str, base_branch: str | None = No
         raise
 
 
+@traced()
 def checkout_branch(repo_path: str, branch: str) -> str:
     """
     Realiza o checkout para a branch especificada.
@@ -276,14 +331,15 @@ def list_local_branches(repo_path: str) -> List[str]:
     return list_branches(repo_path)
 
 
+@traced()
 def safe_checkout(repo_path, branch):
     """Verifica alterações locais antes de trocar de branch."""
     try:
         logger.info(f"Verificando alterações locais para checkout de '{branch}'...")
-        status = run_git_command(repo_path, ["status", "--porcelain"])
-        if status.strip():
+        if is_dirty(repo_path):
             msg = (
-                "⚠️ Existem alterações locais não commitadas.\n\n"
+                "⚠️ Existem alterações locais não commitadas:\n"
+                f"{summarize_status(repo_path).describe()}\n\n"
                 "Você pode:\n"
                 "1. 💾 Salvar em Stash (recomendado)\n"
                 "2. 💬 Fazer Commit\n"
@@ -301,29 +357,42 @@ def safe_checkout(repo_path, branch):
         raise
 
 
+@traced()
 def validate_pr_ready(repo_path: str, base_branch: str, compare_branch: str) -> str:
-    """Valida se a branch compare está atualizada e sem conflito com a base."""
+    """Valida se a branch compare está sem conflito com a base e atualizada.
+
+    Os conflitos são verificados antes da defasagem: uma branch que já contém
+    a base nunca conflita com ela, então checar "desatualizada" primeiro
+    esconderia para sempre a lista de arquivos em conflito. Uma branch apenas
+    desatualizada (sem conflito) continua sendo recusada em seguida.
+    """
     try:
         logger.info(f"Validando PR: '{compare_branch}' -> '{base_branch}'...")
 
-        run_git_command(repo_path, ["fetch", "origin", base_branch])
+        FetchPlanner(repo_path).add(base_branch).execute()
 
-        try:
-            run_git_command(repo_path, ["merge-base", "--is-ancestor", f"origin/{base_branch}", compare_branch])
-        except GitCommandError:
+        # Conflitos primeiro (ver docstring): merge-tree --write-tree --name-only lista só os caminhos
+        if supports_strategy("merge"):
+            conflicts = conflicted_paths(repo_path, f"origin/{base_branch}", compare_branch)
+            has_conflict = bool(conflicts)
+        else:
+            conflicts = ()
+            has_conflict = _has_conflict_markers(repo_path, base_branch, compare_branch)
+        if has_conflict:
+            detail = f": {', '.join(conflicts)}" if conflicts else ""
             msg = (
-                f"⚠️ A branch '{compare_branch}' está desatualizada em relação a '{base_branch}'.\n"
-                "Atualize sua branch (rebase/merge) e faça push antes de criar o PR."
+                f"⚠️ Conflito detectado ao mesclar '{compare_branch}' em '{base_branch}'{detail}.\n"
+                "Resolva os conflitos localmente e faça push antes de criar o PR."
             )
             logger.warning(msg)
             raise GitCommandError(msg)
 
-        base_commit = run_git_command(repo_path, ["merge-base", compare_branch, f"origin/{base_branch}"])
-        merge_output = run_git_command(repo_path, ["merge-tree", base_commit, compare_branch, f"origin/{base_branch}"])
-        if "<<<<<<<" in merge_output or ">>>>>>>" in merge_output:
+        try:
+            run_git_command(repo_path, ["merge-base", "--is-ancestor", f"origin/{base_branch}", compare_branch])
+        except GitCommandError:
             msg = (
-                f"⚠️ Conflito detectado ao mesclar '{compare_branch}' em '{base_branch}'.\n"
-                "Resolva os conflitos localmente e faça push antes de criar o PR."
+                f"⚠️ A branch '{compare_branch}' está desatualizada em relação a '{base_branch}'.\n"
+                "Atualize sua branch (rebase/merge) e faça push antes de criar o PR."
             )
             logger.warning(msg)
             raise GitCommandError(msg)
@@ -338,34 +407,51 @@ def validate_pr_ready(repo_path: str, base_branch: str, compare_branch: str) ->
         raise GitCommandError(f"Erro ao validar PR: {e}")
 
 
-def get_protected_branches() -> List[str]:
-    """Retorna lista de branches protegidas (não podem ser deletadas)."""
+def _has_conflict_markers(repo_path: str, base_branch: str, compare_branch: str) -> bool:
+    """Detecção por marcadores no merge-tree de três argumentos (git < 2.38)."""
+    base_commit = run_git_command(repo_path, ["merge-base", compare_branch, f"origin/{base_branch}"])
+    merge_output = run_git_command(repo_path, ["merge-tree", base_commit, compare_branch, f"origin/{base_branch}"])
+    return "<<<<<<<" in merge_output or ">>>>>>>" in merge_output
+
+
+def get_protected_branches(repo_path: str = None) -> List[str]:
+    """Retorna lista de branches protegidas (não podem ser deletadas).
+
+    Com `repo_path`, inclui também a branch padrão do remoto (core.topology).
+    """
+    if repo_path:
+        try:
+            return list(get_repo_topology(repo_path).protected)
+        except GitCommandError:
+            logger.debug("Falha ao obter topologia; usando apenas as branches protegidas configuradas.")
     return _get_protected_branches()
 
 
+@traced()
 def delete_all_remote_branches(repo_path: str) -> List[str]:
     """
     Deleta todas as branches remotas não protegidas.
     Retorna lista de branches deletadas.
     """
     try:
-        protected = set(get_protected_branches())
-        remotas = list_remote_branches(repo_path)
+        protected = set(get_protected_branches(repo_path))
+        remotas = [b for b in list_remote_branches(repo_path) if b not in protected and b != "HEAD"]
+        # Pushes multi-refspec em blocos, com resultado por ref
         deletadas = []
-        for branch in remotas:
-            if branch not in protected:
-                try:
-                    run_git_command(repo_path, ["push", "origin", f":{branch}"])
-                    deletadas.append(branch)
-                    logger.info(f"Branch remota '{branch}' deletada.")
-                except GitCommandError as e:
-                    logger.warning(f"Erro ao deletar branch remota '{branch}': {e}")
+        for ref in delete_remote_branches(repo_path, remotas):
+            if ref.ok:
+                deletadas.append(ref.branch)
+                logger.info(f"Branch remota '{ref.branch}' deletada.")
+            else:
+                logger.warning(f"Erro ao deletar branch remota '{ref.branch}': {ref.reason or ref.summary}")
         return deletadas
     except Exception as e:
         logger.error(f"Erro ao deletar branches remotas: {e}")
         raise GitCommandError(f"Erro ao deletar branches remotas: {e}")
 
 
+@traced()
+@cancellable
 def resolve_conflict(repo_path: str, branch: str, base_branch: str = None, favor: str = "theirs", strategy: str | None = None, preview: bool = False, push: bool = False) -> str:
     """Tenta resolver conflitos automaticamente usando a estratégia de merge option (-X).
 
@@ -375,6 +461,7 @@ def resolve_conflict(repo_path: str, branch: str, base_branch: str = None, favor
         base_branch: branch base para sincronização (se None detecta automaticamente)
         favor: 'ours' ou 'theirs' — qual lado priorizar ao resolver conflitos
         strategy: 'rebase' ou 'merge' (se None usa configuração do usuário)
+        cancel_token / on_progress: cancelamento e progresso (ver core.cancellation)
 
     Returns:
         Mensagem de sucesso
@@ -390,91 +477,86 @@ def resolve_conflict(repo_path: str, branch: str, base_branch: str = None, favor
     if not strategy:
         strategy = get_default_strategy()
 
-    # If preview mode, operate on a temporary copy of the repository
-    work_dir = repo_path
-    temp_dir = None
-    try:
-        if preview:
-            temp_dir = tempfile.mkdtemp(prefix="automatizar_preview_")
-            # Try a shallow clone first for performance
-            try:
-                proc = subprocess.run(["git", "clone", "--depth", "1", repo_path, temp_dir], capture_output=True, text=True)
-                if proc.returncode != 0:
-                    # Fallback to full clone if shallow clone fails (some git servers or local repos may not support it)
-                    proc2 = subprocess.run(["git", "clone", repo_path, temp_dir], capture_output=True, text=True)
-                    if proc2.returncode != 0:
-                        raise GitCommandError(f"Falha ao clonar repositório para preview: {proc2.stderr.strip()}")
-            except Exception as e:
-                # As a last resort, fallback to filesystem copy (slower)
-                try:
-                    shutil.copytree(repo_path, temp_dir, dirs_exist_ok=True)
-                except Exception as e2:
-                    raise GitCommandError(f"Falha ao preparar preview: {e} / {e2}")
-            work_dir = temp_dir
-
-        # Garantir checkout na branch dentro work_dir
-        run_git_command(work_dir, ["checkout", branch])
-
-        if not base_branch:
-            base_branch = _get_default_base_branch(work_dir)
-
-        # Buscar remotos atualizados
-        run_git_command(work_dir, ["fetch", "origin", base_branch])
-        run_git_command(work_dir, ["fetch", "origin", branch])
-
-        if strategy == "rebase":
-            # Tentar rebase com opção de favor
-            try:
-                run_git_command(work_dir, ["rebase", "-X", favor, f"origin/{base_branch}"])
-            except GitCommandError as e:
-                # Tentar abortar para deixar repositório limpo
-                try:
-                    run_git_command(work_dir, ["rebase", "--abort"])
-                except Exception:
-                    logger.debug("Falha ao abortar rebase automaticamente durante resolve_conflict.")
-                raise GitCommandError(f"Falha ao tentar rebase com favor='{favor}': {e}")
-
-            # Push após rebase se solicitado e não em preview
-            if push and not preview:
-                run_git_command(work_dir, ["push", "origin", branch, "--force-with-lease"])
-                pushed_msg = " e enviado ao remoto"
-            else:
-                pushed_msg = " (não enviado ao remoto)" if preview or not push else ""
-
-            msg = f"✅ Conflitos resolvidos automaticamente em '{branch}' usando favor='{favor}' (rebase){pushed_msg}."
-            logger.info(msg)
-            return msg
-
-        elif strategy == "merge":
+    if strategy not in {"rebase", "merge"}:
+        raise GitCommandError(f"Strategy inválida: {strategy}. Use 'rebase' ou 'merge'.")
+
+    if not base_branch:
+        base_branch = _get_default_base_branch(repo_path)
+
+    # Buscar remotos atualizados (um único fetch para base e branch)
+    FetchPlanner(repo_path).add(base_branch).add(branch, optional=True).execute()
+
+    if preview:
+        # Worktree destacado do pool: sem clone/cópia e nenhuma branch real é movida
+        with get_worktree_pool(repo_path).lease(f"refs/heads/{branch}") as work_dir:
+            _warn_overlapping_paths(work_dir, branch, f"origin/{base_branch}")
+            return _apply_with_favor(work_dir, branch, base_branch, favor, strategy, push=False, preview=True)
+
+    overlap = _warn_overlapping_paths(repo_path, branch, f"origin/{base_branch}")
+    if overlap is not None and overlap.disjoint and _can_sync_without_checkout(repo_path, branch, strategy):
+        # Sem arquivos em comum não há conflito a resolver: dispensa o checkout e a tentativa com -X
+        return _sync_disjoint(repo_path, branch, base_branch, strategy, push)
+
+    # Garantir checkout na branch
+    run_git_command(repo_path, ["checkout", branch])
+    return _apply_with_favor(repo_path, branch, base_branch, favor, strategy, push=push, preview=False)
+
+
+def _sync_disjoint(repo_path: str, branch: str, base_branch: str, strategy: str, push: bool) -> str:
+    """Rebase/merge sem checkout de lados que não alteram os mesmos arquivos (não conflitam)."""
+    result = sync_branch(repo_path, branch, f"origin/{base_branch}", strategy)
+    if result.conflicts:
+        raise GitCommandError(f"Conflito inesperado em {', '.join(result.conflicts)} durante {strategy}.")
+    if push:
+        _push_branch(repo_path, branch, "lease" if strategy == "rebase" else "plain")
+    pushed_msg = " e enviado ao remoto" if push else " (não enviado ao remoto)"
+    msg = f"✅ '{branch}' sincronizada via {strategy} sem conflitos (arquivos disjuntos){pushed_msg}."
+    logger.info(msg)
+    return msg
+
+
+def _apply_with_favor(work_dir: str, branch: str, base_branch: str, favor: str, strategy: str,
+                      push: bool, preview: bool) -> str:
+    """Executa rebase/merge -X <favor> em work_dir e, se pedido, envia ao remoto."""
+    if strategy == "rebase":
+        # Tentar rebase com opção de favor
+        try:
+            run_git_command(work_dir, ["rebase", "-X", favor, f"origin/{base_branch}"])
+        except GitCommandError as e:
+            # Tentar abortar para deixar repositório limpo
             try:
-                run_git_command(work_dir, ["merge", "-X", favor, f"origin/{base_branch}"])
-            except GitCommandError as e:
-                # Em caso de falha, tentar abortar merge
-                try:
-                    run_git_command(work_dir, ["merge", "--abort"])
-                except Exception:
-                    logger.debug("Falha ao abortar merge automaticamente durante resolve_conflict.")
-                raise GitCommandError(f"Falha ao tentar merge com favor='{favor}': {e}")
-
-            if push and not preview:
-                run_git_command(work_dir, ["push", "origin", branch])
-                pushed_msg = " e enviado ao remoto"
-            else:
-                pushed_msg = " (não enviado ao remoto)" if preview or not push else ""
-
-            msg = f"✅ Conflitos resolvidos automaticamente em '{branch}' usando favor='{favor}' (merge){pushed_msg}."
-            logger.info(msg)
-            return msg
+                run_git_command(work_dir, ["rebase", "--abort"])
+            except Exception:
+                logger.debug("Falha ao abortar rebase automaticamente durante resolve_conflict.")
+            raise GitCommandError(f"Falha ao tentar rebase com favor='{favor}': {e}")
 
+        # Push após rebase se solicitado e não em preview
+        if push and not preview:
+            _push_branch(work_dir, branch, "lease")
+            pushed_msg = " e enviado ao remoto"
         else:
-            raise GitCommandError(f"Strategy inválida: {strategy}. Use 'rebase' ou 'merge'.")
+            pushed_msg = " (não enviado ao remoto)" if preview or not push else ""
 
-    finally:
-        # Cleanup temp dir if used
-        if temp_dir:
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception:
-                logger.debug(f"Falha ao remover tempdir {temp_dir}")
-        # End
-        pass
+        msg = f"✅ Conflitos resolvidos automaticamente em '{branch}' usando favor='{favor}' (rebase){pushed_msg}."
+        logger.info(msg)
+        return msg
+
+    try:
+        run_git_command(work_dir, ["merge", "-X", favor, f"origin/{base_branch}"])
+    except GitCommandError as e:
+        # Em caso de falha, tentar abortar merge
+        try:
+            run_git_command(work_dir, ["merge", "--abort"])
+        except Exception:
+            logger.debug("Falha ao abortar merge automaticamente durante resolve_conflict.")
+        raise GitCommandError(f"Falha ao tentar merge com favor='{favor}': {e}")
+
+    if push and not preview:
+        _push_branch(work_dir, branch, "plain")
+        pushed_msg = " e enviado ao remoto"
+    else:
+        pushed_msg = " (não enviado ao remoto)" if preview or not push else ""
+
+    msg = f"✅ Conflitos resolvidos automaticamente em '{branch}' usando favor='{favor}' (merge){pushed_msg}."
+    logger.info(msg)
+    return msg
@@ -0,0 +1,208 @@
+"""
+Atualização em lote das branches de feature.
+
+Um único fetch traz a base e todas as branches; cada branch é rebaseada (ou
+mesclada) no banco de objetos quando o git permite (core.merge_engine) ou
+num `git worktree` temporário próprio, em paralelo num pool limitado, sem
+tocar no diretório de trabalho do usuário. As branches
+atualizadas são enviadas num único push com --force-with-lease.
+"""
+import contextvars
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional
+from core.cancellation import cancellable, report_progress
+from core.fetch_planner import FetchPlanner
+from core.git_operations import (
+    get_checked_out_branches, run_git_command, run_git_command_with_status,
+    GitCommandError, GitCommandCancelled, GitCommandTimeout,
+)
+from core.logger_config import get_logger
+from core.merge_engine import supports_strategy, sync_branch
+from core.push import PushBatch, PushRefResult
+from core.tracing import traced
+from services.branch_service import _get_default_base_branch
+from utils.settings import get_default_strategy
+
+logger = get_logger()
+
+STATUS_UPDATED = "atualizada"
+STATUS_UP_TO_DATE = "em dia"
+STATUS_CONFLICT = "conflito"
+STATUS_REJECTED = "push rejeitado"
+STATUS_SKIPPED = "ignorada"
+STATUS_ERROR = "erro"
+
+
+class BranchUpdateResult(NamedTuple):
+    """Linha da tabela de resultados da atualização em lote."""
+    branch: str
+    status: str
+    detail: str = ""
+    old_sha: str = ""
+    new_sha: str = ""
+
+
+def list_feature_branches(repo_path: str, prefix: str = "feature/") -> List[str]:
+    """Lista as branches locais com o prefixo informado."""
+    raw = run_git_command(repo_path, ["for-each-ref", "--format=%(refname:short)", f"refs/heads/{prefix}"])
+    return [b for b in raw.splitlines() if b]
+
+
+def _rev_parse(repo_path: str, ref: str) -> str:
+    return run_git_command(repo_path, ["rev-parse", "--verify", "--quiet", ref])
+
+
+def _update_in_worktree(repo_path: str, workdir: str, branch: str, base_ref: str, strategy: str) -> BranchUpdateResult:
+    """Rebaseia/mescla uma branch sem checkout (core.merge_engine) ou num worktree temporário."""
+    old_sha = _rev_parse(repo_path, f"refs/heads/{branch}")
+    if run_git_command_with_status(repo_path, ["merge-base", "--is-ancestor", base_ref, old_sha]).returncode == 0:
+        return BranchUpdateResult(branch, STATUS_UP_TO_DATE, f"já contém {base_ref}", old_sha, old_sha)
+
+    if supports_strategy(strategy):
+        # Sem checkout: merge-tree/commit-tree/update-ref dispensam o worktree
+        result = sync_branch(repo_path, branch, base_ref, strategy)
+        if result.conflicts:
+            return BranchUpdateResult(branch, STATUS_CONFLICT, ", ".join(result.conflicts), old_sha, old_sha)
+        return BranchUpdateResult(branch, STATUS_UPDATED, f"{strategy} sobre {base_ref}", old_sha, result.new_sha)
+
+    path = os.path.join(workdir, branch.replace("/", "__"))
+    run_git_command(repo_path, ["worktree", "add", "--quiet", path, branch])
+    try:
+        try:
+            if strategy == "rebase":
+                run_git_command(path, ["rebase", base_ref])
+            else:
+                run_git_command(path, ["merge", "--no-edit", base_ref])
+        except GitCommandCancelled:
+            raise
+        except GitCommandError as e:
+            try:
+                run_git_command(path, [strategy, "--abort"])
+            except GitCommandError:
+                logger.debug("Falha ao abortar %s em '%s'", strategy, branch)
+            detail = str(e).splitlines()[0] if str(e) else ""
+            return BranchUpdateResult(branch, STATUS_CONFLICT, detail, old_sha, old_sha)
+        new_sha = _rev_parse(path, "HEAD")
+        return BranchUpdateResult(branch, STATUS_UPDATED, f"{strategy} sobre {base_ref}", old_sha, new_sha)
+    finally:
+        try:
+            run_git_command(repo_path, ["worktree", "remove", "--force", path])
+        except GitCommandError:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@traced()
+@cancellable
+def bulk_update_branches(repo_path: str, branches: Optional[List[str]] = None, base_branch: str = None,
+                         strategy: str | None = None, max_workers: Optional[int] = None,
+                         push: bool = True) -> List[BranchUpdateResult]:
+    """Atualiza várias branches com a base sem checkout no diretório de trabalho.
+
+    Args:
+        repo_path: caminho do repositório
+        branches: branches a atualizar (None = todas as locais feature/*)
+        base_branch: branch base (se None, detecta develop/main/master)
+        strategy: "rebase" ou "merge" (None = padrão do usuário)
+        max_workers: worktrees simultâneos (None = min(4, CPUs))
+        push: envia as branches atualizadas num único push com --force-with-lease
+        cancel_token: CancellationToken opcional
+        on_progress: callback opcional que recebe ProgressEvent por branch concluída
+
+    Returns:
+        Lista de BranchUpdateResult, na ordem das branches.
+    """
+    strategy = strategy or get_default_strategy()
+    if strategy not in {"rebase", "merge"}:
+        raise GitCommandError(f"Strategy inválida: {strategy}. Use 'rebase' ou 'merge'.")
+    if branches is None:
+        branches = list_feature_branches(repo_path)
+    if not base_branch:
+        base_branch = _get_default_base_branch(repo_path)
+    branches = [b for b in branches if b != base_branch]
+    if not branches:
+        return []
+
+    logger.info(f"Atualizando {len(branches)} branch(es) sobre '{base_branch}' ({strategy})...")
+    results: Dict[str, BranchUpdateResult] = {}
+
+    # Branches checadas em algum worktree (inclusive o do usuário) não são tocadas
+    checked_out = get_checked_out_branches(repo_path)
+    for branch in branches:
+        if branch in checked_out:
+            results[branch] = BranchUpdateResult(
+                branch, STATUS_SKIPPED, f"checada em {checked_out[branch]}; use 'Atualizar Branch'"
+            )
+    pending = [b for b in branches if b not in results]
+
+    # Um único fetch para a base e todas as branches
+    planner = FetchPlanner(repo_path).add(base_branch)
+    for branch in pending:
+        planner.add(branch, optional=True)
+    fetch_result = planner.execute()
+    remote_shas = {}
+    for branch in pending:
+        if branch in fetch_result.available:
+            remote_shas[branch] = _rev_parse(repo_path, f"refs/remotes/origin/{branch}")
+        else:
+            remote_shas[branch] = ""
+    base_ref = f"origin/{base_branch}"
+
+    workers = max_workers or min(4, os.cpu_count() or 1)
+    workdir = tempfile.mkdtemp(prefix="bulk_update_")
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-update") as pool:
+            # copy_context: cada worker herda o escopo de cancelamento/progresso e o span atual
+            futures = {
+                pool.submit(contextvars.copy_context().run, _update_in_worktree,
+                            repo_path, workdir, branch, base_ref, strategy): branch
+                for branch in pending
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                branch = futures[future]
+                try:
+                    results[branch] = future.result()
+                except GitCommandCancelled:
+                    for f in futures:
+                        f.cancel()
+                    raise
+                except GitCommandError as e:
+                    results[branch] = BranchUpdateResult(branch, STATUS_ERROR, str(e))
+                report_progress("Atualizando branches", done * 100 // len(pending),
+                                f"{branch}: {results[branch].status}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        try:
+            run_git_command(repo_path, ["worktree", "prune"])
+        except GitCommandError:
+            logger.debug("Falha ao executar 'git worktree prune'.")
+
+    # Um único push para todas as branches reescritas
+    updated = [b for b in pending if results[b].status == STATUS_UPDATED]
+    if push and updated:
+        batch = PushBatch(repo_path)
+        for branch in updated:
+            batch.add(branch, expected=remote_shas[branch], set_upstream=True)
+        # Refs rejeitadas por falha transitória são repetidas pelo próprio lote
+        try:
+            refs = batch.flush()
+        except (GitCommandCancelled, GitCommandTimeout):
+            raise
+        except GitCommandError as e:
+            # Autenticação / remoto inválido: nenhuma branch foi enviada
+            reason = (str(e).strip().splitlines() or ["falha no push"])[-1]
+            refs = [PushRefResult("!", f"refs/heads/{b}", f"refs/heads/{b}", "[rejected]", reason)
+                    for b in updated]
+        for ref in refs:
+            if ref.branch in results and not ref.ok:
+                results[ref.branch] = results[ref.branch]._replace(
+                    status=STATUS_REJECTED, detail=ref.reason or ref.summary
+                )
+
+    ordered = [results[b] for b in branches]
+    summary = ", ".join(f"{s}: {sum(1 for r in ordered if r.status == s)}"
+                        for s in dict.fromkeys(r.status for r in ordered))
+    logger.info(f"✅ Atualização em lote concluída ({summary})")
+    return ordered
@@ -1,16 +1,60 @@
+import os
+from typing import List
 from core.git_operations import run_git_command, get_current_branch, GitCommandError
 from core.logger_config import get_logger
+from core.status import summarize_status
+from core.tracing import traced
+from core.cancellation import cancellable
 
 logger = get_logger()
 
 
+# Marcadores que o git deixa nos arquivos em conflito ("=======" ocupa a linha inteira)
+_CONFLICT_MARKERS = ("<<<<<<< ", ">>>>>>> ")
+
+
+def _unresolved_conflicts(repo_path: str) -> List[str]:
+    """Arquivos em conflito no índice que ainda têm marcadores de conflito."""
+    raw = run_git_command(repo_path, ["diff", "--name-only", "--diff-filter=U", "-z"])
+    unresolved = []
+    for path in filter(None, raw.split("\0")):
+        try:
+            with open(os.path.join(repo_path, path), encoding="utf-8", errors="replace") as f:
+                if any(line.startswith(_CONFLICT_MARKERS) or line.rstrip("\r\n") == "=======" for line in f):
+                    unresolved.append(path)
+        except OSError:
+            continue    # removido na resolução: o `git add` registra a remoção
+    return unresolved
+
+
+def _stage_all(repo_path: str) -> int:
+    """
+    Confere o status e faz `git add .`; retorna o nº de arquivos.
+
+    Conflitos já resolvidos à mão (sem marcadores) são preparados e o commit
+    conclui o merge/rebase, como o `git add .` + commit faria.
+    """
+    summary = summarize_status(repo_path)
+    if summary.clean:
+        raise GitCommandError("Nada para commitar: o diretório de trabalho está limpo.")
+    if summary.conflicted:
+        unresolved = _unresolved_conflicts(repo_path)
+        if unresolved:
+            raise GitCommandError(
+                "⚠️ Resolva os conflitos antes do commit:\n" + "\n".join(unresolved)
+            )
+    run_git_command(repo_path, ["add", "."])
+    return summary.changed + summary.untracked + summary.conflicted
+
+
+@traced()
 def commit_changes(repo_path: str, message: str) -> str:
     """Realiza apenas o commit."""
     try:
         logger.info(f"Realizando commit com mensagem: '{message}'...")
-        run_git_command(repo_path, ["add", "."])
+        files = _stage_all(repo_path)
         run_git_command(repo_path, ["commit", "-m", message])
-        msg = f"Commit realizado: {message}"
+        msg = f"Commit realizado: {message} ({files} arquivo(s))"
         logger.info(msg)
         return msg
     except Exception as e:
@@ -18,6 +62,8 @@ def commit_changes(repo_path: str, message: str) -> str:
         raise GitCommandError(f"Erro no commit: {e}")
 
 
+@traced()
+@cancellable
 def commit_and_push(repo_path: str, message: str) -> str:
     """Realiza commit e push.
 
@@ -27,7 +73,7 @@ def commit_and_push(repo_path: str, message: str) -> str:
     try:
         logger.info(f"Realizando commit + push com mensagem: '{message}'...")
         branch = get_current_branch(repo_path)
-        run_git_command(repo_path, ["add", "."])
+        _stage_all(repo_path)
         run_git_command(repo_path, ["commit", "-m", message])
 
         # Tentar push normal primeiro
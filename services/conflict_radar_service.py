@@ -0,0 +1,131 @@
+"""
+Radar de conflitos: para cada branch de feature local, indica se ela
+conflitaria com origin/<base> e quais arquivos seriam afetados.
+
+Usa `merge-tree --write-tree` (core.merge_engine), em paralelo, com
+resultado memorizado por par (branch_sha, base_sha). A cada atualização só
+as branches cujas refs mudaram são recalculadas.
+"""
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from core.cancellation import cancellable, report_progress
+from core.fetch_planner import FetchPlanner
+from core.git_operations import run_git_command
+from core.logger_config import get_logger
+from core.merge_engine import conflicts_between, supports_strategy, MergeEngineUnavailable
+from core.tracing import traced
+from services.branch_service import _get_default_base_branch
+
+logger = get_logger()
+
+
+class ConflictRadarEntry(NamedTuple):
+    """Linha do radar: situação de uma branch em relação à base."""
+    branch: str
+    branch_sha: str
+    base_sha: str
+    conflicts: Tuple[str, ...]
+
+    @property
+    def conflicting(self) -> bool:
+        return bool(self.conflicts)
+
+    @property
+    def status(self) -> str:
+        return "conflito" if self.conflicts else "sem conflito"
+
+
+class ConflictRadar:
+    """
+    Matriz de conflitos de um repositório, atualizada de forma incremental.
+
+    Uso:
+        radar = ConflictRadar(repo, base_branch="develop")
+        entries = radar.refresh()          # calcula tudo
+        entries = radar.refresh()          # só recalcula branches que mudaram
+    """
+
+    def __init__(self, repo_path: str, base_branch: Optional[str] = None, prefix: str = "feature/",
+                 max_workers: Optional[int] = None, remote: str = "origin"):
+        self.repo_path = repo_path
+        self.base_branch = base_branch
+        self.prefix = prefix
+        self.remote = remote
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._entries: Dict[str, ConflictRadarEntry] = {}
+        self.last_recomputed: List[str] = []
+
+    @property
+    def entries(self) -> List[ConflictRadarEntry]:
+        """Entradas atuais: branches em conflito primeiro, depois por nome."""
+        return sorted(self._entries.values(), key=lambda e: (not e.conflicting, e.branch))
+
+    def _snapshot(self) -> Tuple[str, Dict[str, str]]:
+        """SHA da base e das branches locais num único for-each-ref."""
+        base_ref = f"refs/remotes/{self.remote}/{self.base_branch}"
+        raw = run_git_command(self.repo_path, [
+            "for-each-ref", "--format=%(objectname) %(refname)", f"refs/heads/{self.prefix}", base_ref,
+        ])
+        base_sha, branches = "", {}
+        for line in raw.splitlines():
+            sha, _, ref = line.partition(" ")
+            if ref == base_ref:
+                base_sha = sha
+            elif ref.startswith("refs/heads/"):
+                branches[ref[len("refs/heads/"):]] = sha
+        return base_sha, branches
+
+    @traced("ConflictRadar.refresh")
+    @cancellable
+    def refresh(self, fetch: bool = True) -> List[ConflictRadarEntry]:
+        """
+        Atualiza o radar e retorna as entradas.
+
+        Args:
+            fetch: busca origin/<base> antes (respeitando a janela de frescor do FetchPlanner)
+            cancel_token / on_progress: cancelamento e progresso (ver core.cancellation)
+
+        Raises:
+            MergeEngineUnavailable: git sem suporte a merge-tree --write-tree.
+        """
+        if not supports_strategy("merge"):
+            raise MergeEngineUnavailable("O radar de conflitos requer git >= 2.38 (merge-tree --write-tree).")
+        if not self.base_branch:
+            self.base_branch = _get_default_base_branch(self.repo_path)
+        if fetch:
+            FetchPlanner(self.repo_path, self.remote).add(self.base_branch).execute()
+
+        base_sha, branches = self._snapshot()
+        branches.pop(self.base_branch, None)
+        if not base_sha:
+            raise MergeEngineUnavailable(f"Ref {self.remote}/{self.base_branch} não encontrada.")
+
+        # Remove branches que sumiram; recalcula só as que mudaram (ou se a base andou)
+        for branch in list(self._entries):
+            if branch not in branches:
+                del self._entries[branch]
+        stale = [
+            b for b, sha in branches.items()
+            if b not in self._entries or self._entries[b].branch_sha != sha or self._entries[b].base_sha != base_sha
+        ]
+        self.last_recomputed = stale
+
+        if stale:
+            logger.info(f"Radar de conflitos: analisando {len(stale)} branch(es) contra '{self.base_branch}'...")
+            repo_key = str(self.repo_path)
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="conflict-radar") as pool:
+                # copy_context: workers herdam cancelamento/progresso e o span atual
+                futures = [
+                    pool.submit(contextvars.copy_context().run, conflicts_between, repo_key, base_sha, branches[b])
+                    for b in stale
+                ]
+                for done, (branch, future) in enumerate(zip(stale, futures), start=1):
+                    conflicts = future.result()
+                    self._entries[branch] = ConflictRadarEntry(branch, branches[branch], base_sha, conflicts)
+                    report_progress("Radar de conflitos", done * 100 // len(stale), branch)
+
+        conflicting = sum(1 for e in self._entries.values() if e.conflicting)
+        logger.info(f"Radar de conflitos: {conflicting} de {len(self._entries)} branch(es) com conflito.")
+        return self.entries
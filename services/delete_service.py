@@ -1,9 +1,106 @@
-from core.git_operations import run_git_command, GitCommandError
+from typing import Dict, Iterable, List, NamedTuple, Tuple, Union
+from core.git_operations import get_checked_out_branches, run_git_command, run_git_command_with_status, GitCommandError
+from core.logger_config import get_logger
+from core.fetch_planner import invalidate_fetched
+from core.push import chunk_args, delete_remote_branches
+from core.tracing import traced
+from services.branch_service import get_protected_branches
 
+logger = get_logger()
 
+# Sempre protegidas, além das configuradas e da branch padrão do remoto
+ALWAYS_PROTECTED = {"main", "master", "develop"}
+
+
+class BranchDeleteResult(NamedTuple):
+    """Resultado da deleção de uma branch."""
+    branch: str
+    deleted: bool
+    detail: str = ""   # SHA removido (permite recriar a branch) ou motivo da falha
+
+
+class RemoteDeletePlan(NamedTuple):
+    """Plano (--dry-run) da deleção de todas as branches remotas."""
+    branches: Tuple[str, ...]   # seriam deletadas
+    rejected: Tuple[str, ...]   # recusadas pelo remoto, com o motivo
+
+    @property
+    def would_delete(self) -> bool:
+        """Há alguma branch a deletar (pedir confirmação)."""
+        return bool(self.branches)
+
+
+def _protected(repo_path: str) -> set:
+    return ALWAYS_PROTECTED | set(get_protected_branches(repo_path))
+
+
+def _local_heads(repo_path: str) -> Dict[str, str]:
+    """branch -> SHA de todas as branches locais (um único for-each-ref)."""
+    raw = run_git_command(repo_path, ["for-each-ref", "--format=%(objectname) %(refname:lstrip=2)", "refs/heads"])
+    heads = {}
+    for line in raw.splitlines():
+        sha, _, name = line.partition(" ")
+        if name:
+            heads[name] = sha
+    return heads
+
+
+@traced()
+def delete_local_branches(repo_path: str, branches: Iterable[str], force: bool = True) -> List[BranchDeleteResult]:
+    """
+    Deleta várias branches locais em lote (`git branch -D a b c ...` por bloco).
+
+    Cada chamada remove as refs numa única transação (uma reescrita do
+    packed-refs) e limpa a configuração [branch "x"]. O resultado por branch
+    vem da comparação das refs antes/depois, sem depender do idioma do git.
+
+    Args:
+        branches: nomes curtos (ex.: feature/x)
+        force: -D (padrão) ou -d (recusa branches não mescladas)
+
+    Returns:
+        Um BranchDeleteResult por branch, na ordem recebida. Protegidas,
+        inexistentes e checadas em algum worktree não são tocadas.
+    """
+    branches = list(dict.fromkeys(branches))
+    if not branches:
+        return []
+    protected = _protected(repo_path)
+    checked_out = get_checked_out_branches(repo_path)
+    before = _local_heads(repo_path)
+
+    results: Dict[str, BranchDeleteResult] = {}
+    for branch in branches:
+        if branch in protected:
+            results[branch] = BranchDeleteResult(branch, False, "protegida")
+        elif branch in checked_out:
+            results[branch] = BranchDeleteResult(branch, False, f"checada em {checked_out[branch]}")
+        elif branch not in before:
+            results[branch] = BranchDeleteResult(branch, False, "não existe")
+    pending = [b for b in branches if b not in results]
+
+    errors: List[str] = []
+    for chunk in chunk_args(pending):
+        result = run_git_command_with_status(repo_path, ["branch", "-D" if force else "-d", "--"] + chunk)
+        errors += [line for line in result.stderr.splitlines() if line.strip()]
+
+    after = _local_heads(repo_path) if pending else before
+    for branch in pending:
+        if branch not in after:
+            results[branch] = BranchDeleteResult(branch, True, before[branch])
+        else:
+            reason = next((line for line in errors if f"'{branch}'" in line), "não removida")
+            results[branch] = BranchDeleteResult(branch, False, reason)
+
+    deleted = sum(1 for r in results.values() if r.deleted)
+    logger.info(f"🗑️ {deleted} de {len(branches)} branch(es) local(is) removida(s).")
+    return [results[b] for b in branches]
+
+
+@traced()
 def delete_local_branch(repo_path: str, branch: str) -> str:
     """Deleta uma branch local específica."""
-    if branch in {"main", "master", "develop"}:
+    if branch in _protected(repo_path):
         raise GitCommandError(f"⚠️ A branch '{branch}' é protegida e não pode ser deletada.")
     try:
         run_git_command(repo_path, ["branch", "-D", branch])
@@ -12,18 +109,13 @@ def delete_local_branch(repo_path: str, branch: str) -> str:
         raise GitCommandError(f"Erro ao deletar branch local '{branch}': {e}")
 
 
+@traced()
 def delete_all_local_branches(repo_path: str) -> str:
     """Deleta todas as branches locais, exceto as protegidas."""
     try:
-        raw = run_git_command(repo_path, ["branch"]).splitlines()
-        locals_ = [b.replace("*", "").strip() for b in raw if b.strip()]
-        protegidas = {"main", "master", "develop"}
-        deletadas = []
-
-        for br in locals_:
-            if br not in protegidas:
-                run_git_command(repo_path, ["branch", "-D", br])
-                deletadas.append(br)
+        protegidas = _protected(repo_path)
+        locals_ = [b for b in _local_heads(repo_path) if b not in protegidas]
+        deletadas = [r.branch for r in delete_local_branches(repo_path, locals_) if r.deleted]
 
         if deletadas:
             return f"🧹 Branches locais deletadas: {', '.join(deletadas)}"
@@ -33,9 +125,10 @@ def delete_all_local_branches(repo_path: str) -> str:
         raise GitCommandError(f"Erro ao deletar todas as branches locais: {e}")
 
 
+@traced()
 def delete_remote_branch(repo_path: str, branch: str) -> str:
     """Deleta uma branch remota."""
-    if branch in {"main", "master", "develop"}:
+    if branch in _protected(repo_path):
         raise GitCommandError(f"⚠️ '{branch}' é protegida e não pode ser deletada.")
     try:
         run_git_command(repo_path, ["push", "origin", "--delete", branch])
@@ -44,25 +137,50 @@ def delete_remote_branch(repo_path: str, branch: str) -> str:
         raise GitCommandError(f"Erro ao deletar branch remota '{branch}': {e}")
 
 
-def delete_all_remote_branches(repo_path: str) -> str:
-    """Deleta todas as branches remotas, exceto as protegidas."""
+def _remote_heads(repo_path: str, remote: str = "origin") -> Dict[str, str]:
+    """branch -> SHA das refs de rastreamento do remoto (um único for-each-ref)."""
+    prefix = f"refs/remotes/{remote}/"
+    raw = run_git_command(repo_path, ["for-each-ref", "--format=%(objectname) %(refname)", prefix.rstrip("/")])
+    heads = {}
+    for line in raw.splitlines():
+        sha, _, ref = line.partition(" ")
+        if ref.startswith(prefix) and ref != f"{prefix}HEAD":
+            heads[ref[len(prefix):]] = sha
+    return heads
+
+
+@traced()
+def delete_all_remote_branches(repo_path: str, dry_run: bool = False,
+                               atomic: bool = False) -> Union[str, RemoteDeletePlan]:
+    """
+    Deleta todas as branches remotas, exceto as protegidas, em pushes
+    multi-refspec (core.push.delete_remote_branches).
+
+    Cada branch só é removida se o remoto ainda estiver no SHA conhecido
+    localmente (--force-with-lease). Com dry_run=True nada é alterado e o
+    retorno é um RemoteDeletePlan (a formatação fica com quem exibe).
+    """
     try:
-        raw = run_git_command(repo_path, ["branch", "-r"]).splitlines()
-        remotas = [b.strip().replace("origin/", "") for b in raw if "origin/" in b and "HEAD" not in b]
-        protegidas = {"main", "master", "develop"}
-        deletadas = []
-
-        for br in remotas:
-            if br not in protegidas:
-                try:
-                    run_git_command(repo_path, ["push", "origin", "--delete", br])
-                    deletadas.append(br)
-                except Exception as e:
-                    print(f"⚠️ Não foi possível deletar '{br}': {e}")
+        protegidas = _protected(repo_path)
+        remotas = {b: sha for b, sha in _remote_heads(repo_path).items() if b not in protegidas}
+        if not remotas:
+            if dry_run:
+                return RemoteDeletePlan((), ())
+            return "Nenhuma branch remota deletada (todas protegidas)."
+
+        refs = delete_remote_branches(repo_path, list(remotas), expected=remotas, atomic=atomic, dry_run=dry_run)
+        deletadas = [r.branch for r in refs if r.ok]
+        rejeitadas = [f"{r.branch} ({r.reason or r.summary})" for r in refs if not r.ok]
+        if dry_run:
+            return RemoteDeletePlan(tuple(deletadas), tuple(rejeitadas))
 
         if deletadas:
-            return f"🧹 Branches remotas deletadas: {', '.join(deletadas)}"
+            invalidate_fetched(repo_path, deletadas)
+            msg = f"🧹 Branches remotas deletadas: {', '.join(deletadas)}"
         else:
-            return "Nenhuma branch remota deletada (todas protegidas)."
+            msg = "Nenhuma branch remota deletada."
+        if rejeitadas:
+            msg += f"\n⚠️ Não deletadas: {', '.join(rejeitadas)}"
+        return msg
     except Exception as e:
         raise GitCommandError(f"Erro ao deletar todas as branches remotas: {e}")
@@ -2,11 +2,14 @@
 Operações de Pull Request via GitHub API.
 Autenticação segura via GitHub CLI (gh) ou Git Credential Manager.
 """
+import time
 import requests
 from pathlib import Path
 from core.logger_config import get_logger
 from utils.repo_utils import get_repo_info
 from core.github_auth import get_github_token, GitHubAuthError
+from core.tracing import span
+from core.metrics import get_metrics
 
 logger = get_logger()
 
@@ -52,7 +55,18 @@ def create_pull_request(repo_path: Path, base: str, compare: str, title: str) ->
             "Accept": "application/vnd.github+json"
         }
 
-        response = requests.post(url, headers=headers, json=data)
+        start = time.perf_counter()
+        response = None
+        try:
+            with span("POST /pulls", kind="http", url=url) as s:
+                response = requests.post(url, headers=headers, json=data)
+                s.set(status=response.status_code, output_bytes=len(response.content or b""))
+        finally:
+            # Exceções (rede, timeout) também são registradas, como falha
+            failed = response is None or response.status_code >= 400
+            output_bytes = len(response.content or b"") if response is not None else 0
+            get_metrics().observe("http", "POST /pulls", repo_path, time.perf_counter() - start,
+                                  output_bytes, failed)
 
         if response.status_code in (200, 201):
             pr_url = response.json().get("html_url", "")
@@ -1,8 +1,10 @@
 from services.pr_operations import create_pull_request
 from services.branch_service import validate_pr_ready
 from core.git_operations import merge_pull_request, GitCommandError
+from core.tracing import traced
 
 
+@traced()
 def create_pr(repo_path: str, base: str, compare: str, title: str) -> str:
     """
     Cria um Pull Request no GitHub.
@@ -18,6 +20,7 @@ def create_pr(repo_path: str, base: str, compare: str, title: str) -> str:
         raise GitCommandError(f"Erro ao criar PR: {e}")
 
 
+@traced()
 def merge_pr(repo_path: str, pr_number: int) -> str:
     """
     Faz o merge de um Pull Request existente no GitHub.
@@ -1,6 +1,8 @@
 from core.git_operations import rollback_last_commit, discard_local_changes, GitCommandError
+from core.tracing import traced
 
 
+@traced()
 def rollback_commit(repo_path: str, soft: bool = True) -> str:
     """Desfaz o último commit."""
     try:
@@ -12,6 +14,7 @@ def rollback_commit(repo_path: str, soft: bool = True) -> str:
         raise GitCommandError(f"Erro ao realizar rollback de commit: {e}")
 
 
+@traced()
 def rollback_changes(repo_path: str) -> str:
     """Desfaz alterações locais não commitadas."""
     try:
@@ -1,10 +1,18 @@
-from typing import List
-from core.git_operations import run_git_command, GitCommandError
+from typing import Iterator, List, NamedTuple, Tuple
+from core.dirty_check import REASON_UNTRACKED, check_dirty
+from core.git_operations import iter_git_records, run_git_command, GitCommandCancelled, GitCommandError
 from core.logger_config import get_logger
+from core.status import summarize_status
+from core.tracing import traced
 
 logger = get_logger()
 
+# Paginação do navegador de stashes: stashes por página e linhas do patch por página
+STASH_PAGE_SIZE = 50
+PATCH_PAGE_LINES = 2000
 
+
+@traced()
 def stash_save(repo_path: str, message: str = None) -> str:
     """
     Salva as alterações locais em um stash.
@@ -20,19 +28,31 @@ def stash_save(repo_path: str, message: str = None) -> str:
         logger.info(f"Salvando alterações em stash...")
 
         # Verificar se há alterações para salvar
-        status = run_git_command(repo_path, ["status", "--porcelain"])
-        if not status.strip():
+        state = check_dirty(repo_path)
+        if not state.dirty:
             msg = "Não há alterações para salvar no stash."
             logger.info(msg)
             return msg
+        if state.reason == REASON_UNTRACKED:
+            # `git stash` sem -u ignora arquivos não rastreados
+            msg = "Apenas arquivos não rastreados; nada a salvar no stash."
+            logger.info(msg)
+            return msg
+
+        # Só os rastreados importam aqui: sem varredura de não rastreados
+        summary = summarize_status(repo_path, untracked="no")
+        if summary.conflicted:
+            raise GitCommandError(
+                "Arquivos em conflito não podem ir para o stash:\n" + "\n".join(summary.conflicts)
+            )
 
         # Salvar stash com ou sem mensagem
         if message:
             run_git_command(repo_path, ["stash", "save", message])
-            msg = f"💾 Stash salvo: '{message}'"
+            msg = f"💾 Stash salvo: '{message}' ({summary.changed} arquivo(s))"
         else:
             run_git_command(repo_path, ["stash"])
-            msg = "💾 Stash salvo com sucesso."
+            msg = f"💾 Stash salvo com sucesso ({summary.changed} arquivo(s))."
 
         logger.info(msg)
         return msg
@@ -64,6 +84,7 @@ def stash_list(repo_path: str) -> List[str]:
         raise GitCommandError(f"Erro ao listar stashes: {e}")
 
 
+@traced()
 def stash_apply(repo_path: str, stash_ref: str = "stash@{0}") -> str:
     """
     Aplica um stash sem removê-lo da lista.
@@ -86,6 +107,7 @@ def stash_apply(repo_path: str, stash_ref: str = "stash@{0}") -> str:
         raise GitCommandError(f"Erro ao aplicar stash '{stash_ref}': {e}")
 
 
+@traced()
 def stash_pop(repo_path: str, stash_ref: str = "stash@{0}") -> str:
     """
     Aplica um stash e o remove da lista.
@@ -108,6 +130,7 @@ def stash_pop(repo_path: str, stash_ref: str = "stash@{0}") -> str:
         raise GitCommandError(f"Erro ao aplicar/remover stash '{stash_ref}': {e}")
 
 
+@traced()
 def stash_drop(repo_path: str, stash_ref: str = "stash@{0}") -> str:
     """
     Remove um stash específico sem aplicá-lo.
@@ -130,6 +153,7 @@ def stash_drop(repo_path: str, stash_ref: str = "stash@{0}") -> str:
         raise GitCommandError(f"Erro ao remover stash '{stash_ref}': {e}")
 
 
+@traced()
 def stash_clear(repo_path: str) -> str:
     """
     Remove todos os stashes salvos.
@@ -175,3 +199,97 @@ def stash_show(repo_path: str, stash_ref: str = "stash@{0}") -> str:
         logger.error(f"Erro ao mostrar stash: {e}")
         raise GitCommandError(f"Erro ao mostrar stash '{stash_ref}': {e}")
 
+
+class StashEntry(NamedTuple):
+    """Stash com metadados e resumo do --numstat (em relação ao commit de origem)."""
+    ref: str                # stash@{n}
+    sha: str
+    timestamp: int
+    message: str
+    files: Tuple[str, ...]
+    insertions: int
+    deletions: int
+
+
+class StashPage(NamedTuple):
+    entries: List[StashEntry]
+    has_more: bool
+
+
+def _parse_stash_record(record: str) -> StashEntry:
+    """Registro do `stash list -z --numstat`: cabeçalho (campos separados por 0x1f), NUL e o numstat."""
+    header, _, numstat = record.partition("\0")
+    ref, sha, timestamp, message = header.split("\x1f", 3)
+    tokens = numstat.lstrip("\n").split("\0")
+    files, insertions, deletions = [], 0, 0
+    i = 0
+    while i < len(tokens):
+        added, _, rest = tokens[i].partition("\t")
+        removed, _, path = rest.partition("\t")
+        i += 1
+        if not added:
+            continue
+        if not path and i + 1 < len(tokens):
+            # Renomeação com -z: caminho antigo e novo nos dois registros seguintes
+            path = tokens[i + 1]
+            i += 2
+        files.append(path)
+        # Binários aparecem como "-"
+        insertions += int(added) if added.isdigit() else 0
+        deletions += int(removed) if removed.isdigit() else 0
+    return StashEntry(ref, sha, int(timestamp or 0), message, tuple(files), insertions, deletions)
+
+
+def list_stashes(repo_path: str, offset: int = 0, limit: int = STASH_PAGE_SIZE) -> StashPage:
+    """
+    Uma página de stashes com metadados (--format) e resumo (--numstat).
+
+    Args:
+        offset: quantos stashes pular (os mais recentes vêm primeiro)
+        limit: tamanho da página
+
+    Returns:
+        StashPage(entries, has_more)
+    """
+    try:
+        # \x1e marca o início de cada stash; a saída é lida em stream
+        records = iter_git_records(repo_path, [
+            "stash", "list", "-z", "--numstat", "-M", f"--skip={offset}", f"-n{limit + 1}",
+            "--format=%x1e%gd%x1f%H%x1f%ct%x1f%gs",
+        ], sep=b"\x1e", encoding="fs")
+        entries = [_parse_stash_record(r) for r in records if r]
+        logger.info(f"Stashes {offset + 1}-{offset + min(len(entries), limit)} carregados.")
+        return StashPage(entries[:limit], len(entries) > limit)
+    except Exception as e:
+        logger.error(f"Erro ao listar stashes: {e}")
+        raise GitCommandError(f"Erro ao listar stashes: {e}")
+
+
+def iter_stash_patch(repo_path: str, stash_ref: str = "stash@{0}",
+                     page_lines: int = PATCH_PAGE_LINES) -> Iterator[List[str]]:
+    """
+    Patch de um stash em páginas de linhas, lidas do git sob demanda.
+
+    O git só produz a próxima página quando ela é pedida (o pipe enche e o
+    processo espera); fechar o gerador encerra o `git stash show`. Sem tempo
+    limite: as páginas seguem o ritmo do usuário; o cancelamento vem do token
+    ativo na primeira página.
+    """
+    records = iter_git_records(repo_path, ["stash", "show", "-p", "--no-color", stash_ref],
+                               sep=b"\n", encoding="utf-8", timeout=0)
+    page = []
+    try:
+        for line in records:
+            page.append(line)
+            if len(page) >= page_lines:
+                yield page
+                page = []
+        if page:
+            yield page
+    except GitCommandCancelled:
+        raise
+    except GitCommandError as e:
+        logger.error(f"Erro ao mostrar stash: {e}")
+        raise GitCommandError(f"Erro ao mostrar stash '{stash_ref}': {e}")
+    finally:
+        records.close()
@@ -1,6 +1,7 @@
 """
 Configuração central de testes e fixtures compartilhadas.
 """
+import subprocess
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -50,3 +51,76 @@ def isolated_environment(tmp_path, monkeypatch):
     monkeypatch.chdir(tmp_path)
     return tmp_path
 
+
+def _git(cwd, *args):
+    result = subprocess.run(["git", "-C", str(cwd)] + list(args), check=True, capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def git_env(monkeypatch, tmp_path):
+    """Identidade fixa para commits criados nos testes (sem depender do ~/.gitconfig)."""
+    for key, value in {
+        "GIT_AUTHOR_NAME": "Teste",
+        "GIT_AUTHOR_EMAIL": "teste@example.com",
+        "GIT_COMMITTER_NAME": "Teste",
+        "GIT_COMMITTER_EMAIL": "teste@example.com",
+        "GIT_CONFIG_NOSYSTEM": "1",
+        "HOME": str(tmp_path),
+    }.items():
+        monkeypatch.setenv(key, value)
+
+
+@pytest.fixture
+def git_repo(tmp_path, git_env):
+    """
+    Repositório Git real com um remoto 'origin' (bare) e branch 'main'.
+
+    Retorna um objeto com .path, .origin e .git(*args) para executar comandos.
+    """
+    origin = tmp_path / "origin.git"
+    work = tmp_path / "work"
+    _git(tmp_path, "init", "-q", "--bare", "-b", "main", str(origin))
+    _git(tmp_path, "clone", "-q", str(origin), str(work))
+    _git(work, "checkout", "-q", "-B", "main")
+    (work / "README.md").write_text("base\n", encoding="utf-8")
+    _git(work, "add", ".")
+    _git(work, "commit", "-q", "-m", "inicial")
+    _git(work, "push", "-q", "-u", "origin", "main")
+
+    class Repo:
+        path = str(work)
+
+        def git(self, *args):
+            return _git(work, *args)
+
+        def commit_file(self, name, content, message=None):
+            (work / name).parent.mkdir(parents=True, exist_ok=True)
+            (work / name).write_text(content, encoding="utf-8")
+            _git(work, "add", name)
+            _git(work, "commit", "-q", "-m", message or f"altera {name}")
+            return _git(work, "rev-parse", "HEAD")
+
+    repo = Repo()
+    repo.origin = str(origin)
+    return repo
+
+
+@pytest.fixture
+def remote_commit(git_repo, tmp_path):
+    """Publica commits no origin a partir de outro clone (simula colegas).
+
+    Uso: sha = remote_commit("develop", "arquivo.txt")
+    """
+    other = tmp_path / "outro"
+    _git(tmp_path, "clone", "-q", git_repo.origin, str(other))
+
+    def push(branch, name):
+        _git(other, "checkout", "-q", "-B", branch, "origin/main")
+        (other / name).write_text(name, encoding="utf-8")
+        _git(other, "add", name)
+        _git(other, "commit", "-q", "-m", f"adiciona {name}")
+        _git(other, "push", "-q", "-f", "origin", branch)
+        return _git(other, "rev-parse", "HEAD")
+
+    return push
@@ -0,0 +1,88 @@
+"""
+Testes para o analisador de branches (mesclada / squash / inativa / ativa).
+"""
+import pytest
+import services.branch_analyzer_service
+from services.branch_analyzer_service import (
+    analyze_branches,
+    merge_bases,
+    STATUS_MERGED,
+    STATUS_SQUASHED,
+    STATUS_STALE,
+    STATUS_ACTIVE,
+)
+
+
+@pytest.fixture
+def cleanup_repo(git_repo, monkeypatch):
+    """main com uma branch mesclada, uma squash, uma antiga e uma ativa."""
+    git_repo.git("checkout", "-q", "-b", "feature/merged")
+    git_repo.commit_file("m.txt", "m")
+    git_repo.git("checkout", "-q", "-b", "feature/sq", "main")
+    git_repo.commit_file("s1.txt", "1")
+    git_repo.commit_file("s2.txt", "2")
+    git_repo.git("push", "-q", "origin", "feature/sq")
+
+    monkeypatch.setenv("GIT_AUTHOR_DATE", "2020-01-01T12:00:00")
+    monkeypatch.setenv("GIT_COMMITTER_DATE", "2020-01-01T12:00:00")
+    git_repo.git("checkout", "-q", "-b", "feature/old", "main")
+    git_repo.commit_file("o.txt", "o")
+    monkeypatch.delenv("GIT_AUTHOR_DATE")
+    monkeypatch.delenv("GIT_COMMITTER_DATE")
+
+    git_repo.git("checkout", "-q", "-b", "feature/active", "main")
+    git_repo.commit_file("a.txt", "a")
+
+    git_repo.git("checkout", "-q", "main")
+    git_repo.git("merge", "-q", "--ff-only", "feature/merged")
+    git_repo.git("merge", "-q", "--squash", "feature/sq")
+    git_repo.git("commit", "-q", "-m", "squash feature/sq")
+    git_repo.git("push", "-q", "origin", "main")
+    return git_repo
+
+
+def test_classifies_local_and_remote_branches(cleanup_repo):
+    results = analyze_branches(cleanup_repo.path, base_branch="main", stale_days=30)
+    by_name = {r.name: r for r in results}
+
+    assert by_name["feature/merged"].status == STATUS_MERGED
+    assert by_name["feature/sq"].status == STATUS_SQUASHED
+    assert by_name["origin/feature/sq"].status == STATUS_SQUASHED
+    assert by_name["feature/old"].status == STATUS_STALE
+    assert by_name["feature/active"].status == STATUS_ACTIVE
+    # Protegidas e a base ficam de fora; candidatas à limpeza vêm primeiro
+    assert "main" not in by_name and "origin/main" not in by_name
+    assert results[-1].name == "feature/active"
+
+
+def test_local_only(cleanup_repo):
+    results = analyze_branches(cleanup_repo.path, base_branch="main", include_remote=False)
+    assert all(not r.remote for r in results)
+    assert {r.branch for r in results} == {"feature/merged", "feature/sq", "feature/old", "feature/active"}
+
+
+def test_merge_bases_single_walk(git_repo, monkeypatch):
+    """Merge-bases de várias pontas num único rev-list, iguais aos do `git merge-base`."""
+    git_repo.git("checkout", "-q", "-b", "feature/a")
+    git_repo.commit_file("a.txt", "a")
+    git_repo.git("checkout", "-q", "-b", "feature/remerge", "main")
+    git_repo.commit_file("r1.txt", "1")
+    git_repo.git("checkout", "-q", "main")
+    git_repo.commit_file("m1.txt", "m")
+    git_repo.git("checkout", "-q", "feature/remerge")
+    git_repo.git("merge", "-q", "--no-edit", "main")     # base mesclada na branch
+    git_repo.commit_file("r2.txt", "2")
+    git_repo.git("checkout", "-q", "main")
+    git_repo.commit_file("m2.txt", "m")
+
+    base = git_repo.git("rev-parse", "main")
+    tips = [git_repo.git("rev-parse", b) for b in ("feature/a", "feature/remerge", "main~1")]
+    commands = []
+    original = services.branch_analyzer_service.run_git_command_with_status
+    monkeypatch.setattr(services.branch_analyzer_service, "run_git_command_with_status",
+                        lambda repo, cmd, **kw: commands.append(cmd) or original(repo, cmd, **kw))
+
+    bases = merge_bases(git_repo.path, base, tips)
+
+    assert bases == {tip: git_repo.git("merge-base", base, tip) for tip in tips}
+    assert [cmd[0] for cmd in commands].count("rev-list") == 1
@@ -51,8 +51,9 @@ class TestBranchService(unittest.TestCase):
         self.assertIn("main", branches)
         self.assertIn("feature/new", branches)
 
+    @patch('core.fetch_planner.run_git_command')
     @patch('services.branch_service.run_git_command')
-    def test_create_branch(self, mock_run_git):
+    def test_create_branch(self, mock_run_git, mock_fetch_run):
         """Testa criação de nova branch."""
         mock_run_git.return_value = "Switched to a new branch 'feature/test'"
 
@@ -70,25 +71,26 @@ class TestBranchService(unittest.TestCase):
         self.assertIn("✅", result)
 
     @patch('services.branch_service.run_git_command')
-    def test_safe_checkout_with_changes(self, mock_run_git):
+    @patch('services.branch_service.summarize_status')
+    @patch('services.branch_service.is_dirty', return_value=True)
+    def test_safe_checkout_with_changes(self, mock_dirty, mock_summary, mock_run_git):
         """Testa safe_checkout que rejeita mudanças não commitadas."""
-        mock_run_git.return_value = " M file.py\n"  # Arquivo modificado
+        mock_summary.return_value.describe.return_value = ".M file.py"
 
-        with self.assertRaises(GitCommandError):
+        with self.assertRaises(GitCommandError) as cm:
             safe_checkout(self.test_repo_path, "develop")
+        self.assertIn(".M file.py", str(cm.exception))
+        mock_run_git.assert_not_called()
 
     @patch('services.branch_service.run_git_command')
-    def test_safe_checkout_no_changes(self, mock_run_git):
+    @patch('services.branch_service.is_dirty', return_value=False)
+    def test_safe_checkout_no_changes(self, mock_dirty, mock_run_git):
         """Testa safe_checkout sem mudanças."""
-        # Primeira chamada: status vazio
-        # Segunda chamada: checkout bem-sucedido
-        mock_run_git.side_effect = [
-            "",  # status clean
-            "Switched to branch 'develop'"
-        ]
+        mock_run_git.return_value = "Switched to branch 'develop'"
 
         result = safe_checkout(self.test_repo_path, "develop")
         self.assertIn("sucesso", result)
+        mock_run_git.assert_called_once_with(self.test_repo_path, ["checkout", "develop"])
 
 
 class TestBranchServiceErrors(unittest.TestCase):
@@ -0,0 +1,65 @@
+"""
+Testes para a atualização em lote via worktrees temporários.
+"""
+import pytest
+from services.bulk_update_service import (
+    bulk_update_branches,
+    STATUS_UPDATED,
+    STATUS_UP_TO_DATE,
+    STATUS_CONFLICT,
+    STATUS_SKIPPED,
+)
+
+
+@pytest.fixture
+def feature_repo(git_repo, remote_commit):
+    """Repositório com develop no remoto e branches de feature publicadas."""
+    remote_commit("develop", "d.txt")
+    git_repo.git("fetch", "-q", "origin")
+    for name, path in [("feature/a", "a.txt"), ("feature/b", "b.txt"), ("feature/c", "d2.txt")]:
+        git_repo.git("checkout", "-q", "-b", name, "origin/develop")
+        git_repo.commit_file(path, name)
+        git_repo.git("push", "-q", "-u", "origin", name)
+    git_repo.git("checkout", "-q", "main")
+    # develop avança depois das features (d2.txt conflita com feature/c)
+    remote_commit("develop", "d2.txt")
+    return git_repo
+
+
+def test_bulk_update_rebases_without_touching_checkout(feature_repo):
+    """Branches são rebaseadas e enviadas; o checkout do usuário não muda."""
+    head_before = feature_repo.git("rev-parse", "HEAD")
+
+    results = bulk_update_branches(
+        feature_repo.path, ["feature/a", "feature/b", "feature/c"], base_branch="develop", strategy="rebase"
+    )
+
+    by_branch = {r.branch: r for r in results}
+    assert [r.branch for r in results] == ["feature/a", "feature/b", "feature/c"]
+    assert by_branch["feature/a"].status == STATUS_UPDATED
+    assert by_branch["feature/b"].status == STATUS_UPDATED
+    assert by_branch["feature/c"].status == STATUS_CONFLICT
+
+    develop = feature_repo.git("rev-parse", "origin/develop")
+    for branch in ("feature/a", "feature/b"):
+        remote_sha = feature_repo.git("ls-remote", "origin", f"refs/heads/{branch}").split()[0]
+        assert remote_sha == by_branch[branch].new_sha
+        feature_repo.git("merge-base", "--is-ancestor", develop, remote_sha)
+    # Conflito: ref local intacta
+    assert feature_repo.git("rev-parse", "feature/c") == by_branch["feature/c"].old_sha
+
+    assert feature_repo.git("rev-parse", "--abbrev-ref", "HEAD") == "main"
+    assert feature_repo.git("rev-parse", "HEAD") == head_before
+    assert feature_repo.git("status", "--porcelain") == ""
+    assert len(feature_repo.git("worktree", "list").splitlines()) == 1
+
+
+def test_bulk_update_skips_checked_out_and_current(feature_repo):
+    """Branch checada no worktree do usuário é ignorada; branch em dia não é reescrita."""
+    feature_repo.git("checkout", "-q", "feature/a")
+
+    first = bulk_update_branches(feature_repo.path, ["feature/a", "feature/b"], base_branch="develop")
+    assert {r.branch: r.status for r in first} == {"feature/a": STATUS_SKIPPED, "feature/b": STATUS_UPDATED}
+
+    second = bulk_update_branches(feature_repo.path, ["feature/b"], base_branch="develop", push=False)
+    assert second[0].status == STATUS_UP_TO_DATE
@@ -0,0 +1,73 @@
+"""
+Testes para cancelamento, progresso e tempo limite de comandos Git.
+"""
+import subprocess
+import sys
+import time
+import pytest
+from core.cancellation import (
+    CancellationToken,
+    operation_scope,
+    cancellable,
+    current_token,
+    popen_group_kwargs,
+)
+from core.git_operations import run_git_command, GitCommandCancelled
+
+
+def test_cancel_kills_registered_process_group():
+    """cancel() encerra o processo (e o grupo) registrado no token."""
+    token = CancellationToken()
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"], **popen_group_kwargs())
+    token.register_process(proc)
+
+    start = time.monotonic()
+    token.cancel()
+    proc.wait(timeout=5)
+
+    assert token.cancelled
+    assert time.monotonic() - start < 5
+
+
+def test_cancelled_token_stops_git_command(mock_subprocess):
+    """Com o token já cancelado, nenhum comando Git é executado."""
+    token = CancellationToken()
+    token.cancel()
+
+    with operation_scope(token):
+        with pytest.raises(GitCommandCancelled):
+            run_git_command("/tmp/test_repo", ["status"])
+    mock_subprocess.assert_not_called()
+
+
+def test_cancellable_decorator_sets_and_inherits_scope():
+    token = CancellationToken()
+
+    @cancellable
+    def service():
+        return current_token()
+
+    assert service(cancel_token=token) is token
+    with operation_scope(token):
+        assert service() is token
+    assert service() is None
+
+
+def test_progress_events_are_streamed(git_repo, tmp_path):
+    """Clone/fetch emitem eventos de progresso a partir do stderr (--progress)."""
+    events = []
+    with operation_scope(on_progress=events.append):
+        run_git_command(str(tmp_path), ["clone", f"file://{git_repo.origin}", "copia"])
+
+    stages = {e.stage for e in events}
+    assert "Receiving objects" in stages
+    assert any(e.percent == 100 for e in events)
+    assert (tmp_path / "copia" / "README.md").exists()
+
+
+def test_network_command_timeout(git_repo):
+    """Comandos de rede respeitam o tempo limite e encerram o processo."""
+    from core.git_operations import GitCommandTimeout
+
+    with pytest.raises(GitCommandTimeout):
+        run_git_command(git_repo.path, ["fetch", "origin"], timeout=0.001)
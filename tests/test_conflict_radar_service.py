@@ -0,0 +1,54 @@
+"""
+Testes para o radar de conflitos (matriz branch x base).
+"""
+from unittest.mock import patch
+import pytest
+from core.merge_engine import conflicts_between, supports_strategy
+from services.conflict_radar_service import ConflictRadar
+
+pytestmark = pytest.mark.skipif(not supports_strategy("merge"), reason="requer git >= 2.38")
+
+
+@pytest.fixture
+def radar_repo(git_repo, remote_commit):
+    """develop com c.txt; feature/ok sem conflito e feature/conflito alterando c.txt."""
+    remote_commit("develop", "c.txt")
+    git_repo.git("checkout", "-q", "-b", "feature/ok", "main")
+    git_repo.commit_file("ok.txt", "ok")
+    git_repo.git("checkout", "-q", "-b", "feature/conflito", "main")
+    git_repo.commit_file("c.txt", "outro conteúdo")
+    git_repo.git("checkout", "-q", "main")
+    return git_repo
+
+
+def test_radar_lists_conflicting_branches_first(radar_repo):
+    """Branches em conflito aparecem primeiro, com os arquivos afetados."""
+    entries = ConflictRadar(radar_repo.path, base_branch="develop").refresh()
+
+    assert [(e.branch, e.conflicts) for e in entries] == [
+        ("feature/conflito", ("c.txt",)),
+        ("feature/ok", ()),
+    ]
+
+
+def test_radar_refresh_is_incremental(radar_repo):
+    """Só a branch cujo SHA mudou é recalculada; branches removidas somem."""
+    radar = ConflictRadar(radar_repo.path, base_branch="develop")
+    radar.refresh()
+    assert sorted(radar.last_recomputed) == ["feature/conflito", "feature/ok"]
+
+    radar.refresh(fetch=False)
+    assert radar.last_recomputed == []
+
+    radar_repo.git("checkout", "-q", "feature/ok")
+    radar_repo.commit_file("ok2.txt", "ok2")
+    radar_repo.git("checkout", "-q", "main")
+    radar_repo.git("branch", "-D", "feature/conflito")
+    conflicts_between.cache_clear()
+
+    with patch("services.conflict_radar_service.conflicts_between", wraps=conflicts_between) as spy:
+        entries = radar.refresh(fetch=False)
+
+    assert radar.last_recomputed == ["feature/ok"]
+    assert spy.call_count == 1
+    assert [e.branch for e in entries] == ["feature/ok"]
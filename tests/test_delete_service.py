@@ -0,0 +1,71 @@
+"""
+Testes para a deleção de branches locais em lote.
+"""
+from services.delete_service import delete_local_branches, delete_all_local_branches, delete_all_remote_branches
+
+
+def test_delete_local_branches_reports_each_branch(git_repo):
+    shas = {}
+    for name in ["feature/a", "feature/b", "feature/c"]:
+        git_repo.git("branch", name)
+        shas[name] = git_repo.git("rev-parse", name)
+    git_repo.git("config", "branch.feature/a.remote", "origin")
+
+    results = delete_local_branches(git_repo.path, ["feature/a", "main", "feature/nao-existe", "feature/b"])
+
+    by_branch = {r.branch: r for r in results}
+    assert [r.branch for r in results] == ["feature/a", "main", "feature/nao-existe", "feature/b"]
+    assert by_branch["feature/a"].deleted and by_branch["feature/a"].detail == shas["feature/a"]
+    assert by_branch["feature/b"].deleted
+    assert not by_branch["main"].deleted and by_branch["main"].detail == "protegida"
+    assert not by_branch["feature/nao-existe"].deleted
+    remaining = git_repo.git("for-each-ref", "--format=%(refname:short)", "refs/heads").splitlines()
+    assert sorted(remaining) == ["feature/c", "main"]
+    # branch -D também remove a seção [branch "feature/a"] do config
+    assert "branch.feature/a" not in git_repo.git("config", "--list")
+
+
+def test_delete_local_branches_skips_checked_out(git_repo):
+    git_repo.git("checkout", "-q", "-b", "feature/atual")
+    results = delete_local_branches(git_repo.path, ["feature/atual"])
+    assert not results[0].deleted
+    assert results[0].detail.startswith("checada em")
+
+
+def test_delete_local_branches_in_chunks(git_repo, monkeypatch):
+    import core.push
+    monkeypatch.setattr(core.push, "MAX_ARGS_CHARS", 30)
+    names = [f"feature/lote{i}" for i in range(10)]
+    for name in names:
+        git_repo.git("branch", name)
+
+    results = delete_local_branches(git_repo.path, names)
+    assert all(r.deleted for r in results)
+
+
+def test_delete_all_local_branches_keeps_protected_and_current(git_repo):
+    git_repo.git("branch", "feature/x")
+    git_repo.git("checkout", "-q", "-b", "feature/atual")
+    msg = delete_all_local_branches(git_repo.path)
+    assert "feature/x" in msg
+    remaining = git_repo.git("for-each-ref", "--format=%(refname:short)", "refs/heads").splitlines()
+    assert sorted(remaining) == ["feature/atual", "main"]
+
+
+def test_delete_all_remote_branches_plan_then_delete(git_repo):
+    for name in ["feature/x", "feature/y", "develop"]:
+        git_repo.git("push", "-q", "origin", f"main:refs/heads/{name}")
+    git_repo.git("fetch", "-q", "origin")
+
+    plan = delete_all_remote_branches(git_repo.path, dry_run=True)
+    assert plan.would_delete
+    assert sorted(plan.branches) == ["feature/x", "feature/y"] and plan.rejected == ()
+    assert "feature/x" in git_repo.git("ls-remote", "origin")
+
+    msg = delete_all_remote_branches(git_repo.path)
+    assert "feature/x" in msg and "feature/y" in msg
+    remaining = git_repo.git("ls-remote", "--heads", "origin").splitlines()
+    assert sorted(line.split("\t")[1] for line in remaining) == ["refs/heads/develop", "refs/heads/main"]
+
+    plan = delete_all_remote_branches(git_repo.path, dry_run=True)
+    assert not plan.would_delete and plan.branches == ()
@@ -0,0 +1,74 @@
+"""
+Testes para a verificação de alterações locais com saída antecipada.
+"""
+import os
+from unittest.mock import patch
+import pytest
+import core.dirty_check
+from core.dirty_check import (
+    check_dirty, invalidate_dirty, is_dirty, REASON_STAGED, REASON_UNSTAGED, REASON_UNTRACKED,
+)
+from services.branch_service import safe_checkout
+from core.git_operations import GitCommandError
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    invalidate_dirty()
+    yield
+    invalidate_dirty()
+
+
+def _write(repo, name, content):
+    with open(os.path.join(repo.path, name), "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _commands(spy):
+    return [c.args[1][:2] for c in spy.call_args_list]
+
+
+def test_clean_tree_runs_all_steps(git_repo):
+    with patch("core.dirty_check.run_git_command_with_status",
+               wraps=core.dirty_check.run_git_command_with_status) as spy:
+        assert check_dirty(git_repo.path).dirty is False
+    assert _commands(spy) == [["diff", "--quiet"], ["diff", "--cached"], ["ls-files", "--others"]]
+
+
+def test_unstaged_change_stops_at_first_step(git_repo):
+    _write(git_repo, "README.md", "alterado\n")
+    with patch("core.dirty_check.run_git_command_with_status",
+               wraps=core.dirty_check.run_git_command_with_status) as spy:
+        assert check_dirty(git_repo.path).reason == REASON_UNSTAGED
+    assert _commands(spy) == [["diff", "--quiet"]]
+
+
+def test_staged_and_untracked(git_repo):
+    _write(git_repo, "novo.txt", "x")
+    assert check_dirty(git_repo.path).reason == REASON_UNTRACKED
+    assert check_dirty(git_repo.path, untracked="no").dirty is False
+
+    git_repo.git("add", "novo.txt")
+    # O índice mudou: o cache é descartado
+    assert check_dirty(git_repo.path).reason == REASON_STAGED
+
+
+def test_repeated_checks_are_cached(git_repo):
+    is_dirty(git_repo.path)
+    with patch("core.dirty_check.run_git_command_with_status") as spy:
+        assert is_dirty(git_repo.path) is False
+    spy.assert_not_called()
+
+
+def test_untracked_mode_from_settings(git_repo):
+    _write(git_repo, "novo.txt", "x")
+    with patch("core.dirty_check.get_untracked_check", return_value="no"):
+        assert is_dirty(git_repo.path) is False
+
+
+def test_safe_checkout_blocks_untracked_files(git_repo):
+    git_repo.git("branch", "outra")
+    _write(git_repo, "novo.txt", "x")
+    with pytest.raises(GitCommandError):
+        safe_checkout(git_repo.path, "outra")
+    assert git_repo.git("rev-parse", "--abbrev-ref", "HEAD") == "main"
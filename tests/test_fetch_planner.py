@@ -0,0 +1,77 @@
+"""
+Testes para o planejador de fetch (um único `git fetch` com refspecs explícitos).
+"""
+from unittest.mock import patch
+import pytest
+from core.fetch_planner import FetchPlanner, invalidate_fetched
+from core.git_operations import GitCommandError, run_git_command
+
+
+def test_single_fetch_for_all_branches(git_repo, remote_commit):
+    """Base e branch de trabalho chegam num único processo git fetch."""
+    remote_commit("develop", "d.txt")
+    sha = remote_commit("feature/x", "x.txt")
+
+    with patch("core.fetch_planner.run_git_command", wraps=run_git_command) as run:
+        result = FetchPlanner(git_repo.path).add("develop").add("feature/x", optional=True).execute()
+
+    fetches = [c.args[1] for c in run.call_args_list if c.args[1][0] == "fetch"]
+    assert len(fetches) == 1
+    assert set(result.fetched) == {"develop", "feature/x"}
+    assert result.updated["feature/x"] == ("", sha)
+    assert git_repo.git("rev-parse", "refs/remotes/origin/feature/x") == sha
+
+
+def test_fresh_refs_are_skipped(git_repo, remote_commit):
+    """Dentro da janela de frescor nenhum fetch é repetido."""
+    remote_commit("develop", "d.txt")
+    FetchPlanner(git_repo.path).add("develop").execute()
+
+    with patch("core.fetch_planner.run_git_command") as run:
+        result = FetchPlanner(git_repo.path).add("develop").execute()
+
+    run.assert_not_called()
+    assert result.skipped == ("develop",)
+    assert "develop" in result.available
+
+
+def test_reports_only_changed_refs(git_repo, remote_commit):
+    """updated lista apenas refs que mudaram; invalidate_fetched força nova busca."""
+    remote_commit("develop", "d.txt")
+    FetchPlanner(git_repo.path).add("main").add("develop").execute()
+
+    new_sha = remote_commit("develop", "d2.txt")
+    invalidate_fetched(git_repo.path, ["main", "develop"])
+    result = FetchPlanner(git_repo.path).add("main").add("develop").execute()
+
+    assert list(result.updated) == ["develop"]
+    assert result.updated["develop"][1] == new_sha
+
+
+def test_missing_optional_branch_is_dropped(git_repo):
+    """Branch opcional inexistente no remoto não impede o fetch das demais."""
+    result = FetchPlanner(git_repo.path).add("main").add("feature/nova", optional=True).execute()
+
+    assert result.fetched == ("main",)
+    assert result.missing == ("feature/nova",)
+    assert "feature/nova" not in result.available
+
+
+def test_missing_optional_branch_under_translated_locale(git_repo, monkeypatch):
+    """O fetch roda com LC_ALL=C: a ref ausente é reconhecida mesmo com o sistema em pt_BR."""
+    monkeypatch.setenv("LANG", "pt_BR.UTF-8")
+    monkeypatch.setenv("LANGUAGE", "pt_BR")
+    monkeypatch.setenv("LC_ALL", "pt_BR.UTF-8")
+
+    with patch("core.fetch_planner.run_git_command", wraps=run_git_command) as run:
+        result = FetchPlanner(git_repo.path).add("main").add("feature/nova", optional=True).execute()
+
+    fetch_envs = [c.kwargs.get("env") for c in run.call_args_list if c.args[1][0] == "fetch"]
+    assert fetch_envs and all(env == {"LC_ALL": "C"} for env in fetch_envs)
+    assert result.missing == ("feature/nova",)
+
+
+def test_missing_required_branch_raises(git_repo):
+    """Branch obrigatória inexistente propaga o erro do git."""
+    with pytest.raises(GitCommandError):
+        FetchPlanner(git_repo.path).add("nao-existe").execute()
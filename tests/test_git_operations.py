@@ -52,23 +52,23 @@ class TestGitOperations(unittest.TestCase):
         branch = get_current_branch(self.test_repo_path)
         self.assertEqual(branch, "feature/new-feature")
 
-    @patch('core.git_operations.run_git_command')
-    def test_get_default_main_branch_via_symbolic_ref(self, mock_run_git):
-        """Testa detecção de branch principal via symbolic-ref."""
-        mock_run_git.return_value = "refs/remotes/origin/main"
+    @patch('core.topology.run_git_command')
+    def test_get_default_main_branch_via_remote_head(self, mock_run_git):
+        """Testa detecção de branch principal pelo HEAD do remoto (origin/HEAD)."""
+        mock_run_git.return_value = (
+            "refs/remotes/origin/HEAD refs/remotes/origin/trunk\n"
+            "refs/remotes/origin/main \n"
+            "refs/remotes/origin/trunk \n"
+        )
 
         branch = get_default_main_branch(self.test_repo_path)
-        self.assertEqual(branch, "main")
+        self.assertEqual(branch, "trunk")
+        mock_run_git.assert_called_once()
 
-    @patch('core.git_operations.run_git_command')
+    @patch('core.topology.run_git_command')
     def test_get_default_main_branch_fallback(self, mock_run_git):
-        """Testa fallback de detecção de branch principal."""
-        # Primeira chamada (symbolic-ref) falha
-        # Segunda chamada retorna lista de branches
-        mock_run_git.side_effect = [
-            GitCommandError("error"),
-            "  origin/main\n  origin/develop\n"
-        ]
+        """Testa fallback de detecção de branch principal (sem origin/HEAD)."""
+        mock_run_git.return_value = "refs/remotes/origin/develop \nrefs/remotes/origin/main \n"
 
         branch = get_default_main_branch(self.test_repo_path)
         self.assertEqual(branch, "main")
@@ -0,0 +1,53 @@
+"""
+Testes para o logging assíncrono (QueueHandler/QueueListener).
+"""
+import logging
+import logging.handlers
+import pytest
+from core import logger_config
+from core.logger_config import setup_logging, get_ui_handler, UILogHandler
+
+
+@pytest.fixture
+def configured_logger(isolated_environment):
+    """Configura o logging num diretório temporário e desfaz ao final."""
+    logger = setup_logging()
+    yield logger
+    logger_config._stop_listener()
+    for name in ("git_automation", "git_automation.trace"):
+        configured = logging.getLogger(name)
+        for handler in list(configured.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                configured.removeHandler(handler)
+    logging.getLogger("git_automation.trace").setLevel(logging.NOTSET)
+
+
+def test_logger_only_has_queue_handler(configured_logger):
+    """As threads chamadoras só enfileiram; nenhum handler de arquivo direto."""
+    handlers = configured_logger.handlers
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in handlers)
+    assert not any(isinstance(h, logging.FileHandler) for h in handlers)
+
+
+def test_setup_logging_is_idempotent(configured_logger):
+    """Chamar setup_logging novamente não duplica handlers."""
+    before = len(configured_logger.handlers)
+    setup_logging()
+    assert len(configured_logger.handlers) == before
+
+
+def test_records_reach_ui_and_file(configured_logger, isolated_environment):
+    """Mensagens chegam ao handler de UI e ao arquivo após o listener drenar a fila."""
+    ui_handler = get_ui_handler()
+    assert isinstance(ui_handler, UILogHandler)
+
+    configured_logger.info("mensagem %s", "formatada")
+    configured_logger.debug("debug %d", 42)
+    logger_config._stop_listener()
+
+    assert any("mensagem formatada" in line for line in ui_handler.get_logs())
+    # UI recebe apenas INFO+
+    assert not any("debug 42" in line for line in ui_handler.get_logs())
+    content = (isolated_environment / "logs" / "git_automation.log").read_text(encoding="utf-8")
+    assert "mensagem formatada" in content
+    assert "debug 42" in content
@@ -0,0 +1,322 @@
+"""
+Testes para o motor de sincronização sem checkout (merge-tree/commit-tree/update-ref).
+"""
+import os
+import subprocess
+from unittest.mock import patch
+import pytest
+from core import merge_engine
+from core.git_operations import GitCommandError
+from core.merge_engine import (
+    conflicted_paths,
+    conflicts_between,
+    overlapping_paths,
+    OVERLAP_WARNING_STAGE,
+    merge_tree,
+    merge_branch,
+    rebase_branch,
+    supports_strategy,
+    MergeEngineUnavailable,
+)
+from services.branch_service import _can_sync_without_checkout, resolve_conflict, update_branch, validate_pr_ready
+
+
+@pytest.fixture
+def diverged_repo(git_repo, remote_commit):
+    """feature/x (local, não checada) e origin/develop divergentes a partir de main."""
+    remote_commit("develop", "d.txt")
+    git_repo.git("fetch", "-q", "origin")
+    git_repo.git("branch", "feature/x", "main")
+    git_repo.git("checkout", "-q", "feature/x")
+    git_repo.commit_file("x.txt", "x")
+    git_repo.git("push", "-q", "-u", "origin", "feature/x")
+    git_repo.git("checkout", "-q", "main")
+    return git_repo
+
+
+def _assert_checkout_untouched(repo, head):
+    assert repo.git("rev-parse", "--abbrev-ref", "HEAD") == "main"
+    assert repo.git("rev-parse", "HEAD") == head
+    assert repo.git("status", "--porcelain") == ""
+
+
+def test_merge_tree_reports_conflicts(git_repo):
+    """merge-tree devolve a árvore e os arquivos em conflito."""
+    git_repo.git("checkout", "-q", "-b", "a")
+    git_repo.commit_file("f.txt", "a")
+    git_repo.git("checkout", "-q", "-b", "b", "main")
+    git_repo.commit_file("f.txt", "b")
+
+    result = merge_tree(git_repo.path, "a", "b")
+
+    assert not result.clean
+    assert result.conflicts == ("f.txt",)
+    assert len(result.tree) == 40
+
+
+def test_merge_branch_without_checkout(diverged_repo):
+    """Merge cria commit com dois pais sem alterar índice/diretório de trabalho."""
+    head = diverged_repo.git("rev-parse", "HEAD")
+
+    result = merge_branch(diverged_repo.path, "feature/x", "origin/develop")
+
+    assert result.changed and result.method == "merge-tree"
+    parents = diverged_repo.git("rev-list", "--parents", "-n", "1", "feature/x").split()[1:]
+    assert parents == [result.old_sha, diverged_repo.git("rev-parse", "origin/develop")]
+    assert diverged_repo.git("show", "feature/x:d.txt") == "d.txt"
+    _assert_checkout_untouched(diverged_repo, head)
+
+    # Segunda execução: nada a fazer
+    assert merge_branch(diverged_repo.path, "feature/x", "origin/develop").method == "up-to-date"
+
+
+def test_merge_branch_conflict_keeps_ref(git_repo, remote_commit):
+    """Com conflito a ref não é alterada."""
+    remote_commit("develop", "c.txt")
+    git_repo.git("fetch", "-q", "origin")
+    git_repo.git("checkout", "-q", "-b", "feature/c", "main")
+    old = git_repo.commit_file("c.txt", "outro conteúdo")
+    git_repo.git("checkout", "-q", "main")
+
+    result = merge_branch(git_repo.path, "feature/c", "origin/develop")
+
+    assert result.conflicts == ("c.txt",)
+    assert git_repo.git("rev-parse", "feature/c") == old
+
+
+def test_merge_branch_fast_forward(git_repo, remote_commit):
+    """Branch atrás da base avança sem commit de merge."""
+    develop = remote_commit("develop", "d.txt")
+    git_repo.git("fetch", "-q", "origin")
+    git_repo.git("branch", "feature/ff", "main")
+
+    result = merge_branch(git_repo.path, "feature/ff", "origin/develop")
+
+    assert result.method == "fast-forward"
+    assert git_repo.git("rev-parse", "feature/ff") == develop
+
+
+def test_rebase_requires_merge_base_support(diverged_repo):
+    """Em git < 2.40 o rebase sem checkout não está disponível."""
+    with patch.object(merge_engine, "git_version", return_value=(2, 39, 0)):
+        assert not supports_strategy("rebase")
+        with pytest.raises(MergeEngineUnavailable):
+            rebase_branch(diverged_repo.path, "feature/x", "origin/develop")
+
+
+@pytest.mark.skipif(not supports_strategy("rebase"), reason="requer git >= 2.40")
+def test_rebase_branch_without_checkout(diverged_repo):
+    """Rebase reaplica os commits sobre a base preservando a autoria."""
+    head = diverged_repo.git("rev-parse", "HEAD")
+
+    result = rebase_branch(diverged_repo.path, "feature/x", "origin/develop")
+
+    assert result.changed
+    assert diverged_repo.git("rev-parse", "feature/x~1") == diverged_repo.git("rev-parse", "origin/develop")
+    assert diverged_repo.git("log", "-1", "--format=%an %s", "feature/x") == "Teste altera x.txt"
+    _assert_checkout_untouched(diverged_repo, head)
+
+
+@pytest.fixture
+def orphan_repo(git_repo):
+    """Branch `orphan` com história própria (commit raiz), sem relação com main."""
+    git_repo.git("checkout", "-q", "--orphan", "orphan")
+    git_repo.git("rm", "-rfq", ".")
+    git_repo.commit_file("o.txt", "o")
+    git_repo.git("checkout", "-q", "main")
+    return git_repo
+
+
+def test_replay_root_commit_uses_empty_base(orphan_repo):
+    """Commit raiz não tem pai: a base do merge-tree é um commit com a árvore vazia."""
+    bases = []
+
+    def fake_merge_tree(repo, ours, theirs, merge_base=None):
+        bases.append(merge_base)
+        return merge_engine.MergeTreeResult("", ("o.txt",), "")
+
+    with patch.object(merge_engine, "merge_tree", side_effect=fake_merge_tree):
+        _, conflicts = merge_engine._replay_commits(orphan_repo.path, orphan_repo.git("rev-parse", "orphan"),
+                                                    orphan_repo.git("rev-parse", "main"))
+
+    assert conflicts == ("o.txt",)
+    empty_tree = orphan_repo.git("hash-object", "-t", "tree", "/dev/null")
+    assert orphan_repo.git("rev-parse", f"{bases[0]}^{{tree}}") == empty_tree
+    assert orphan_repo.git("rev-list", "--parents", "-1", bases[0]) == bases[0]
+
+
+@pytest.mark.skipif(not supports_strategy("rebase"), reason="requer git >= 2.40")
+def test_rebase_orphan_branch_without_checkout(orphan_repo):
+    result = rebase_branch(orphan_repo.path, "orphan", "main")
+
+    assert result.changed and not result.conflicts
+    assert orphan_repo.git("rev-parse", "orphan~1") == orphan_repo.git("rev-parse", "main")
+    assert orphan_repo.git("show", "orphan:o.txt") == "o"
+
+
+def _read_tree_merge(repo_path, ours, theirs, merge_base=None):
+    """merge-tree --merge-base emulado com read-tree num índice temporário (qualquer versão do git)."""
+    env = dict(os.environ, GIT_INDEX_FILE=os.path.join(repo_path, ".git", "index.teste"))
+
+    def git(*args):
+        return subprocess.run(["git", "-C", repo_path, *args], env=env, capture_output=True, text=True)
+
+    git("read-tree", "-m", "-i", "--aggressive", merge_base, ours, theirs)
+    unmerged = git("ls-files", "-u").stdout
+    tree = git("write-tree").stdout.strip()
+    os.remove(env["GIT_INDEX_FILE"])
+    conflicts = tuple(dict.fromkeys(line.split("\t", 1)[1] for line in unmerged.splitlines()))
+    return merge_engine.MergeTreeResult("" if conflicts else tree, conflicts, "")
+
+
+def test_rebase_commit_by_commit_fallback(diverged_repo):
+    """Sem git replay, os commits são reaplicados um a um (merge-tree --merge-base + commit-tree)."""
+    diverged_repo.git("checkout", "-q", "feature/x")
+    diverged_repo.commit_file("y.txt", "y")
+    diverged_repo.git("checkout", "-q", "main")
+    head = diverged_repo.git("rev-parse", "HEAD")
+
+    with patch.object(merge_engine, "git_version", return_value=(2, 40, 0)), \
+            patch.object(merge_engine, "merge_tree", side_effect=_read_tree_merge):
+        result = rebase_branch(diverged_repo.path, "feature/x", "origin/develop")
+
+    assert result.method == "merge-tree-replay" and result.changed
+    assert diverged_repo.git("rev-parse", "feature/x~2") == diverged_repo.git("rev-parse", "origin/develop")
+    assert diverged_repo.git("log", "--format=%an %s", "-2", "feature/x").splitlines() == [
+        "Teste altera y.txt", "Teste altera x.txt",
+    ]
+    assert diverged_repo.git("ls-tree", "--name-only", "feature/x").split() == ["README.md", "d.txt", "x.txt", "y.txt"]
+    _assert_checkout_untouched(diverged_repo, head)
+
+
+def test_rebase_commit_by_commit_conflict_keeps_ref(git_repo, remote_commit):
+    remote_commit("develop", "c.txt")
+    git_repo.git("fetch", "-q", "origin")
+    git_repo.git("branch", "feature/c", "main")
+    git_repo.git("checkout", "-q", "feature/c")
+    old = git_repo.commit_file("c.txt", "outro conteúdo")
+    git_repo.git("checkout", "-q", "main")
+
+    with patch.object(merge_engine, "git_version", return_value=(2, 40, 0)), \
+            patch.object(merge_engine, "merge_tree", side_effect=_read_tree_merge):
+        result = rebase_branch(git_repo.path, "feature/c", "origin/develop")
+
+    assert result.conflicts == ("c.txt",)
+    assert git_repo.git("rev-parse", "feature/c") == old
+
+
+def test_sync_skips_branch_checked_out_in_linked_worktree(diverged_repo, tmp_path):
+    """Branch checada em outro worktree não é movida por update-ref."""
+    assert _can_sync_without_checkout(diverged_repo.path, "feature/x", "merge")
+
+    diverged_repo.git("worktree", "add", str(tmp_path / "linked"), "feature/x")
+
+    assert not _can_sync_without_checkout(diverged_repo.path, "feature/x", "merge")
+
+
+def test_update_branch_merge_without_checkout(diverged_repo):
+    """update_branch numa branch não checada não faz checkout e envia o merge."""
+    head = diverged_repo.git("rev-parse", "HEAD")
+
+    msg = update_branch(diverged_repo.path, "feature/x", base_branch="develop", strategy="merge")
+
+    assert "sincronizada" in msg
+    _assert_checkout_untouched(diverged_repo, head)
+    remote_sha = diverged_repo.git("ls-remote", "origin", "refs/heads/feature/x").split()[0]
+    assert remote_sha == diverged_repo.git("rev-parse", "feature/x")
+    diverged_repo.git("merge-base", "--is-ancestor", "origin/develop", "feature/x")
+
+
+def test_conflicted_paths_is_memoized_by_sha_pair(git_repo, remote_commit):
+    """Mesmo par de SHAs não executa merge-tree de novo."""
+    remote_commit("develop", "c.txt")
+    git_repo.git("fetch", "-q", "origin")
+    git_repo.git("checkout", "-q", "-b", "feature/c", "main")
+    git_repo.commit_file("c.txt", "outro conteúdo")
+
+    assert conflicted_paths(git_repo.path, "origin/develop", "feature/c") == ("c.txt",)
+    with patch("core.merge_engine.merge_tree") as mocked:
+        assert conflicted_paths(git_repo.path, "origin/develop", "feature/c") == ("c.txt",)
+    mocked.assert_not_called()
+
+    # Nova ref (novo SHA) é recalculada
+    git_repo.git("rm", "-q", "c.txt")
+    git_repo.git("commit", "-q", "-m", "remove c")
+    git_repo.git("merge", "-q", "origin/develop")
+    assert conflicted_paths(git_repo.path, "origin/develop", "feature/c") == ()
+
+
+def test_validate_pr_ready_lists_conflicted_paths(git_repo, remote_commit):
+    """validate_pr_ready informa os arquivos em conflito, mesmo com a branch também desatualizada."""
+    remote_commit("develop", "c.txt")
+    git_repo.git("checkout", "-q", "-b", "feature/c", "main")
+    git_repo.commit_file("c.txt", "outro conteúdo")
+
+    with pytest.raises(GitCommandError) as exc:
+        validate_pr_ready(git_repo.path, "develop", "feature/c")
+
+    assert "Conflito" in str(exc.value)
+    assert "c.txt" in str(exc.value)
+
+
+def test_validate_pr_ready_outdated_without_conflict(diverged_repo):
+    """Sem conflito, a branch que não contém a base é recusada como desatualizada."""
+    with pytest.raises(GitCommandError) as exc:
+        validate_pr_ready(diverged_repo.path, "develop", "feature/x")
+
+    assert "desatualizada" in str(exc.value)
+    assert "Conflito" not in str(exc.value)
+
+
+def test_path_overlap_disjoint_skips_merge_tree(diverged_repo):
+    """Sem caminhos em comum, conflicts_between não executa o merge-tree."""
+    overlap = overlapping_paths(diverged_repo.path, "feature/x", "origin/develop")
+    assert overlap.disjoint
+    assert overlap.ours == {"x.txt"} and overlap.theirs == {"d.txt"}
+
+    conflicts_between.cache_clear()
+    with patch("core.merge_engine.merge_tree") as mocked:
+        assert conflicted_paths(diverged_repo.path, "origin/develop", "feature/x") == ()
+    mocked.assert_not_called()
+
+
+def test_path_overlap_detects_file_directory_clash(git_repo):
+    """Arquivo de um lado que é diretório do outro também conta como sobreposição."""
+    git_repo.git("checkout", "-q", "-b", "a")
+    git_repo.commit_file("docs", "arquivo")
+    git_repo.git("checkout", "-q", "-b", "b", "main")
+    git_repo.commit_file("docs/guia.md", "guia")
+
+    overlap = overlapping_paths(git_repo.path, "a", "b")
+
+    assert not overlap.disjoint
+    assert overlap.overlap == ("docs",)
+
+
+def test_update_branch_warns_overlapping_paths_early(git_repo, remote_commit):
+    """update_branch avisa os arquivos sobrepostos antes de tentar o merge."""
+    remote_commit("develop", "c.txt")
+    git_repo.git("checkout", "-q", "-b", "feature/c", "main")
+    git_repo.commit_file("c.txt", "outro conteúdo")
+    git_repo.git("push", "-q", "-u", "origin", "feature/c")
+    git_repo.git("checkout", "-q", "main")
+    events = []
+
+    with pytest.raises(GitCommandError):
+        update_branch(git_repo.path, "feature/c", base_branch="develop", strategy="merge", on_progress=events.append)
+
+    warnings = [e for e in events if e.stage == OVERLAP_WARNING_STAGE]
+    assert len(warnings) == 1 and "c.txt" in warnings[0].message
+
+
+def test_resolve_conflict_disjoint_paths_skips_attempt(diverged_repo):
+    """Sem arquivos em comum, resolve_conflict sincroniza sem checkout e sem tentar o -X <favor>."""
+    head = diverged_repo.git("rev-parse", "HEAD")
+
+    with patch("services.branch_service._apply_with_favor") as attempt:
+        msg = resolve_conflict(diverged_repo.path, "feature/x", base_branch="develop", strategy="merge")
+
+    attempt.assert_not_called()
+    assert "arquivos disjuntos" in msg
+    assert diverged_repo.git("merge-base", "--is-ancestor", "origin/develop", "feature/x") == ""
+    _assert_checkout_untouched(diverged_repo, head)
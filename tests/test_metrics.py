@@ -0,0 +1,102 @@
+"""
+Testes para as métricas de comandos Git/HTTP.
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+from core.metrics import MetricsRegistry, LatencyHistogram, get_metrics
+from core.git_operations import merge_pull_request, run_git_command, GitCommandError
+from services.pr_operations import create_pull_request
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Testes para estimativa de quantis."""
+
+    def test_quantiles_follow_distribution(self):
+        """p50 fica nos buckets rápidos e p99 nos lentos."""
+        hist = LatencyHistogram()
+        for _ in range(98):
+            hist.observe(0.02)
+        hist.observe(3.0)
+        hist.observe(3.0)
+
+        self.assertLessEqual(hist.quantile(0.50), 0.025)
+        self.assertGreater(hist.quantile(0.99), 2.5)
+        self.assertEqual(hist.count, 100)
+
+    def test_empty_histogram(self):
+        self.assertEqual(LatencyHistogram().quantile(0.95), 0.0)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Testes para agregação e exportação."""
+
+    def test_snapshot_aggregates_per_repo_and_command(self):
+        registry = MetricsRegistry()
+        registry.observe("git", "fetch", "/repo/a", 2.0, output_bytes=10)
+        registry.observe("git", "fetch", "/repo/a", 1.0, failed=True)
+        registry.observe("git", "status", "/repo/b", 0.01)
+
+        rows = registry.snapshot("/repo/a")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["command"], "fetch")
+        self.assertEqual(rows[0]["calls"], 2)
+        self.assertEqual(rows[0]["failures"], 1)
+        self.assertEqual(rows[0]["output_bytes"], 10)
+        self.assertAlmostEqual(rows[0]["total_seconds"], 3.0)
+
+    def test_openmetrics_output(self):
+        registry = MetricsRegistry()
+        registry.observe("git", "push", '/repo/"x"', 0.2)
+        text = registry.to_openmetrics()
+
+        self.assertIn('git_automation_command_calls_total{repo="/repo/\\"x\\"",kind="git",command="push"} 1', text)
+        self.assertIn('le="+Inf"} 1', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+    @patch('core.git_operations.subprocess.run')
+    def test_run_git_command_is_instrumented(self, mock_run):
+        """run_git_command registra chamadas e falhas por subcomando."""
+        get_metrics().reset()
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="fatal")
+
+        with self.assertRaises(GitCommandError):
+            run_git_command("/tmp/test_repo", ["rev-parse", "HEAD"])
+
+        row = get_metrics().snapshot("/tmp/test_repo")[0]
+        self.assertEqual(row["command"], "rev-parse")
+        self.assertEqual(row["failures"], 1)
+        get_metrics().reset()
+
+    @patch('services.pr_operations.requests.post', side_effect=ConnectionError("sem rede"))
+    @patch('services.pr_operations.get_repo_info')
+    @patch('services.pr_operations.get_github_token', return_value="token")
+    def test_http_exception_is_recorded_as_failure(self, _mock_token, mock_info, _mock_post):
+        """Requisição que lança exceção também entra nas métricas, como falha."""
+        get_metrics().reset()
+        mock_info.return_value = MagicMock(full_name="dono/repo")
+
+        with self.assertRaises(ConnectionError):
+            create_pull_request("/tmp/test_repo", "main", "feature/x", "titulo")
+
+        row = get_metrics().snapshot("/tmp/test_repo")[0]
+        self.assertEqual((row["kind"], row["command"]), ("http", "POST /pulls"))
+        self.assertEqual((row["calls"], row["failures"]), (1, 1))
+        get_metrics().reset()
+
+    @patch('core.git_operations.requests.put', side_effect=TimeoutError("timeout"))
+    @patch('core.git_operations.get_repo_info')
+    @patch('core.github_auth.get_github_token', return_value="token")
+    def test_merge_pull_request_exception_is_recorded(self, _mock_token, mock_info, _mock_put):
+        get_metrics().reset()
+        mock_info.return_value = MagicMock(full_name="dono/repo")
+
+        with self.assertRaises(GitCommandError):
+            merge_pull_request("/tmp/test_repo", 7)
+
+        row = get_metrics().snapshot("/tmp/test_repo")[0]
+        self.assertEqual((row["command"], row["failures"]), ("PUT /pulls/{number}/merge", 1))
+        get_metrics().reset()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Testes para o prefetch em segundo plano (namespace refs/prefetch/).
+"""
+from unittest.mock import patch
+import pytest
+from core import prefetch as prefetch_module
+from core.fetch_planner import FetchPlanner
+from core.git_operations import run_git_command
+from core.prefetch import prefetch, promote_prefetched, Prefetcher
+
+
+@pytest.fixture(autouse=True)
+def forget_prefetch_state():
+    yield
+    prefetch_module.forget_prefetch()
+
+
+def test_prefetch_uses_private_namespace(git_repo, remote_commit):
+    """Prefetch grava em refs/prefetch/ sem tocar em refs/remotes/."""
+    sha = remote_commit("develop", "d.txt")
+
+    changes = prefetch(git_repo.path)
+
+    assert changes["develop"] == ("", sha)
+    assert git_repo.git("rev-parse", "refs/prefetch/remotes/origin/develop") == sha
+    assert git_repo.git("for-each-ref", "refs/remotes/origin/develop") == ""
+    # Nada mudou no remoto: segunda rodada não relata alterações
+    assert prefetch(git_repo.path) == {}
+
+
+def test_planner_uses_recent_prefetch_without_network(git_repo, remote_commit):
+    """Com prefetch recente, a operação não executa git fetch."""
+    sha = remote_commit("develop", "d.txt")
+    prefetch(git_repo.path)
+
+    with patch("core.fetch_planner.run_git_command", wraps=run_git_command) as run:
+        result = FetchPlanner(git_repo.path).add("develop").add("feature/nova", optional=True).execute()
+
+    assert not [c for c in run.call_args_list if c.args[1][0] == "fetch"]
+    assert result.prefetched == ("develop",)
+    assert result.missing == ("feature/nova",)
+    assert result.updated["develop"] == ("", sha)
+    assert git_repo.git("rev-parse", "refs/remotes/origin/develop") == sha
+
+
+def test_old_prefetch_is_not_trusted(git_repo, remote_commit):
+    """Prefetch fora da janela de confiança não é usado."""
+    remote_commit("develop", "d.txt")
+    prefetch(git_repo.path)
+
+    assert promote_prefetched(git_repo.path, ["develop"], max_age=0) == ({}, [])
+
+
+def test_promotion_never_moves_tracking_ref_backwards(git_repo):
+    """Push feito depois do prefetch não é desfeito pela promoção."""
+    prefetch(git_repo.path)
+    new_sha = git_repo.commit_file("novo.txt", "novo")
+    git_repo.git("push", "-q", "origin", "main")
+
+    promoted, absent = promote_prefetched(git_repo.path, ["main"])
+
+    assert promoted == {}
+    assert absent == []
+    assert git_repo.git("rev-parse", "refs/remotes/origin/main") == new_sha
+
+
+def test_prefetcher_interval_adapts(git_repo, remote_commit):
+    """Intervalo volta ao mínimo com mudanças e dobra quando o remoto está parado."""
+    prefetcher = Prefetcher(git_repo.path, min_interval=10, max_interval=30)
+    remote_commit("develop", "d.txt")
+
+    assert prefetcher.run_once()
+    assert prefetcher.interval == 10
+    assert prefetcher.run_once() == {}
+    assert prefetcher.interval == 20
+    prefetcher.run_once()
+    assert prefetcher.interval == 30
+
+    remote_commit("develop", "d2.txt")
+    prefetcher.run_once()
+    assert prefetcher.interval == 10
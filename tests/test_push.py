@@ -0,0 +1,201 @@
+"""
+Testes para o push em lote com saída --porcelain.
+"""
+import pytest
+import core.push
+from core.git_operations import GitCommandError, GitCommandTimeout
+from core.push import parse_push_porcelain, push_branches, delete_remote_branches, PushBatch, PushRefResult
+
+
+PORCELAIN_SAMPLE = (
+    "To /tmp/origin.git\n"
+    "+\trefs/heads/feature/a:refs/heads/feature/a\t1111111...2222222 (forced update)\n"
+    "*\trefs/heads/feature/nova:refs/heads/feature/nova\t[new branch]\n"
+    "!\trefs/heads/feature/b:refs/heads/feature/b\t[rejected] (stale info)\n"
+    "=\trefs/heads/main:refs/heads/main\t[up to date]\n"
+    "Done\n"
+)
+
+
+def test_parse_push_porcelain():
+    """Cada linha de ref vira um PushRefResult; cabeçalho e 'Done' são ignorados."""
+    refs = parse_push_porcelain(PORCELAIN_SAMPLE)
+
+    assert [r.branch for r in refs] == ["feature/a", "feature/nova", "feature/b", "main"]
+    assert refs[0].flag == "+" and refs[0].reason == "forced update"
+    assert refs[1].summary == "[new branch]" and refs[1].reason == ""
+    assert not refs[2].ok and refs[2].reason == "stale info"
+    assert all(r.ok for r in refs if r.branch != "feature/b")
+
+
+def test_push_branches_reports_each_ref(git_repo):
+    """Uma branch com lease desatualizado é rejeitada sem impedir as demais."""
+    base = git_repo.git("rev-parse", "HEAD")
+    git_repo.git("branch", "feature/a")
+    git_repo.git("branch", "feature/b")
+    git_repo.git("push", "-q", "origin", "feature/b")
+    git_repo.git("checkout", "-q", "feature/b")
+    git_repo.commit_file("b.txt", "b")
+    git_repo.git("checkout", "-q", "main")
+
+    refs = push_branches(
+        git_repo.path, ["feature/a", "feature/b"],
+        expected={"feature/a": "", "feature/b": "0" * 40},
+    )
+
+    by_branch = {r.branch: r for r in refs}
+    assert by_branch["feature/a"].ok and by_branch["feature/a"].flag == "*"
+    assert not by_branch["feature/b"].ok
+    assert git_repo.git("ls-remote", "origin", "refs/heads/feature/b").split()[0] == base
+
+
+def _publish(git_repo, names):
+    for name in names:
+        git_repo.git("push", "-q", "origin", f"main:refs/heads/{name}")
+    git_repo.git("fetch", "-q", "origin")
+
+
+def test_delete_remote_branches_multi_refspec(git_repo, monkeypatch):
+    """Remove várias branches em pushes multi-refspec (em blocos) com resultado por ref."""
+    names = [f"feature/r{i}" for i in range(6)]
+    _publish(git_repo, names)
+    monkeypatch.setattr(core.push, "MAX_ARGS_CHARS", 60)
+    calls = []
+    original = core.push.run_git_command_with_status
+    monkeypatch.setattr(core.push, "run_git_command_with_status",
+                        lambda repo, cmd, **kw: calls.append(cmd) or original(repo, cmd, **kw))
+
+    refs = delete_remote_branches(git_repo.path, names)
+
+    assert sorted(r.branch for r in refs) == names
+    assert all(r.ok and r.flag == "-" for r in refs)
+    assert 1 < len(calls) < len(names)
+    assert git_repo.git("ls-remote", "origin", "refs/heads/feature/*") == ""
+    # O push também remove as refs de rastreamento
+    assert git_repo.git("for-each-ref", "refs/remotes/origin/feature") == ""
+
+
+def test_delete_remote_branches_chunks_count_leases(git_repo, monkeypatch):
+    """Refspec e --force-with-lease de cada branch contam juntos no orçamento do bloco."""
+    names = [f"feature/{'nome-longo-' * 5}{i}" for i in range(6)]
+    _publish(git_repo, names)
+    sha = git_repo.git("rev-parse", "origin/main")
+    budget = 400
+    monkeypatch.setattr(core.push, "MAX_ARGS_CHARS", budget)
+    calls = []
+    original = core.push.run_git_command_with_status
+    monkeypatch.setattr(core.push, "run_git_command_with_status",
+                        lambda repo, cmd, **kw: calls.append(cmd) or original(repo, cmd, **kw))
+
+    refs = delete_remote_branches(git_repo.path, names, expected={b: sha for b in names})
+
+    assert all(r.ok for r in refs) and len(refs) == len(names)
+    assert len(calls) > 1
+    for cmd in calls:
+        ref_args = [a for a in cmd if a.startswith(("--force-with-lease=", ":refs/heads/"))]
+        assert sum(len(a) + 1 for a in ref_args) <= budget
+
+
+def test_delete_remote_branches_dry_run_and_lease(git_repo):
+    _publish(git_repo, ["feature/a", "feature/b"])
+
+    plan = delete_remote_branches(git_repo.path, ["feature/a", "feature/b"], dry_run=True)
+    assert all(r.ok for r in plan)
+    assert len(git_repo.git("ls-remote", "origin", "refs/heads/feature/*").splitlines()) == 2
+
+    # Lease desatualizado: feature/b não é apagada, feature/a sim
+    refs = delete_remote_branches(git_repo.path, ["feature/a", "feature/b"],
+                                  expected={"feature/a": git_repo.git("rev-parse", "origin/feature/a"),
+                                            "feature/b": "1" * 40})
+    by_branch = {r.branch: r for r in refs}
+    assert by_branch["feature/a"].ok
+    assert not by_branch["feature/b"].ok
+    assert git_repo.git("ls-remote", "origin", "refs/heads/feature/*").endswith("refs/heads/feature/b")
+
+
+def test_push_batch_single_push_with_upstream(git_repo, monkeypatch):
+    """Várias branches num único push; branches novas ganham upstream."""
+    git_repo.git("branch", "feature/a")
+    git_repo.git("branch", "feature/b")
+    calls = []
+    monkeypatch.setattr(core.push, "push_branches",
+                        lambda *a, **kw: calls.append(a[1]) or push_branches(*a, **kw))
+
+    refs = PushBatch(git_repo.path).add("feature/a", expected="", set_upstream=True).add("feature/b").flush()
+
+    assert [r.branch for r in refs] == ["feature/a", "feature/b"]
+    assert all(r.ok for r in refs)
+    assert calls == [["feature/a", "feature/b"]]
+    assert git_repo.git("rev-parse", "--abbrev-ref", "feature/a@{upstream}") == "origin/feature/a"
+
+
+def test_push_batch_retries_only_transient_rejections(git_repo, monkeypatch):
+    calls = []
+
+    def fake_push(repo, branches, remote, expected=None, atomic=False):
+        calls.append(list(branches))
+        if len(calls) == 1:
+            return [
+                PushRefResult(" ", "refs/heads/a", "refs/heads/a", "1..2", ""),
+                PushRefResult("!", "refs/heads/b", "refs/heads/b", "[remote rejected]", "failed to lock"),
+                PushRefResult("!", "refs/heads/c", "refs/heads/c", "[rejected]", "stale info"),
+            ]
+        return [PushRefResult(" ", "refs/heads/b", "refs/heads/b", "1..2", "")]
+
+    monkeypatch.setattr(core.push, "push_branches", fake_push)
+    batch = PushBatch(git_repo.path, retry_delay=0)
+    for branch in ["a", "b", "c"]:
+        batch.add(branch, expected="0" * 40)
+
+    refs = {r.branch: r for r in batch.flush()}
+    assert calls == [["a", "b", "c"], ["b"]]
+    assert refs["a"].ok and refs["b"].ok
+    assert not refs["c"].ok and refs["c"].reason == "stale info"
+
+
+def test_push_branches_chunks_with_leases(git_repo, monkeypatch):
+    """Com muitas branches o push é dividido em blocos; refspec + lease cabem no orçamento."""
+    names = [f"feature/{'nome-longo-' * 5}{i}" for i in range(5)]
+    for name in names:
+        git_repo.git("branch", name)
+    budget = 400
+    monkeypatch.setattr(core.push, "MAX_ARGS_CHARS", budget)
+    calls = []
+    original = core.push.run_git_command_with_status
+    monkeypatch.setattr(core.push, "run_git_command_with_status",
+                        lambda repo, cmd, **kw: calls.append(cmd) or original(repo, cmd, **kw))
+
+    refs = push_branches(git_repo.path, names, expected={b: "" for b in names})
+
+    assert sorted(r.branch for r in refs) == names and all(r.ok for r in refs)
+    assert len(calls) > 1
+    for cmd in calls:
+        ref_args = [a for a in cmd if a.startswith(("--force-with-lease=", "refs/heads/"))]
+        assert sum(len(a) + 1 for a in ref_args) <= budget
+
+
+@pytest.mark.parametrize("error, attempts", [
+    (GitCommandError("fatal: unable to access 'https://x/': Could not resolve host: x"), 2),
+    (GitCommandError("remote: Permission denied\nfatal: Authentication failed for 'https://x/'"), 1),
+    (GitCommandError("remote: error: hook declined to update refs/heads/a"), 1),
+    (GitCommandTimeout("git push excedeu o tempo limite"), 1),
+])
+def test_push_batch_retries_only_network_failures(git_repo, monkeypatch, error, attempts):
+    """Só falhas de rede são repetidas; autenticação, hooks e timeout sobem como erro."""
+    calls = []
+
+    def fake_push(repo, branches, remote, expected=None, atomic=False):
+        calls.append(list(branches))
+        if len(calls) == 1:
+            raise error
+        return [PushRefResult(" ", "refs/heads/a", "refs/heads/a", "1..2", "")]
+
+    monkeypatch.setattr(core.push, "push_branches", fake_push)
+    batch = PushBatch(git_repo.path, retry_delay=0).add("a")
+
+    if attempts == 1:
+        with pytest.raises(type(error)):
+            batch.flush()
+    else:
+        assert batch.flush()[0].ok
+    assert len(calls) == attempts
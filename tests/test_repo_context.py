@@ -0,0 +1,76 @@
+"""
+Testes para o RepoContext (sessão de repositório aceita pelos serviços).
+"""
+import os
+from unittest.mock import patch
+from core.cache import get_cache
+from core.fetch_planner import FetchPlanner, invalidate_fetched
+from core.repo_context import RepoContext, get_repo_context, release_repo_context
+from core.topology import get_repo_topology
+from services.branch_service import list_branches
+from utils.repo_utils import get_repo_info
+
+
+def test_open_resolves_paths_once(git_repo):
+    ctx = RepoContext.open(os.path.join(git_repo.path))
+    assert os.path.samefile(ctx.root, git_repo.path)
+    assert os.path.samefile(ctx.git_dir, os.path.join(git_repo.path, ".git"))
+    assert ctx.common_dir == ctx.git_dir
+    assert ctx.remotes == ("origin",)
+    assert os.fspath(ctx) == str(ctx) == ctx.root
+
+
+def test_linked_worktree_shares_common_dir(git_repo, tmp_path):
+    linked = tmp_path / "linked"
+    git_repo.git("worktree", "add", "-q", "--detach", str(linked))
+    ctx = RepoContext.open(str(linked))
+    main = RepoContext.open(git_repo.path)
+    assert ctx.common_dir == main.common_dir
+    assert ctx.git_dir != main.git_dir
+
+
+def test_services_accept_context_and_use_its_cache(git_repo):
+    ctx = get_repo_context(git_repo.path)
+    try:
+        assert get_repo_context(git_repo.path) is ctx
+        assert "main" in list_branches(ctx)
+        assert get_repo_topology(ctx).default_branch == "main"
+        # O resultado de @cached fica no cache do contexto, não no global
+        assert any(k.startswith("list_branches:") for k in ctx.cache._cache)
+        assert not any(k.startswith("list_branches:") for k in get_cache()._cache)
+    finally:
+        release_repo_context(ctx)
+    assert ctx.closed
+    assert not ctx.cache._cache
+    assert get_repo_context(git_repo.path) is not ctx
+    release_repo_context(git_repo.path)
+
+
+def test_repo_info_read_from_context(git_repo):
+    git_repo.git("remote", "set-url", "origin", "git@github.com:usuario/projeto.git")
+    ctx = RepoContext.open(git_repo.path)
+    assert get_repo_info(ctx).full_name == "usuario/projeto"
+    # Lido uma única vez: mudanças posteriores só aparecem após refresh()
+    git_repo.git("remote", "set-url", "origin", "git@github.com:outro/repo.git")
+    assert get_repo_info(ctx).full_name == "usuario/projeto"
+    ctx.refresh()
+    assert get_repo_info(ctx).full_name == "outro/repo"
+
+
+def test_fetch_planner_freshness_uses_context_cache(git_repo):
+    """Com RepoContext, o segundo fetch na janela de frescor é pulado e o registro fica no contexto."""
+    ctx = get_repo_context(git_repo.path)
+    try:
+        first = FetchPlanner(ctx).add("main").execute()
+        assert first.fetched == ("main",)
+        with patch("core.fetch_planner.run_git_command") as mock_run:
+            second = FetchPlanner(ctx).add("main").execute()
+        mock_run.assert_not_called()
+        assert second.skipped == ("main",)
+        assert any(k.startswith("fetch:") for k in ctx.cache._cache)
+        assert not any(k.startswith("fetch:") for k in get_cache()._cache)
+
+        invalidate_fetched(ctx, ["main"])
+        assert not any(k.startswith("fetch:") for k in ctx.cache._cache)
+    finally:
+        release_repo_context(ctx)
@@ -0,0 +1,91 @@
+"""
+Testes para a listagem paginada de stashes e o patch carregado em páginas.
+"""
+import os
+import time
+import pytest
+import core.git_operations
+from core.cancellation import CancellationToken, operation_scope
+from core.git_operations import GitCommandCancelled
+from services.stash_service import iter_stash_patch, list_stashes, _parse_stash_record
+
+
+def _stash(repo, name, content, message):
+    with open(os.path.join(repo.path, name), "w", encoding="utf-8") as f:
+        f.write(content)
+    repo.git("stash", "push", "-q", "-m", message)
+
+
+def test_list_stashes_metadata_and_pages(git_repo):
+    _stash(git_repo, "README.md", "base\nprimeiro\n", "primeiro")
+    _stash(git_repo, "README.md", "base\nsegundo\nmais\n", "segundo")
+    _stash(git_repo, "README.md", "x\n", "terceiro")
+
+    first = list_stashes(git_repo.path, limit=2)
+    assert first.has_more
+    assert [e.ref for e in first.entries] == ["stash@{0}", "stash@{1}"]
+    newest, second = first.entries
+    assert newest.message.endswith("terceiro")
+    assert (newest.files, newest.insertions, newest.deletions) == (("README.md",), 1, 1)
+    assert (second.insertions, second.deletions) == (2, 0)
+
+    rest = list_stashes(git_repo.path, offset=2, limit=2)
+    assert not rest.has_more
+    assert [e.ref for e in rest.entries] == ["stash@{2}"]
+    assert rest.entries[0].sha == git_repo.git("rev-parse", "stash@{2}")
+
+
+def test_parse_stash_record_renames_and_binaries():
+    record = ("stash@{3}\x1fabc\x1f1700000000\x1fWIP on main: x\0\n"
+              "3\t1\t\0velho.txt\0novo.txt\0-\t-\timagem.png\0")
+    entry = _parse_stash_record(record)
+    # Renomeação com -z: o caminho novo é o registrado; binários não somam linhas
+    assert entry.files == ("novo.txt", "imagem.png")
+    assert (entry.insertions, entry.deletions, entry.timestamp) == (3, 1, 1700000000)
+
+
+def test_list_stashes_empty(git_repo):
+    page = list_stashes(git_repo.path)
+    assert page.entries == [] and not page.has_more
+
+
+def test_iter_stash_patch_pages(git_repo):
+    _stash(git_repo, "README.md", "".join(f"linha {i}\n" for i in range(25)), "grande")
+
+    pages = list(iter_stash_patch(git_repo.path, "stash@{0}", page_lines=10))
+    assert [len(p) for p in pages[:-1]] == [10] * (len(pages) - 1)
+    lines = [line for page in pages for line in page]
+    assert lines[0].startswith("diff --git")
+    assert "+linha 24" in lines
+
+
+def test_iter_stash_patch_close_early(git_repo):
+    _stash(git_repo, "README.md", "".join(f"linha {i}\n" for i in range(5000)), "grande")
+
+    pages = iter_stash_patch(git_repo.path, "stash@{0}", page_lines=100)
+    assert len(next(pages)) == 100
+    pages.close()   # encerra o git sem ler o restante
+
+
+def test_iter_stash_patch_has_no_timeout(git_repo, monkeypatch):
+    """Páginas lidas no ritmo do usuário não caem no tempo limite do git."""
+    _stash(git_repo, "README.md", "".join(f"linha {i}\n" for i in range(50)), "lento")
+    monkeypatch.setattr(core.git_operations, "get_git_timeout", lambda subcommand: 0.05)
+
+    pages = iter_stash_patch(git_repo.path, "stash@{0}", page_lines=10)
+    assert next(pages)
+    time.sleep(0.2)
+    assert "+linha 49" in [line for page in pages for line in page]
+
+
+def test_iter_stash_patch_cancelled_by_first_page_token(git_repo):
+    """O token ativo na primeira página continua valendo para as seguintes."""
+    _stash(git_repo, "README.md", "".join(f"linha {i}\n" for i in range(50000)), "grande")
+    token = CancellationToken()
+
+    pages = iter_stash_patch(git_repo.path, "stash@{0}", page_lines=100)
+    with operation_scope(token):
+        assert next(pages)
+    token.cancel()
+    with pytest.raises(GitCommandCancelled):
+        list(pages)
@@ -12,6 +12,8 @@ from services.stash_service import (
     stash_clear
 )
 from core.git_operations import GitCommandError
+from core.dirty_check import DirtyState, REASON_UNSTAGED
+from core.status import StatusSummary
 
 
 class TestStashService(unittest.TestCase):
@@ -22,27 +24,28 @@ class TestStashService(unittest.TestCase):
         self.test_repo_path = "/tmp/test_repo"
 
     @patch('services.stash_service.run_git_command')
-    def test_stash_save_with_changes(self, mock_run):
+    @patch('services.stash_service.summarize_status')
+    @patch('services.stash_service.check_dirty', return_value=DirtyState(True, REASON_UNSTAGED))
+    def test_stash_save_with_changes(self, mock_dirty, mock_summary, mock_run):
         """Testa salvar stash quando há alterações."""
-        # Mock para verificar alterações
-        mock_run.side_effect = [
-            "M file.py\n",  # status com alterações
-            ""  # stash save
-        ]
+        mock_summary.return_value = StatusSummary(None, 1, 0, 1, 0, 0, (), ())
+        mock_run.return_value = ""  # stash save
 
         result = stash_save(self.test_repo_path, "test message")
 
         self.assertIn("Stash salvo", result)
-        self.assertEqual(mock_run.call_count, 2)
+        self.assertIn("1 arquivo(s)", result)
+        mock_run.assert_called_once_with(self.test_repo_path, ["stash", "save", "test message"])
+        mock_summary.assert_called_once_with(self.test_repo_path, untracked="no")
 
     @patch('services.stash_service.run_git_command')
-    def test_stash_save_no_changes(self, mock_run):
+    @patch('services.stash_service.check_dirty', return_value=DirtyState(False))
+    def test_stash_save_no_changes(self, mock_dirty, mock_run):
         """Testa salvar stash quando não há alterações."""
-        mock_run.return_value = ""  # status vazio
-
         result = stash_save(self.test_repo_path)
 
         self.assertIn("Não há alterações", result)
+        mock_run.assert_not_called()
 
     @patch('services.stash_service.run_git_command')
     def test_stash_list_with_stashes(self, mock_run):
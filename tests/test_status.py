@@ -0,0 +1,117 @@
+"""
+Testes para o parser streaming de `git status --porcelain=v2 -z`.
+"""
+import os
+import pytest
+from core.git_operations import GitCommandError
+from core.status import (
+    BranchInfo, OrdinaryEntry, RenamedEntry, UnmergedEntry, UntrackedEntry,
+    iter_status, parse_status_v2, summarize_status,
+)
+from services.commit_service import commit_changes
+from services.stash_service import stash_save
+
+SAMPLE = (
+    b"# branch.oid 1111111111111111111111111111111111111111\0"
+    b"# branch.head feature/x\0"
+    b"# branch.upstream origin/feature/x\0"
+    b"# branch.ab +2 -1\0"
+    b"1 .M N... 100644 100644 100644 aaaa aaaa dir/com espa\xc3\xa7o.py\0"
+    b"2 R. N... 100644 100644 100644 bbbb bbbb R100 novo.txt\0velho.txt\0"
+    b"u UU N... 100644 100644 100644 100644 cccc dddd eeee conflito.txt\0"
+    b"? n\xffo-utf8.txt\0"
+    b"! ignorado.log\0"
+)
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, len(SAMPLE)])
+def test_parse_status_v2_any_chunking(size):
+    """Registros cortados entre blocos (até byte a byte) produzem as mesmas entradas."""
+    records = list(parse_status_v2(_chunks(SAMPLE, size)))
+
+    branch, ordinary, renamed, unmerged, untracked = records
+    assert isinstance(branch, BranchInfo)
+    assert (branch.head, branch.upstream, branch.ahead, branch.behind) == ("feature/x", "origin/feature/x", 2, 1)
+    assert isinstance(ordinary, OrdinaryEntry) and ordinary.path == "dir/com espaço.py"
+    assert ordinary.unstaged and not ordinary.staged
+    assert isinstance(renamed, RenamedEntry)
+    assert (renamed.orig_path, renamed.path, renamed.score) == ("velho.txt", "novo.txt", "R100")
+    assert isinstance(unmerged, UnmergedEntry) and unmerged.path == "conflito.txt"
+    assert isinstance(untracked, UntrackedEntry)
+    # Nome que não é UTF-8 volta aos mesmos bytes
+    assert os.fsencode(untracked.path) == b"n\xffo-utf8.txt"
+
+
+def test_entries_use_slots():
+    entry = OrdinaryEntry(".M", "a.txt")
+    with pytest.raises(AttributeError):
+        entry.extra = 1
+
+
+def test_summarize_status_real_repo(git_repo):
+    git_repo.git("mv", "README.md", "LEIAME.md")
+    with open(os.path.join(git_repo.path, "novo.txt"), "w") as f:
+        f.write("x")
+
+    summary = summarize_status(git_repo.path)
+    assert summary.branch.head == "main"
+    assert (summary.changed, summary.staged, summary.untracked) == (1, 1, 1)
+    assert "R. README.md -> LEIAME.md" in summary.describe()
+
+
+def test_iter_status_stops_git_when_consumer_stops(git_repo):
+    for i in range(50):
+        with open(os.path.join(git_repo.path, f"f{i}.txt"), "w") as f:
+            f.write("x")
+    records = iter_status(git_repo.path)
+    assert isinstance(next(records), BranchInfo)
+    records.close()
+
+
+def test_iter_status_error_outside_repo(tmp_path):
+    with pytest.raises(GitCommandError):
+        list(iter_status(str(tmp_path)))
+
+
+def test_commit_refuses_clean_tree(git_repo):
+    with pytest.raises(GitCommandError, match="Nada para commitar"):
+        commit_changes(git_repo.path, "vazio")
+
+
+@pytest.fixture
+def merge_conflict(git_repo):
+    """Merge de `outra` em main parado com conflito em README.md."""
+    git_repo.git("checkout", "-q", "-b", "outra")
+    git_repo.commit_file("README.md", "outra\n")
+    git_repo.git("checkout", "-q", "main")
+    git_repo.commit_file("README.md", "main\n")
+    with pytest.raises(Exception):
+        git_repo.git("merge", "-q", "outra")
+    return git_repo
+
+
+def test_commit_refuses_unresolved_conflict_markers(merge_conflict):
+    with pytest.raises(GitCommandError, match="Resolva os conflitos"):
+        commit_changes(merge_conflict.path, "merge")
+
+
+def test_commit_finishes_merge_resolved_by_hand(merge_conflict):
+    """Conflito resolvido no arquivo (ainda sem `git add`): o commit conclui o merge."""
+    with open(os.path.join(merge_conflict.path, "README.md"), "w") as f:
+        f.write("main e outra\n")
+
+    commit_changes(merge_conflict.path, "merge resolvido")
+
+    assert len(merge_conflict.git("rev-list", "--parents", "-1", "HEAD").split()) == 3
+    assert merge_conflict.git("status", "--porcelain") == ""
+
+
+def test_stash_save_only_untracked(git_repo):
+    with open(os.path.join(git_repo.path, "novo.txt"), "w") as f:
+        f.write("x")
+    assert "nada a salvar" in stash_save(git_repo.path)
+    assert git_repo.git("stash", "list") == ""
@@ -0,0 +1,56 @@
+"""
+Testes para o modo streaming do git (stream_git_command / iter_git_records).
+"""
+import os
+import pytest
+from core.cancellation import CancellationToken, operation_scope
+from core.git_operations import (
+    GitCommandCancelled, GitCommandError, iter_git_records, split_records, stream_git_command,
+)
+from core.merge_engine import changed_paths
+
+
+def test_split_records_across_chunks():
+    chunks = [b"a", b"b\0c", b"d\0\0e", b"", b"f"]
+    assert list(split_records(chunks)) == [b"ab", b"cd", b"", b"ef"]
+
+
+def test_stream_bytes_and_incremental_decoding(git_repo):
+    git_repo.commit_file("acentos.txt", "ação " * 5000)
+
+    raw = b"".join(stream_git_command(git_repo.path, ["show", "HEAD:acentos.txt"], chunk_size=7))
+    assert raw == ("ação " * 5000).encode("utf-8")
+
+    # Blocos de 7 bytes cortam os caracteres de 2 bytes: o decodificador incremental os junta
+    chunks = list(stream_git_command(git_repo.path, ["show", "HEAD:acentos.txt"], encoding="utf-8", chunk_size=7))
+    assert all(isinstance(c, str) for c in chunks)
+    assert "".join(chunks) == "ação " * 5000
+
+
+def test_iter_git_records_preserves_non_utf8_paths(git_repo):
+    name = os.fsdecode(b"n\xffo-utf8.txt")
+    git_repo.commit_file(name, "x")
+
+    paths = list(iter_git_records(git_repo.path, ["ls-files", "-z"], encoding="fs"))
+    assert name in paths
+    assert changed_paths(git_repo.path, "HEAD~1", "HEAD") == frozenset([name])
+
+
+def test_stream_raises_at_end_on_failure(git_repo):
+    with pytest.raises(GitCommandError, match="unknown revision|bad revision|invalid object"):
+        list(stream_git_command(git_repo.path, ["log", "nao-existe"]))
+
+
+def test_stream_close_stops_git(git_repo):
+    stream = stream_git_command(git_repo.path, ["cat-file", "--batch-all-objects", "--batch"], chunk_size=16)
+    assert next(stream)
+    stream.close()   # encerra o processo sem erro
+
+
+def test_stream_cancelled(git_repo):
+    token = CancellationToken()
+    with operation_scope(token):
+        stream = stream_git_command(git_repo.path, ["log"])
+        token.cancel()
+        with pytest.raises(GitCommandCancelled):
+            list(stream)
@@ -0,0 +1,58 @@
+"""
+Testes para a topologia do repositório (branch padrão/base/protegidas em cache).
+"""
+from unittest.mock import patch
+import core.topology
+from core.topology import get_repo_topology, invalidate_topology
+from services.branch_service import create_branch, _get_default_base_branch
+
+
+def test_topology_from_single_snapshot(git_repo, remote_commit):
+    """Sem origin/HEAD: padrão pela preferência main/master; base prefere develop."""
+    remote_commit("develop", "d.txt")
+    git_repo.git("fetch", "-q", "origin")
+    invalidate_topology()
+
+    with patch("core.topology.run_git_command", wraps=core.topology.run_git_command) as spy:
+        topology = get_repo_topology(git_repo.path)
+    assert spy.call_count == 1
+    assert topology.default_branch == "main"
+    assert topology.base_branch == "develop"
+    assert topology.creation_base == "main"
+    assert "main" in topology.protected
+    assert set(topology.remote_branches) == {"main", "develop"}
+    assert _get_default_base_branch(git_repo.path) == "develop"
+
+
+def test_topology_uses_remote_head(git_repo):
+    git_repo.git("push", "-q", "origin", "main:trunk")
+    git_repo.git("fetch", "-q", "origin")
+    git_repo.git("remote", "set-head", "origin", "trunk")
+    invalidate_topology()
+
+    topology = get_repo_topology(git_repo.path)
+    assert topology.default_branch == "trunk"
+    assert "trunk" in topology.protected
+
+
+def test_topology_cached_until_refs_change(git_repo):
+    invalidate_topology()
+    get_repo_topology(git_repo.path)
+
+    with patch("core.topology.run_git_command", wraps=core.topology.run_git_command) as spy:
+        get_repo_topology(git_repo.path)
+        assert spy.call_count == 0
+
+        # Nova ref local: a impressão digital muda e o snapshot é refeito
+        git_repo.git("branch", "feature/nova")
+        topology = get_repo_topology(git_repo.path)
+        assert spy.call_count == 1
+    assert "feature/nova" in topology.local_branches
+
+
+def test_create_branch_uses_topology_base(git_repo):
+    """create_branch sem base parte de main (preferência main/master da topologia)."""
+    invalidate_topology()
+    msg = create_branch(git_repo.path, "x")
+    assert "a partir de 'main'" in msg
+    assert git_repo.git("rev-parse", "--abbrev-ref", "HEAD") == "feature/x"
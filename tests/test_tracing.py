@@ -0,0 +1,92 @@
+"""
+Testes para o rastreamento estruturado (spans).
+"""
+import json
+import logging
+import unittest
+from unittest.mock import patch, MagicMock
+from core.tracing import span, traced, current_span, export_chrome_trace, TRACE_LOGGER_NAME
+from core.git_operations import run_git_command, GitCommandError
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def emit(self, record):
+        self.events.append(json.loads(record.getMessage()))
+
+
+class TestTracing(unittest.TestCase):
+    """Testes para spans e sua serialização."""
+
+    def setUp(self):
+        self.trace_logger = logging.getLogger(TRACE_LOGGER_NAME)
+        self.handler = _ListHandler()
+        self.trace_logger.addHandler(self.handler)
+        self.trace_logger.setLevel(logging.INFO)
+        self.trace_logger.propagate = False
+
+    def tearDown(self):
+        self.trace_logger.removeHandler(self.handler)
+        self.trace_logger.setLevel(logging.NOTSET)
+        self.trace_logger.propagate = True
+
+    def test_nested_spans_share_trace_and_parent(self):
+        """Spans filhos apontam para o pai e compartilham o trace_id."""
+        with span("update_branch", kind="operation") as parent:
+            self.assertIs(current_span(), parent)
+            with span("git fetch", kind="git") as child:
+                child.set(exit_code=0)
+        self.assertIsNone(current_span())
+
+        child_event, parent_event = self.handler.events
+        self.assertEqual(child_event["args"]["parent_id"], parent_event["args"]["span_id"])
+        self.assertEqual(child_event["args"]["trace_id"], parent_event["args"]["trace_id"])
+        self.assertEqual(child_event["ph"], "X")
+        self.assertEqual(child_event["args"]["exit_code"], 0)
+
+    def test_traced_records_error(self):
+        """Exceções ficam registradas no span e são propagadas."""
+        @traced("operacao")
+        def falha():
+            raise GitCommandError("boom")
+
+        with self.assertRaises(GitCommandError):
+            falha()
+        self.assertEqual(self.handler.events[0]["name"], "operacao")
+        self.assertEqual(self.handler.events[0]["args"]["error"], "boom")
+
+    @patch('core.git_operations.subprocess.run')
+    def test_run_git_command_records_git_span(self, mock_run):
+        """run_git_command registra código de saída e tamanho da saída."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="main\n", stderr="")
+
+        with span("checkout_branch", kind="operation"):
+            run_git_command("/tmp/test_repo", ["branch"])
+
+        git_event = self.handler.events[0]
+        self.assertEqual(git_event["name"], "git branch")
+        self.assertEqual(git_event["cat"], "git")
+        self.assertEqual(git_event["args"]["exit_code"], 0)
+        self.assertEqual(git_event["args"]["output_bytes"], 5)
+
+    def test_export_chrome_trace(self):
+        """Exporta linhas JSON para o formato {"traceEvents": [...]}."""
+        import tempfile
+        from pathlib import Path
+
+        with span("op"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "trace.jsonl"
+            source.write_text("\n".join(json.dumps(e) for e in self.handler.events) + "\n", encoding="utf-8")
+            dest = Path(tmp) / "trace.json"
+            self.assertEqual(export_chrome_trace(source, dest), 1)
+            data = json.loads(dest.read_text(encoding="utf-8"))
+            self.assertEqual(data["traceEvents"][0]["name"], "op")
+
+
+if __name__ == "__main__":
+    unittest.main()
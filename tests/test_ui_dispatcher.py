@@ -0,0 +1,79 @@
+"""
+Testes para o despachante de callbacks da UI (sem Tk real).
+"""
+import threading
+import unittest
+from utils.ui_dispatcher import UIDispatcher
+
+
+class FakeRoot:
+    """Substituto mínimo do Tk: guarda os callbacks agendados com after()."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay_ms, callback):
+        self.scheduled.append((delay_ms, callback))
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def run_next(self):
+        _, callback = self.scheduled.pop(0)
+        callback()
+
+
+class TestUIDispatcher(unittest.TestCase):
+    """Testes para o UIDispatcher."""
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.dispatcher = UIDispatcher(self.root, interval_ms=16, max_batch=2)
+        self.dispatcher.start()
+
+    def test_callbacks_posted_from_worker_run_on_pump(self):
+        calls = []
+        worker = threading.Thread(target=lambda: self.dispatcher.post(calls.append, "ok"))
+        worker.start()
+        worker.join()
+
+        self.assertEqual(calls, [])
+        self.root.run_next()
+        self.assertEqual(calls, ["ok"])
+        self.assertEqual(self.dispatcher.stats()["processed"], 1)
+        self.assertGreaterEqual(self.dispatcher.max_delay, 0.0)
+
+    def test_pump_processes_in_batches(self):
+        calls = []
+        for i in range(5):
+            self.dispatcher.post(calls.append, i)
+
+        self.root.run_next()
+        self.assertEqual(calls, [0, 1])
+        # Ainda há trabalho: reagenda imediatamente
+        self.assertEqual(self.root.scheduled[-1][0], 0)
+        self.root.run_next()
+        self.root.run_next()
+        self.assertEqual(calls, [0, 1, 2, 3, 4])
+        self.assertEqual(self.root.scheduled[-1][0], 16)
+
+    def test_call_runs_inline_on_ui_thread(self):
+        calls = []
+        self.dispatcher.call(calls.append, 1)
+        self.assertEqual(calls, [1])
+
+    def test_wrap_and_error_isolation(self):
+        calls = []
+
+        def boom():
+            raise RuntimeError("falhou")
+
+        self.dispatcher.wrap(boom)()
+        self.dispatcher.wrap(calls.append)("depois")
+        self.root.run_next()
+        self.assertEqual(calls, ["depois"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Testes para o agendador de tarefas (pool limitado + serialização por repo).
+"""
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import utils.worker_thread
+from utils.worker_thread import TaskScheduler, TaskPriority, get_scheduler, run_in_thread
+
+
+class TestTaskScheduler(unittest.TestCase):
+    """Testes para o TaskScheduler."""
+
+    def setUp(self):
+        self.scheduler = TaskScheduler(max_workers=4)
+
+    def tearDown(self):
+        self.scheduler.shutdown(wait=True)
+
+    def test_submit_returns_future_with_result(self):
+        future = self.scheduler.submit(lambda a, b: a + b, (2, 3))
+        self.assertEqual(future.result(timeout=2), 5)
+
+    def test_mutating_tasks_same_repo_are_serialized(self):
+        """Duas operações mutantes no mesmo repo nunca se sobrepõem."""
+        active = []
+        overlaps = []
+        order = []
+        lock = threading.Lock()
+
+        def task(name):
+            with lock:
+                active.append(name)
+                if len(active) > 1:
+                    overlaps.append(tuple(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(name)
+                order.append(name)
+
+        futures = [self.scheduler.submit(task, (i,), repo="/repo", mutating=True) for i in range(3)]
+        for f in futures:
+            f.result(timeout=2)
+
+        self.assertEqual(overlaps, [])
+        self.assertEqual(order, [0, 1, 2])
+
+    def test_read_only_tasks_run_in_parallel(self):
+        """Leituras no mesmo repo rodam ao mesmo tempo."""
+        barrier = threading.Barrier(2, timeout=2)
+
+        futures = [self.scheduler.submit(barrier.wait, repo="/repo", mutating=False) for _ in range(2)]
+        for f in futures:
+            f.result(timeout=2)
+
+    def test_cancel_queued_task(self):
+        """Tarefa aguardando na fila do repo pode ser cancelada e não executa."""
+        release = threading.Event()
+        ran = []
+
+        first = self.scheduler.submit(release.wait, (2,), repo="/repo")
+        second = self.scheduler.submit(lambda: ran.append(True), repo="/repo")
+        self.assertTrue(second.cancel())
+        release.set()
+        first.result(timeout=2)
+        third = self.scheduler.submit(lambda: "ok", repo="/repo")
+
+        self.assertEqual(third.result(timeout=2), "ok")
+        self.assertEqual(ran, [])
+
+
+class TestTaskPriorities(unittest.TestCase):
+    """Testes para as classes de prioridade."""
+
+    def test_interactive_preempts_waiting_background(self):
+        """Com o único worker ocupado, a tarefa interativa passa à frente das background."""
+        scheduler = TaskScheduler(max_workers=1, background_slots=1)
+        release = threading.Event()
+        order = []
+        try:
+            blocker = scheduler.submit(release.wait, (2,))
+            futures = [
+                scheduler.submit(order.append, ("background",), priority=TaskPriority.BACKGROUND),
+                scheduler.submit(order.append, ("maintenance",), priority=TaskPriority.MAINTENANCE),
+                scheduler.submit(order.append, ("interactive",), priority=TaskPriority.INTERACTIVE),
+            ]
+            release.set()
+            blocker.result(timeout=2)
+            for f in futures:
+                f.result(timeout=2)
+        finally:
+            scheduler.shutdown()
+
+        self.assertEqual(order, ["interactive", "background", "maintenance"])
+
+    def test_background_slots_leave_room_for_interactive(self):
+        """Background lento ocupa no máximo seus slots; leituras interativas seguem rodando."""
+        scheduler = TaskScheduler(max_workers=2, background_slots=1)
+        release = threading.Event()
+        try:
+            slow_fetch = scheduler.submit(release.wait, (2,), priority=TaskPriority.BACKGROUND)
+            waiting_fetch = scheduler.submit(lambda: "fetch", priority=TaskPriority.BACKGROUND)
+            interactive = scheduler.submit(lambda: "checkout", priority=TaskPriority.INTERACTIVE)
+
+            self.assertEqual(interactive.result(timeout=2), "checkout")
+            self.assertFalse(waiting_fetch.done())
+            release.set()
+            self.assertEqual(waiting_fetch.result(timeout=2), "fetch")
+            slow_fetch.result(timeout=2)
+        finally:
+            scheduler.shutdown()
+
+    def test_background_slots_always_spare_one_worker(self):
+        """background_slots nunca ocupa todos os workers."""
+        scheduler = TaskScheduler(max_workers=2, background_slots=4)
+        try:
+            self.assertEqual(scheduler.background_slots, 1)
+        finally:
+            scheduler.shutdown()
+
+    @patch("utils.worker_thread.os.cpu_count", return_value=1)
+    def test_global_scheduler_reserves_interactive_slot_on_single_cpu(self, _mock_cpu):
+        """Com uma única CPU o agendador global ainda deixa um worker para INTERACTIVE."""
+        with patch.object(utils.worker_thread, "_scheduler", None):
+            scheduler = get_scheduler()
+            try:
+                self.assertEqual(scheduler.max_workers, 2)
+                self.assertEqual(scheduler.background_slots, 1)
+            finally:
+                scheduler.shutdown()
+
+
+class TestRunInThread(unittest.TestCase):
+    """Testes para a API de callbacks."""
+
+    def test_callbacks(self):
+        done = threading.Event()
+        results = []
+
+        def on_finally():
+            done.set()
+
+        run_in_thread(lambda: 42, on_success=results.append, on_finally=on_finally)
+        self.assertTrue(done.wait(2))
+        self.assertEqual(results, [42])
+
+    def test_error_callback(self):
+        done = threading.Event()
+        errors = []
+
+        def boom():
+            raise ValueError("falhou")
+
+        run_in_thread(boom, on_error=errors.append, on_finally=done.set)
+        self.assertTrue(done.wait(2))
+        self.assertIsInstance(errors[0], ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Testes para o pool de worktrees destacados usado pelo preview de resolve_conflict.
+"""
+import os
+import pytest
+from core.worktree_pool import WorktreePool, close_worktree_pools
+from services.branch_service import resolve_conflict
+
+
+@pytest.fixture
+def pool(git_repo, tmp_path):
+    pool = WorktreePool(git_repo.path, max_size=1, root=str(tmp_path / "pool"))
+    yield pool
+    pool.close()
+
+
+def test_lease_reuses_worktree_and_resets_to_commit(git_repo, pool):
+    """O mesmo worktree é reaproveitado, reposicionado no commit pedido e limpo."""
+    first = git_repo.git("rev-parse", "HEAD")
+    second = git_repo.commit_file("b.txt", "b")
+
+    with pool.lease(first) as path:
+        assert git_repo.git("-C", path, "rev-parse", "HEAD") == first
+        with open(os.path.join(path, "sobra.txt"), "w") as f:
+            f.write("lixo")
+        leased_path = path
+
+    with pool.lease(second) as path:
+        assert path == leased_path
+        assert git_repo.git("-C", path, "rev-parse", "HEAD") == second
+        assert not os.path.exists(os.path.join(path, "sobra.txt"))
+        # Destacado: HEAD não aponta para nenhuma branch
+        assert git_repo.git("-C", path, "rev-parse", "--abbrev-ref", "HEAD") == "HEAD"
+
+    assert pool.size == 1
+
+
+def test_close_removes_worktrees(git_repo, pool):
+    with pool.lease("HEAD") as path:
+        pass
+    pool.close()
+    assert not os.path.exists(path)
+    assert path not in git_repo.git("worktree", "list")
+
+
+def test_resolve_conflict_preview_does_not_move_branches(git_repo, remote_commit):
+    """O preview resolve no worktree alugado; branch e checkout do usuário ficam intactos."""
+    remote_commit("develop", "conflito.txt")
+    git_repo.git("checkout", "-q", "-b", "feature/x", "main")
+    branch_sha = git_repo.commit_file("conflito.txt", "versão da feature")
+    git_repo.git("checkout", "-q", "main")
+    head_before = git_repo.git("rev-parse", "HEAD")
+
+    try:
+        msg = resolve_conflict(git_repo.path, "feature/x", base_branch="develop", favor="theirs",
+                               strategy="rebase", preview=True)
+    finally:
+        close_worktree_pools()
+
+    assert "(não enviado ao remoto)" in msg
+    assert git_repo.git("rev-parse", "refs/heads/feature/x") == branch_sha
+    assert git_repo.git("rev-parse", "HEAD") == head_before
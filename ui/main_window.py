@@ -1,3 +1,6 @@
+import functools
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
@@ -5,16 +8,35 @@ from tkinter import ttk, filedialog, messagebox
 from services.branch_service import list_branches, update_branch, create_branch, list_remote_branches, \
     safe_checkout
 from services.branch_service import resolve_conflict
+from services.bulk_update_service import bulk_update_branches, list_feature_branches
 from services.commit_service import commit_changes, commit_and_push
-from services.delete_service import delete_remote_branch, delete_local_branch, delete_all_local_branches, delete_all_remote_branches
+from services.branch_analyzer_service import analyze_branches, STATUS_MERGED, STATUS_SQUASHED
+from services.conflict_radar_service import ConflictRadar
+from services.delete_service import delete_remote_branch, delete_local_branch, delete_local_branches, \
+    delete_all_local_branches, delete_all_remote_branches
 from services.rollback_service import rollback_commit, rollback_changes
 from services.pr_service import create_pr, merge_pr
-from services.stash_service import stash_save, stash_list, stash_apply, stash_pop, stash_drop, stash_clear
+from services.stash_service import stash_save, stash_list, stash_apply, stash_pop, stash_drop, stash_clear, \
+    list_stashes, iter_stash_patch
 from core.git_operations import GitCommandError, get_current_branch, get_default_main_branch
-from utils.worker_thread import run_in_thread
+from utils.worker_thread import run_in_thread, TaskPriority
+from utils.ui_dispatcher import UIDispatcher
+from core.cancellation import CancellationToken, operation_scope
 from core.logger_config import setup_logging
+from core.merge_engine import OVERLAP_WARNING_STAGE
+from core.metrics import OpenMetricsExporter
+from core.prefetch import Prefetcher
+from core.push import delete_remote_branches
+from core.repo_context import get_repo_context, release_repo_context
+from core.status import iter_status, StatusEntry
+from ui.virtual_text import VirtualTextView
 from utils.settings import get_theme, set_theme
 from utils.settings import get_protected_branches, set_protected_branches, get_default_strategy, set_default_strategy
+from utils.settings import get_metrics_export_path, get_prefetch_enabled, set_prefetch_enabled
+
+# Painel de arquivos alterados: linhas enviadas à UI por lote e limite exibido
+CHANGED_FILES_BATCH = 500
+CHANGED_FILES_MAX_ROWS = 20000
 
 
 class MainWindow(tk.Tk):
@@ -22,12 +44,29 @@ class MainWindow(tk.Tk):
         super().__init__()
         # Configurar logging
         setup_logging()
+        # Exportação opcional de métricas (OpenMetrics) configurada em settings.json
+        self._metrics_exporter = None
+        metrics_path = get_metrics_export_path()
+        if metrics_path:
+            self._metrics_exporter = OpenMetricsExporter(metrics_path)
+            self._metrics_exporter.start()
         self.title("🚀 Automação Git com Tkinter")
         self.configure(bg="#f7f8fa")
         self.repo_path = None
         self.is_loading = False
+        # Callbacks dos workers são executados na thread do Tk por este pump
+        self._dispatcher = UIDispatcher(self)
+        self._dispatcher.start()
+        # Tokens das operações em andamento (botão "Cancelar")
+        self._active_tokens = set()
+        # Prefetch em segundo plano do repositório selecionado (opcional)
+        self._prefetcher = None
+        # Radar de conflitos do repositório atual (atualização incremental)
+        self._conflict_radar = None
         self._setup_theme()
         self._build_ui()
+        # Fechar pela barra de título passa pela mesma limpeza do botão "Sair"
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
         # Carregar tema salvo nas configurações do usuário
         saved_theme = get_theme()
         if saved_theme:
@@ -105,6 +144,7 @@ class MainWindow(tk.Tk):
         self.repo_entry.pack(side="left", padx=(8, 0), fill="x", expand=True)
         ttk.Button(repo_frame, text="Selecionar Repositório", command=self.on_select_repo).pack(side="left", padx=(12, 0))
         ttk.Button(repo_frame, text="⚙ Configurações", command=self._open_settings).pack(side="left", padx=(8, 0))
+        ttk.Button(repo_frame, text="⏹ Cancelar", command=self.on_cancelar_operacao).pack(side="left", padx=(8, 0))
 
         # Frame de botões agrupados por categoria
         button_area = ttk.Frame(main_frame)
@@ -121,12 +161,15 @@ class MainWindow(tk.Tk):
             ("🔄 Atualizar Branch", self.on_atualizar_branch),
             ("🔁 Rebase Branch", lambda: self._quick_update(strategy="rebase")),
             ("🔀 Merge Branch", lambda: self._quick_update(strategy="merge")),
+            ("📚 Atualizar Todas", self.on_atualizar_todas),
+            ("🛰 Radar de Conflitos", self.on_radar_conflitos),
             ("🌿 Checkout de Branch", self.on_checkout_branch),
             ("🌱 Criar Branch", self.on_criar_branch),
         ], btn_width=18)
         add_group("Commit", [
             ("💬 Fazer Commit", self.on_commit),
             ("💾 Commit + Push", self.on_commit_push),
+            ("📄 Arquivos Alterados", self.on_arquivos_alterados),
             ("↩️ Rollback de Alterações", self.on_realizar_rollback_de_alteracoes),
             ("↩️ Rollback de Commit", self.on_realizar_rollback),
         ], btn_width=18)
@@ -149,6 +192,8 @@ class MainWindow(tk.Tk):
         ttk.Button(delete_group, text="🗑️ Deletar Branch Local Selecionada", command=self.on_deletar_branch_local, style="Danger.TButton", width=32).pack(pady=6, fill="x")
         ttk.Button(delete_group, text="🧹 Deletar Todas as Branches Remotas (exceto protegidas)", command=self.on_deletar_todas_remotas, style="Danger.TButton", width=44).pack(pady=6, fill="x")
         ttk.Button(delete_group, text="🚮 Deletar Branch Remota Selecionada", command=self.on_deletar_branch_remota, style="Danger.TButton", width=32).pack(pady=6, fill="x")
+        ttk.Button(delete_group, text="🔍 Limpeza Seletiva (mescladas / squash / inativas)",
+                   command=self.on_limpeza_seletiva, style="Danger.TButton", width=44).pack(pady=6, fill="x")
         ttk.Button(delete_group, text="❌ Sair do Sistema", command=self.destroy, width=18).pack(pady=6, fill="x")
 
         # Área de logs separada visualmente
@@ -178,13 +223,34 @@ class MainWindow(tk.Tk):
     # UTILITÁRIOS
     # =====================================================
     def log(self, text):
+        # Chamado também de dentro dos workers: widgets só na thread do Tk
+        if not self._dispatcher.is_ui_thread():
+            return self._dispatcher.post(self.log, text)
         self.log_text.config(state="normal")
         self.log_text.insert("end", f"[LOG] {text}\n")
         self.log_text.config(state="disabled")
         self.log_text.see("end")
 
-    def _run_async(self, func, args=(), on_success=None, on_error=None):
-        """Executa função em thread para não congelar UI."""
+    def _run_async(self, func, args=(), on_success=None, on_error=None, mutating=True,
+                   priority=TaskPriority.INTERACTIVE):
+        """Executa função no pool de workers para não congelar UI.
+
+        Operações mutantes no mesmo repositório são serializadas pelo agendador.
+        Os callbacks são despachados para a thread do Tk via UIDispatcher.
+        Cada operação recebe um CancellationToken (botão "Cancelar") e o
+        progresso de fetch/push é exibido no status.
+        """
+        token = CancellationToken()
+        self._active_tokens.add(token)
+
+        def on_progress(event):
+            self._dispatcher.post(self._show_progress, event)
+
+        @functools.wraps(func)
+        def scoped(*call_args):
+            with operation_scope(token, on_progress):
+                return func(*call_args)
+
         def on_success_wrapper(result):
             self.is_loading = False
             if on_success:
@@ -196,18 +262,42 @@ class MainWindow(tk.Tk):
                 on_error(error)
 
         def on_finally():
+            self._active_tokens.discard(token)
             # Atualizar UI após conclusão
             self.update_idletasks()
 
         self.is_loading = True
-        run_in_thread(
-            func,
+        return run_in_thread(
+            scoped,
             args=args,
-            on_success=on_success_wrapper,
-            on_error=on_error_wrapper,
-            on_finally=on_finally
+            on_success=self._dispatcher.wrap(on_success_wrapper),
+            on_error=self._dispatcher.wrap(on_error_wrapper),
+            on_finally=self._dispatcher.wrap(on_finally),
+            repo=self.repo_path,
+            mutating=mutating,
+            priority=priority
         )
 
+    def _show_progress(self, event):
+        """Mostra o progresso de fetch/push no label de status."""
+        if event.stage == OVERLAP_WARNING_STAGE:
+            # Aviso antecipado de conflito: também fica registrado no log
+            self.log(f"⚠️ {event.message}")
+        try:
+            prefix = "⚠️" if event.stage == OVERLAP_WARNING_STAGE else "⏳"
+            self.status_label.config(text=f"{prefix} {event.message}")
+        except Exception:
+            pass
+
+    def on_cancelar_operacao(self):
+        """Cancela as operações em andamento (encerra os processos git)."""
+        if not self._active_tokens:
+            return messagebox.showinfo("Cancelar", "Nenhuma operação em andamento.")
+        for token in list(self._active_tokens):
+            token.cancel()
+        self.status_label.config(text="")
+        self.log("Cancelamento solicitado para as operações em andamento.")
+
     def on_select_repo(self):
         repo = filedialog.askdirectory(title="Selecione o repositório Git")
         if repo:
@@ -216,12 +306,41 @@ class MainWindow(tk.Tk):
             if not os.path.isdir(os.path.join(repo, ".git")):
                 return messagebox.showerror("Erro", "Pasta selecionada não é um repositório Git válido.\nCertifique-se de que contém a pasta '.git'.")
 
-            self.repo_path = repo
+            try:
+                context = get_repo_context(repo)
+            except GitCommandError as e:
+                return messagebox.showerror("Erro", f"Não foi possível abrir o repositório:\n{e}")
+
+            # Troca de repositório: libera caches, pool de worktrees etc. do anterior
+            if self.repo_path is not None and self.repo_path is not context:
+                release_repo_context(self.repo_path)
+            self.repo_path = context
             self.repo_entry.config(state="normal")
             self.repo_entry.delete(0, "end")
             self.repo_entry.insert(0, repo)
             self.repo_entry.config(state="readonly")
             self.log(f"Repositório selecionado: {repo}")
+            self._restart_prefetcher()
+
+    def destroy(self):
+        """Encerra as tarefas em segundo plano (métricas, prefetch, pump da UI) e fecha a janela."""
+        if self._metrics_exporter is not None:
+            self._metrics_exporter.stop()
+            self._metrics_exporter = None
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+        self._dispatcher.stop()
+        super().destroy()
+
+    def _restart_prefetcher(self):
+        """(Re)inicia o prefetch em segundo plano conforme as configurações."""
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+        if self.repo_path and get_prefetch_enabled():
+            self._prefetcher = Prefetcher(self.repo_path)
+            self._prefetcher.start()
 
     # =====================================================
     # POPUP PADRÃO
@@ -352,10 +471,112 @@ class MainWindow(tk.Tk):
 
             self._run_async(execute, on_success=on_success, on_error=on_error)
 
-            self._run_async(execute, on_success=on_success, on_error=on_error)
-
         ttk.Button(popup, text="Atualizar", command=confirmar, width=18).pack(pady=12)
 
+    def on_atualizar_todas(self):
+        """Atualiza todas as branches feature/* com a base em worktrees temporários."""
+        if not self.repo_path:
+            return messagebox.showwarning("Atenção", "Selecione o repositório primeiro.")
+
+        try:
+            branches = list_feature_branches(self.repo_path)
+            remotes = list_remote_branches(self.repo_path)
+        except Exception as e:
+            return messagebox.showerror("Erro", str(e))
+        if not branches:
+            return messagebox.showinfo("Atualizar Todas", "Nenhuma branch local 'feature/*' encontrada.")
+
+        popup = tk.Toplevel(self)
+        popup.title("Atualizar Todas as Branches")
+        popup.geometry("480x260")
+        popup.configure(bg="#F9FAFB")
+
+        ttk.Label(popup, text=f"{len(branches)} branch(es) feature/* serão atualizadas.").pack(pady=(12, 4))
+
+        base_options = [b for b in ["develop", "main", "master"] if b in remotes] or ["main"]
+        ttk.Label(popup, text="Branch Base (destino):").pack(pady=(8, 4))
+        base_var = tk.StringVar(value=base_options[0])
+        ttk.Combobox(popup, textvariable=base_var, values=base_options, state="readonly", width=50).pack()
+
+        strategy_var = tk.StringVar(value=get_default_strategy())
+        ttk.Radiobutton(popup, text="Rebase", variable=strategy_var, value="rebase").pack(pady=(8, 0))
+        ttk.Radiobutton(popup, text="Merge", variable=strategy_var, value="merge").pack()
+
+        def confirmar():
+            base = base_var.get().strip()
+            strategy = strategy_var.get()
+            popup.destroy()
+            self.log(f"Atualizando {len(branches)} branch(es) sobre '{base}' via {strategy} (worktrees)...")
+
+            def on_success(results):
+                self.status_label.config(text="")
+                self._show_bulk_results(results)
+
+            def on_error(error):
+                self.status_label.config(text="")
+                messagebox.showerror("Erro", str(error))
+                self.log(f"❌ Erro na atualização em lote: {error}")
+
+            self._run_async(bulk_update_branches, (self.repo_path, branches, base, strategy), on_success, on_error)
+
+        ttk.Button(popup, text="Confirmar", command=confirmar).pack(pady=12)
+
+    def _show_bulk_results(self, results):
+        """Exibe a tabela de resultados da atualização em lote."""
+        for r in results:
+            self.log(f"{r.branch}: {r.status}{' - ' + r.detail if r.detail else ''}")
+        self._show_table(
+            "Resultado da Atualização em Lote",
+            (("Branch", 220), ("Status", 120), ("Detalhe", 380)),
+            [(r.branch, r.status, r.detail) for r in results],
+        )
+
+    def _show_table(self, title, columns, rows):
+        """Popup com uma tabela simples (columns: [(título, largura)], rows: tuplas)."""
+        popup = tk.Toplevel(self)
+        popup.title(title)
+        popup.geometry("760x360")
+        popup.configure(bg="#F9FAFB")
+
+        names = [f"c{i}" for i in range(len(columns))]
+        table = ttk.Treeview(popup, columns=names, show="headings")
+        for name, (heading, width) in zip(names, columns):
+            table.heading(name, text=heading)
+            table.column(name, width=width, anchor="w")
+        for row in rows:
+            table.insert("", "end", values=row)
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        ttk.Button(popup, text="Fechar", command=popup.destroy).pack(pady=(0, 10))
+
+    def on_radar_conflitos(self):
+        """Mostra quais branches feature/* conflitariam com a base (sem alterar nada)."""
+        if not self.repo_path:
+            return messagebox.showwarning("Atenção", "Selecione o repositório primeiro.")
+
+        # Radar mantido por repositório: atualizações seguintes só recalculam o que mudou
+        if self._conflict_radar is None or self._conflict_radar.repo_path != self.repo_path:
+            self._conflict_radar = ConflictRadar(self.repo_path)
+        self.log("Analisando conflitos das branches com a base...")
+
+        def on_success(entries):
+            self.status_label.config(text="")
+            conflicting = [e for e in entries if e.conflicting]
+            self.log(f"Radar de conflitos: {len(conflicting)} de {len(entries)} branch(es) com conflito.")
+            self._show_table(
+                f"Radar de Conflitos (base: {self._conflict_radar.base_branch})",
+                (("Branch", 220), ("Situação", 120), ("Arquivos", 380)),
+                [(e.branch, e.status, ", ".join(e.conflicts)) for e in entries],
+            )
+
+        def on_error(error):
+            self.status_label.config(text="")
+            messagebox.showerror("Erro", str(error))
+            self.log(f"❌ Erro no radar de conflitos: {error}")
+
+        self._run_async(self._conflict_radar.refresh, (), on_success, on_error,
+                        mutating=False, priority=TaskPriority.BACKGROUND)
+
     def _quick_update(self, strategy: str):
         """Abre popup simples para escolher branch/base e executa update_branch com strategy fixa."""
         if not self.repo_path:
@@ -572,6 +793,83 @@ class MainWindow(tk.Tk):
 
         self._run_async(execute, on_success=on_success, on_error=on_error)
 
+    def on_arquivos_alterados(self):
+        """Painel com os arquivos alterados, preenchido enquanto o git status é lido."""
+        if not self.repo_path:
+            return messagebox.showwarning("Atenção", "Selecione o repositório primeiro.")
+
+        popup = tk.Toplevel(self)
+        popup.title("📄 Arquivos Alterados")
+        popup.geometry("760x440")
+        popup.configure(bg="#F9FAFB")
+
+        summary_label = ttk.Label(popup, text="⏳ Lendo o status...")
+        summary_label.pack(pady=(10, 0))
+        frame = ttk.Frame(popup)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        columns = (("Situação", 120), ("XY", 40), ("Arquivo", 560))
+        names = [f"c{i}" for i in range(len(columns))]
+        table = ttk.Treeview(frame, columns=names, show="headings")
+        for name, (heading, width) in zip(names, columns):
+            table.heading(name, text=heading)
+            table.column(name, width=width, anchor="w")
+        scrollbar = ttk.Scrollbar(frame, command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        table.pack(side="left", fill="both", expand=True)
+        ttk.Button(popup, text="Fechar", command=popup.destroy, width=12).pack(pady=(0, 10))
+
+        kinds = {
+            "ordinary": "alterado",
+            "renamed": "renomeado",
+            "unmerged": "⚠️ conflito",
+            "untracked": "não rastreado",
+        }
+        closed = threading.Event()
+        popup.bind("<Destroy>", lambda e: closed.set() if e.widget is popup else None)
+
+        def add_rows(batch):
+            if closed.is_set():
+                return
+            for entry in batch:
+                table.insert("", "end", values=(kinds.get(entry.kind, entry.kind), entry.xy, entry.display[3:]))
+
+        def execute():
+            # Linhas enviadas à UI em lotes; a lista completa nunca fica em memória
+            counts = dict.fromkeys(kinds, 0)
+            batch, shown = [], 0
+            for record in iter_status(self.repo_path):
+                if closed.is_set():
+                    break
+                if not isinstance(record, StatusEntry):
+                    continue
+                counts[record.kind] += 1
+                if shown < CHANGED_FILES_MAX_ROWS:
+                    batch.append(record)
+                    shown += 1
+                if len(batch) >= CHANGED_FILES_BATCH:
+                    self._dispatcher.post(add_rows, batch)
+                    batch = []
+            if batch:
+                self._dispatcher.post(add_rows, batch)
+            return counts, shown
+
+        def on_success(result):
+            if closed.is_set():
+                return
+            counts, shown = result
+            text = " | ".join(f"{kinds[k]}: {n}" for k, n in counts.items() if n) or "✅ Nenhuma alteração local."
+            if shown < sum(counts.values()):
+                text += f"  (exibindo os primeiros {shown})"
+            summary_label.config(text=text)
+
+        def on_error(error):
+            if not closed.is_set():
+                summary_label.config(text=f"❌ {error}")
+            self.log(f"❌ Erro ao ler o status: {error}")
+
+        self._run_async(execute, on_success=on_success, on_error=on_error, mutating=False)
+
     def on_realizar_rollback(self):
         if not self.repo_path:
             return messagebox.showwarning("Aviso", "Selecione um repositório primeiro.")
@@ -712,7 +1010,8 @@ class MainWindow(tk.Tk):
                 messagebox.showerror("Erro no Merge PR", err_str)
                 self.log(f"Erro ao mesclar PR: {err_str}")
 
-            self._run_async(execute, on_success=on_success, on_error=on_error)
+            # Merge via API do GitHub: não altera o repositório local
+            self._run_async(execute, on_success=on_success, on_error=on_error, mutating=False)
 
         button_frame = ttk.Frame(popup)
         button_frame.pack(pady=20)
@@ -789,11 +1088,6 @@ class MainWindow(tk.Tk):
     def on_deletar_todas_remotas(self):
         if not self.repo_path:
             return messagebox.showwarning("Atenção", "Selecione o repositório primeiro.")
-        if not messagebox.askyesno("Confirmação", "Deseja deletar TODAS as branches remotas (exceto protegidas: main, master, develop)?"):
-            return
-
-        def execute():
-            return delete_all_remote_branches(self.repo_path)
 
         def on_success(result):
             messagebox.showinfo("Sucesso", result)
@@ -803,7 +1097,113 @@ class MainWindow(tk.Tk):
             messagebox.showerror("Erro", str(error))
             self.log(str(error))
 
-        self._run_async(execute, on_success=on_success, on_error=on_error)
+        def on_plan(plan):
+            # Plano (--dry-run) mostrado antes de alterar o remoto
+            if plan.would_delete:
+                text = f"🧪 Seriam deletadas ({len(plan.branches)}): {', '.join(plan.branches)}"
+            else:
+                text = "Nenhuma branch remota seria deletada."
+            if plan.rejected:
+                text += f"\n⚠️ Não deletadas: {', '.join(plan.rejected)}"
+            if not plan.would_delete:
+                return messagebox.showinfo("Deletar Branches Remotas", text)
+            if not messagebox.askyesno("Confirmação", f"{text}\n\nDeseja deletar essas branches remotas?"):
+                return
+            # Deleção em massa: classe de manutenção, não bloqueia cliques interativos
+            self._run_async(delete_all_remote_branches, (self.repo_path,), on_success, on_error,
+                            priority=TaskPriority.MAINTENANCE)
+
+        self._run_async(lambda: delete_all_remote_branches(self.repo_path, dry_run=True),
+                        on_success=on_plan, on_error=on_error, priority=TaskPriority.MAINTENANCE)
+
+    def on_limpeza_seletiva(self):
+        """Classifica as branches (mesclada/squash/inativa/ativa) e deleta as escolhidas."""
+        if not self.repo_path:
+            return messagebox.showwarning("Atenção", "Selecione o repositório primeiro.")
+        self.log("Analisando branches para limpeza...")
+
+        def on_success(results):
+            self.status_label.config(text="")
+            if not results:
+                return messagebox.showinfo("Limpeza Seletiva", "Nenhuma branch não protegida encontrada.")
+            self._show_cleanup_selection(results)
+
+        def on_error(error):
+            self.status_label.config(text="")
+            messagebox.showerror("Erro", str(error))
+            self.log(f"❌ Erro ao analisar branches: {error}")
+
+        self._run_async(analyze_branches, (self.repo_path,), on_success, on_error,
+                        mutating=False, priority=TaskPriority.BACKGROUND)
+
+    def _show_cleanup_selection(self, results):
+        """Tabela com seleção múltipla; mescladas e squash já vêm selecionadas."""
+        popup = tk.Toplevel(self)
+        popup.title("Limpeza Seletiva de Branches")
+        popup.geometry("820x440")
+        popup.configure(bg="#F9FAFB")
+
+        ttk.Label(popup, text="Selecione as branches a deletar (Ctrl/Shift para seleção múltipla):").pack(pady=(10, 0))
+        columns = (("Branch", 260), ("Situação", 100), ("Dias", 60), ("Detalhe", 340))
+        names = [f"c{i}" for i in range(len(columns))]
+        table = ttk.Treeview(popup, columns=names, show="headings", selectmode="extended")
+        for name, (heading, width) in zip(names, columns):
+            table.heading(name, text=heading)
+            table.column(name, width=width, anchor="w")
+        by_item = {}
+        for r in results:
+            item = table.insert("", "end", values=(r.name, r.status, r.age_days, r.detail))
+            by_item[item] = r
+        table.selection_set([i for i, r in by_item.items() if r.status in (STATUS_MERGED, STATUS_SQUASHED)])
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def deletar():
+            selected = [by_item[i] for i in table.selection()]
+            if not selected:
+                return messagebox.showwarning("Atenção", "Nenhuma branch selecionada.")
+            remotas = sum(1 for r in selected if r.remote)
+            if not messagebox.askyesno(
+                "Confirmação",
+                f"Deletar {len(selected) - remotas} branch(es) local(is) e {remotas} remota(s)?",
+            ):
+                return
+            popup.destroy()
+            self._delete_selected_branches(selected)
+
+        frame = ttk.Frame(popup)
+        frame.pack(pady=(0, 10))
+        ttk.Button(frame, text="🗑️ Deletar Selecionadas", command=deletar, style="Danger.TButton",
+                   width=24).grid(row=0, column=0, padx=5)
+        ttk.Button(frame, text="Fechar", command=popup.destroy, width=12).grid(row=0, column=1, padx=5)
+
+    def _delete_selected_branches(self, selected):
+        def execute():
+            messages = []
+            # Locais: um único lote (branch -D em blocos)
+            for res in delete_local_branches(self.repo_path, [r.branch for r in selected if not r.remote]):
+                if res.deleted:
+                    messages.append(f"🗑️ Branch local '{res.branch}' removida (era {res.detail[:10]}).")
+                else:
+                    messages.append(f"⚠️ {res.branch}: {res.detail}")
+            # Remotas: pushes multi-refspec, só se o remoto ainda estiver no SHA analisado
+            remotas = {r.branch: r.sha for r in selected if r.remote}
+            for ref in delete_remote_branches(self.repo_path, list(remotas), expected=remotas):
+                if ref.ok:
+                    messages.append(f"🗑️ Branch remota '{ref.branch}' deletada.")
+                else:
+                    messages.append(f"⚠️ origin/{ref.branch}: {ref.reason or ref.summary}")
+            return messages
+
+        def on_success(messages):
+            for msg in messages:
+                self.log(msg)
+            messagebox.showinfo("Limpeza Seletiva", f"{len(messages)} branch(es) processada(s). Veja o log.")
+
+        def on_error(error):
+            messagebox.showerror("Erro", str(error))
+            self.log(str(error))
+
+        self._run_async(execute, on_success=on_success, on_error=on_error, priority=TaskPriority.MAINTENANCE)
 
     # =====================================================
     # OPERAÇÕES DE STASH
@@ -847,128 +1247,201 @@ class MainWindow(tk.Tk):
         ttk.Button(button_frame, text="Cancelar", command=popup.destroy, width=15).grid(row=0, column=1, padx=5)
 
     def on_ver_stashes(self):
-        """Lista todos os stashes salvos."""
+        """Navegador de stashes: lista paginada com resumo e patch carregado sob demanda."""
         if not self.repo_path:
             return messagebox.showwarning("Atenção", "Selecione o repositório primeiro.")
 
-        try:
-            stashes = stash_list(self.repo_path)
-
-            if not stashes:
-                messagebox.showinfo("Stashes", "📋 Nenhum stash encontrado.")
-                self.log("Nenhum stash encontrado.")
-                return
-
-            # Criar popup com lista de stashes
-            popup = tk.Toplevel(self)
-            popup.title("📋 Lista de Stashes")
-            popup.geometry("600x400")
-            popup.configure(bg="#F9FAFB")
-
-            ttk.Label(popup, text="Stashes Salvos:", font=("Segoe UI", 12, "bold")).pack(pady=10)
-
-            # Frame com scrollbar
-            frame = ttk.Frame(popup)
-            frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-            scrollbar = ttk.Scrollbar(frame)
-            scrollbar.pack(side="right", fill="y")
-
-            listbox = tk.Listbox(
-                frame,
-                yscrollcommand=scrollbar.set,
-                font=("Courier", 10),
-                bg="#FFFFFF",
-                selectmode="single"
-            )
-            listbox.pack(side="left", fill="both", expand=True)
-            scrollbar.config(command=listbox.yview)
-
-            for stash in stashes:
-                listbox.insert("end", stash)
-
-            button_frame = ttk.Frame(popup)
-            button_frame.pack(pady=10)
-
-            def aplicar_selecionado():
-                selection = listbox.curselection()
-                if not selection:
-                    return messagebox.showwarning("Aviso", "Selecione um stash primeiro.")
-
-                stash_text = listbox.get(selection[0])
-                stash_ref = stash_text.split(":")[0]
-
-                def execute():
-                    return stash_apply(self.repo_path, stash_ref)
+        popup = tk.Toplevel(self)
+        popup.title("📋 Stashes")
+        popup.geometry("980x640")
+        popup.configure(bg="#F9FAFB")
 
-                def on_success(result):
-                    messagebox.showinfo("Sucesso", result)
-                    self.log(result)
+        paned = ttk.PanedWindow(popup, orient="vertical")
+        paned.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Lista (uma página por vez; "Carregar mais" busca a seguinte)
+        list_frame = ttk.Frame(paned)
+        columns = (("Stash", 90), ("Data", 130), ("Mensagem", 430), ("Arquivos", 70), ("+/-", 110))
+        names = [f"c{i}" for i in range(len(columns))]
+        table = ttk.Treeview(list_frame, columns=names, show="headings", selectmode="browse", height=8)
+        for name, (heading, width) in zip(names, columns):
+            table.heading(name, text=heading)
+            table.column(name, width=width, anchor="w")
+        list_scroll = ttk.Scrollbar(list_frame, command=table.yview)
+        table.configure(yscrollcommand=list_scroll.set)
+        list_scroll.pack(side="right", fill="y")
+        table.pack(side="top", fill="both", expand=True)
+        more_button = ttk.Button(list_frame, text="⬇️ Carregar mais", state="disabled")
+        more_button.pack(pady=(4, 0))
+        paned.add(list_frame, weight=1)
+
+        # Patch do stash selecionado: só as linhas visíveis vão para o widget
+        patch_frame = ttk.Frame(paned)
+        nav = ttk.Frame(patch_frame)
+        nav.pack(fill="x")
+        patch_label = ttk.Label(nav, text="Selecione um stash para ver o patch.")
+        patch_label.pack(side="left")
+        viewer = VirtualTextView(patch_frame, on_need_more=lambda: load_patch_page())
+        ttk.Button(nav, text="⬇️ Próximo hunk", command=viewer.next_hunk).pack(side="right")
+        ttk.Button(nav, text="⬆️ Hunk anterior", command=viewer.prev_hunk).pack(side="right", padx=5)
+        viewer.pack(fill="both", expand=True, pady=(4, 0))
+        paned.add(patch_frame, weight=3)
+
+        by_item = {}
+        pages = {"offset": 0}
+        # Gerador do patch atual; `token` muda a cada seleção (páginas antigas são descartadas)
+        patch = {"gen": None, "token": 0, "loading": False}
+        # O git do patch vive com a janela: cancelado (processo encerrado) quando ela é destruída
+        viewer_token = CancellationToken()
+
+        def load_page():
+            more_button.config(state="disabled")
+
+            def on_success(page):
+                if not popup.winfo_exists():
+                    return
+                if not page.entries and not by_item:
                     popup.destroy()
+                    messagebox.showinfo("Stashes", "📋 Nenhum stash encontrado.")
+                    return self.log("Nenhum stash encontrado.")
+                for entry in page.entries:
+                    item = table.insert("", "end", values=(
+                        entry.ref,
+                        time.strftime("%d/%m/%Y %H:%M", time.localtime(entry.timestamp)),
+                        entry.message,
+                        len(entry.files),
+                        f"+{entry.insertions} / -{entry.deletions}",
+                    ))
+                    by_item[item] = entry
+                pages["offset"] += len(page.entries)
+                more_button.config(state="normal" if page.has_more else "disabled")
+                self.log(f"{len(by_item)} stash(es) carregado(s).")
 
-                def on_error(error):
-                    messagebox.showerror("Erro", str(error))
-                    self.log(str(error))
-
-                self._run_async(execute, on_success=on_success, on_error=on_error)
-
-            def pop_selecionado():
-                selection = listbox.curselection()
-                if not selection:
-                    return messagebox.showwarning("Aviso", "Selecione um stash primeiro.")
-
-                stash_text = listbox.get(selection[0])
-                stash_ref = stash_text.split(":")[0]
+            def on_error(error):
+                messagebox.showerror("Erro", str(error))
+                self.log(str(error))
 
-                def execute():
-                    return stash_pop(self.repo_path, stash_ref)
+            self._run_async(list_stashes, (self.repo_path, pages["offset"]), on_success, on_error, mutating=False)
 
-                def on_success(result):
-                    messagebox.showinfo("Sucesso", result)
-                    self.log(result)
-                    popup.destroy()
+        def reload_list():
+            table.delete(*table.get_children())
+            by_item.clear()
+            pages["offset"] = 0
+            open_patch(None)
+            load_page()
 
-                def on_error(error):
-                    messagebox.showerror("Erro", str(error))
-                    self.log(str(error))
+        def load_patch_page():
+            if patch["loading"] or patch["gen"] is None or viewer.complete:
+                return
+            patch["loading"] = True
+            gen, token = patch["gen"], patch["token"]
+
+            def fetch():
+                # Todas as páginas sob o token da janela (o git é registrado na primeira)
+                with operation_scope(viewer_token):
+                    return next(gen, None)
+
+            def on_success(page):
+                patch["loading"] = False
+                if token != patch["token"]:
+                    # Seleção mudou (ou a janela fechou) durante a leitura: encerra o git do patch antigo
+                    gen.close()
+                    return load_patch_page()
+                if page is None:
+                    viewer.complete = True
+                    patch_label.config(text=f"{viewer.line_count} linha(s)")
+                else:
+                    viewer.append(page)
+                    patch_label.config(text=f"{viewer.line_count} linha(s) carregada(s)...")
 
-                self._run_async(execute, on_success=on_success, on_error=on_error)
+            def on_error(error):
+                patch["loading"] = False
+                if token != patch["token"]:
+                    return
+                viewer.complete = True
+                patch_label.config(text=f"❌ {error}")
+                self.log(str(error))
 
-            def deletar_selecionado():
-                selection = listbox.curselection()
-                if not selection:
-                    return messagebox.showwarning("Aviso", "Selecione um stash primeiro.")
+            self._run_async(fetch, on_success=on_success, on_error=on_error, mutating=False)
+
+        def open_patch(ref):
+            old = patch["gen"]
+            patch["token"] += 1
+            patch["gen"] = iter_stash_patch(self.repo_path, ref) if ref else None
+            if old is not None and not patch["loading"]:
+                old.close()
+            patch_label.config(text=f"⏳ Carregando {ref}..." if ref else "Selecione um stash para ver o patch.")
+            viewer.clear()      # pede a primeira página (on_need_more)
+
+        def selected_ref():
+            selection = table.selection()
+            if not selection:
+                messagebox.showwarning("Aviso", "Selecione um stash primeiro.")
+                return None
+            return by_item[selection[0]].ref
+
+        def run_action(action, ref, confirm=None):
+            if confirm and not messagebox.askyesno("Confirmar", confirm):
+                return
 
-                stash_text = listbox.get(selection[0])
-                stash_ref = stash_text.split(":")[0]
+            def on_success(result):
+                messagebox.showinfo("Sucesso", result)
+                self.log(result)
+                if popup.winfo_exists():
+                    reload_list()
 
-                if not messagebox.askyesno("Confirmar", f"Deseja deletar o stash '{stash_ref}'?"):
-                    return
+            def on_error(error):
+                messagebox.showerror("Erro", str(error))
+                self.log(str(error))
 
-                def execute():
-                    return stash_drop(self.repo_path, stash_ref)
+            self._run_async(action, (self.repo_path, ref), on_success, on_error)
 
-                def on_success(result):
-                    messagebox.showinfo("Sucesso", result)
-                    self.log(result)
-                    popup.destroy()
+        def aplicar_selecionado():
+            ref = selected_ref()
+            if ref:
+                run_action(stash_apply, ref)
 
-                def on_error(error):
-                    messagebox.showerror("Erro", str(error))
-                    self.log(str(error))
+        def pop_selecionado():
+            ref = selected_ref()
+            if ref:
+                run_action(stash_pop, ref)
 
-                self._run_async(execute, on_success=on_success, on_error=on_error)
+        def deletar_selecionado():
+            ref = selected_ref()
+            if ref:
+                run_action(stash_drop, ref, confirm=f"Deseja deletar o stash '{ref}'?")
 
-            ttk.Button(button_frame, text="♻️ Aplicar (manter)", command=aplicar_selecionado, width=20).grid(row=0, column=0, padx=5)
-            ttk.Button(button_frame, text="✅ Aplicar + Deletar", command=pop_selecionado, width=20).grid(row=0, column=1, padx=5)
-            ttk.Button(button_frame, text="🗑️ Deletar", command=deletar_selecionado, width=20).grid(row=0, column=2, padx=5)
-            ttk.Button(button_frame, text="Fechar", command=popup.destroy, width=20).grid(row=1, column=1, pady=10)
+        def on_destroy(event):
+            if event.widget is not popup:
+                return
+            # Descarta páginas pendentes e encerra o git, mesmo com uma leitura em andamento
+            patch["token"] += 1
+            gen, patch["gen"] = patch["gen"], None
+            viewer_token.cancel()
+            if gen is not None and not patch["loading"]:
+                gen.close()
+
+        def on_select(_event):
+            selection = table.selection()
+            if selection:
+                open_patch(by_item[selection[0]].ref)
+
+        table.bind("<<TreeviewSelect>>", on_select)
+        more_button.config(command=load_page)
+        popup.bind("<Destroy>", on_destroy)
 
-            self.log(f"Encontrados {len(stashes)} stash(es).")
+        button_frame = ttk.Frame(popup)
+        button_frame.pack(pady=(0, 10))
+        actions = (
+            ("♻️ Aplicar (manter)", aplicar_selecionado),
+            ("✅ Aplicar + Deletar", pop_selecionado),
+            ("🗑️ Deletar", deletar_selecionado),
+            ("Fechar", popup.destroy),
+        )
+        for column, (text, command) in enumerate(actions):
+            ttk.Button(button_frame, text=text, command=command, width=20).grid(row=0, column=column, padx=5)
 
-        except Exception as e:
-            messagebox.showerror("Erro", str(e))
-            self.log(str(e))
+        load_page()
 
     def on_aplicar_stash(self):
         """Aplica o stash mais recente."""
@@ -1128,7 +1601,7 @@ class MainWindow(tk.Tk):
         """Abre um dialog para editar branches protegidas e strategy padrão."""
         popup = tk.Toplevel(self)
         popup.title("Configurações")
-        popup.geometry("520x280")
+        popup.geometry("520x320")
         popup.configure(bg="#F9FAFB")
         popup.resizable(False, False)
 
@@ -1144,6 +1617,9 @@ class MainWindow(tk.Tk):
         ttk.Radiobutton(popup, text="Rebase (recomendado)", variable=strategy_var, value="rebase").pack()
         ttk.Radiobutton(popup, text="Merge", variable=strategy_var, value="merge").pack()
 
+        prefetch_var = tk.BooleanVar(value=get_prefetch_enabled())
+        ttk.Checkbutton(popup, text="Buscar o remoto em segundo plano (prefetch)", variable=prefetch_var).pack(pady=(12, 0))
+
         def salvar():
             branches_text = pb_var.get().strip()
             branches = [b.strip() for b in branches_text.split(",") if b.strip()]
@@ -1153,6 +1629,8 @@ class MainWindow(tk.Tk):
             try:
                 set_protected_branches(branches)
                 set_default_strategy(strategy_var.get())
+                set_prefetch_enabled(prefetch_var.get())
+                self._restart_prefetcher()
                 messagebox.showinfo("Salvo", "Configurações salvas com sucesso.")
                 popup.destroy()
             except Exception as e:
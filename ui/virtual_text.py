@@ -0,0 +1,136 @@
+"""
+Visualizador de texto virtualizado para patches grandes.
+
+As linhas ficam numa lista Python e o widget Text só recebe as que cabem na
+área visível; a rolagem troca esse trecho. Assim um patch com milhões de
+linhas não vira milhões de linhas no Tk. Quando a rolagem se aproxima do fim,
+`on_need_more` é chamado para carregar a próxima página.
+"""
+import bisect
+import tkinter as tk
+from tkinter import font as tkfont, ttk
+from typing import Callable, List, Optional
+
+# Linhas antes do fim em que a próxima página é pedida
+PREFETCH_MARGIN = 200
+
+_TAGS = (
+    ("diff --git", "file"),
+    ("@@", "hunk"),
+    ("+++", "file"),
+    ("---", "file"),
+    ("+", "added"),
+    ("-", "removed"),
+)
+
+
+class VirtualTextView(ttk.Frame):
+    """Text somente leitura que materializa apenas as linhas visíveis."""
+
+    def __init__(self, master, on_need_more: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_need_more = on_need_more
+        self._lines: List[str] = []
+        self._hunks: List[int] = []       # índices das linhas "diff --git" / "@@"
+        self._top = 0
+        self.complete = False             # sem mais páginas a carregar
+
+        self.text = tk.Text(self, wrap="none", font=("Courier", 10), bg="#FFFFFF", height=20)
+        self._linespace = max(1, tkfont.Font(font=self.text.cget("font")).metrics("linespace"))
+        self.text.tag_configure("file", font=("Courier", 10, "bold"))
+        self.text.tag_configure("hunk", foreground="#2563EB")
+        self.text.tag_configure("added", foreground="#15803D")
+        self.text.tag_configure("removed", foreground="#B91C1C")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        xscroll = ttk.Scrollbar(self, orient="horizontal", command=self.text.xview)
+        self.text.configure(xscrollcommand=xscroll.set, state="disabled")
+
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.text.grid(row=0, column=0, sticky="nsew")
+        xscroll.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(3))
+        self.text.bind("<Configure>", lambda e: self._render())
+        self.text.bind("<Up>", lambda e: self._key_scroll(-1))
+        self.text.bind("<Down>", lambda e: self._key_scroll(1))
+        self.text.bind("<Prior>", lambda e: self._key_scroll(-self._rows()))
+        self.text.bind("<Next>", lambda e: self._key_scroll(self._rows()))
+
+    # --------------------------------------------------------------- conteúdo
+    @property
+    def line_count(self) -> int:
+        return len(self._lines)
+
+    def clear(self):
+        self._lines = []
+        self._hunks = []
+        self._top = 0
+        self.complete = False
+        self._render()
+
+    def append(self, lines: List[str]):
+        """Acrescenta linhas (uma página) e atualiza a área visível se necessário."""
+        start = len(self._lines)
+        self._lines.extend(lines)
+        self._hunks.extend(start + i for i, line in enumerate(lines)
+                           if line.startswith("diff --git") or line.startswith("@@"))
+        self._render()
+
+    # ---------------------------------------------------------------- rolagem
+    def _rows(self) -> int:
+        """Linhas que cabem na altura atual do widget."""
+        height = self.text.winfo_height()
+        return max(1, height // self._linespace) if height > 1 else int(self.text.cget("height"))
+
+    def scroll(self, delta: int):
+        self.goto(self._top + delta)
+
+    def goto(self, line: int):
+        self._top = max(0, min(line, max(0, len(self._lines) - self._rows())))
+        self._render()
+
+    def next_hunk(self):
+        i = bisect.bisect_right(self._hunks, self._top)
+        if i < len(self._hunks):
+            self.goto(self._hunks[i])
+
+    def prev_hunk(self):
+        i = bisect.bisect_left(self._hunks, self._top)
+        if i > 0:
+            self.goto(self._hunks[i - 1])
+
+    def _key_scroll(self, delta: int):
+        self.scroll(delta)
+        return "break"
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.goto(int(float(value) * len(self._lines)))
+        elif action == "scroll":
+            step = self._rows() if unit == "pages" else 1
+            self.scroll(int(value) * step)
+
+    # ---------------------------------------------------------- renderização
+    def _render(self):
+        rows = self._rows()
+        visible = self._lines[self._top:self._top + rows]
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        for line in visible:
+            tag = next((t for prefix, t in _TAGS if line.startswith(prefix)), None)
+            self.text.insert("end", line + "\n", tag or ())
+        self.text.configure(state="disabled")
+
+        total = max(1, len(self._lines))
+        self.scrollbar.set(self._top / total, min(1.0, (self._top + rows) / total))
+        near_end = self._top + rows >= len(self._lines) - PREFETCH_MARGIN
+        if self.on_need_more and not self.complete and near_end:
+            self.on_need_more()
@@ -11,8 +11,17 @@ class RepoInfo(NamedTuple):
 
 def get_repo_info(repo_path: Path) -> RepoInfo:
     """Extrai user/repo da configuração Git local (.git/config)."""
+    # RepoContext (core.repo_context): config já lido na sessão
+    info = getattr(repo_path, "repo_info", None)
+    if info is not None:
+        return info
+    return read_repo_info(Path(repo_path) / ".git" / "config")
+
+
+def read_repo_info(config_path: Path) -> RepoInfo:
+    """Extrai user/repo do arquivo de configuração Git informado."""
     config = configparser.ConfigParser()
-    config.read(Path(repo_path) / ".git" / "config", encoding="utf-8")
+    config.read(config_path, encoding="utf-8")
 
     try:
         url = config["remote \"origin\""]["url"]
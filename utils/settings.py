@@ -1,5 +1,6 @@
 from __future__ import annotations
 import json
+import time
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -81,3 +82,89 @@ def set_default_strategy(value: str) -> None:
     settings = load_settings()
     settings["default_strategy"] = value
     save_settings(settings)
+
+
+def get_metrics_export_path(default: Optional[str] = None) -> Optional[str]:
+    """Retorna o caminho do arquivo OpenMetrics (exportação desativada se vazio)."""
+    settings = load_settings()
+    path = settings.get("metrics_export_path")
+    if isinstance(path, str) and path.strip():
+        return path
+    return default
+
+
+def get_prefetch_enabled(default: bool = False) -> bool:
+    """Indica se o prefetch em segundo plano do repositório selecionado está ativo."""
+    value = load_settings().get("background_prefetch")
+    if isinstance(value, bool):
+        return value
+    return default
+
+
+def set_prefetch_enabled(value: bool) -> None:
+    settings = load_settings()
+    settings["background_prefetch"] = bool(value)
+    save_settings(settings)
+
+
+def get_untracked_check(default: str = "normal") -> str:
+    """Modo de busca de arquivos não rastreados na verificação de alterações locais ("normal" ou "no")."""
+    value = load_settings().get("dirty_check_untracked")
+    if value in {"normal", "no"}:
+        return value
+    return default
+
+
+def set_untracked_check(value: str) -> None:
+    if value not in {"normal", "no"}:
+        return
+    settings = load_settings()
+    settings["dirty_check_untracked"] = value
+    save_settings(settings)
+
+
+# Tempos limite padrão (segundos) por subcomando Git; ausente = sem limite
+DEFAULT_GIT_TIMEOUTS = {
+    "fetch": 600,
+    "push": 600,
+    "pull": 600,
+    "clone": 1800,
+    "ls-remote": 120,
+}
+
+# [instante da leitura, timeouts] — evita ler o settings.json a cada comando Git
+_timeouts_cache: list = []
+
+
+def get_git_timeouts() -> Dict[str, float]:
+    """Retorna os tempos limite por subcomando (padrões + "git_timeouts" do settings.json).
+
+    A chave "default" (opcional) vale para subcomandos sem valor específico.
+    """
+    now = time.monotonic()
+    if _timeouts_cache and now - _timeouts_cache[0] < 30:
+        return _timeouts_cache[1]
+    timeouts = dict(DEFAULT_GIT_TIMEOUTS)
+    configured = load_settings().get("git_timeouts")
+    if isinstance(configured, dict):
+        for name, value in configured.items():
+            if isinstance(value, (int, float)) and value > 0:
+                timeouts[name] = value
+            elif value is None:
+                timeouts.pop(name, None)
+    _timeouts_cache[:] = [now, timeouts]
+    return timeouts
+
+
+def get_git_timeout(subcommand: str) -> Optional[float]:
+    """Tempo limite para um subcomando Git (None = sem limite)."""
+    timeouts = get_git_timeouts()
+    return timeouts.get(subcommand, timeouts.get("default"))
+
+
+def set_git_timeouts(timeouts: Dict[str, Optional[float]]) -> None:
+    """Define tempos limite por subcomando no arquivo de configurações."""
+    settings = load_settings()
+    settings["git_timeouts"] = timeouts
+    save_settings(settings)
+    _timeouts_cache.clear()
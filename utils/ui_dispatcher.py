@@ -0,0 +1,112 @@
+"""
+Despachante thread-safe de callbacks para a thread do Tk.
+
+Widgets Tk só podem ser usados na thread principal. Workers publicam
+callbacks numa queue.SimpleQueue; um único "pump" agendado com after()
+na thread do Tk drena a fila em lotes e mede o atraso de enfileiramento.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict
+from core.logger_config import get_logger
+
+logger = get_logger()
+
+
+class UIDispatcher:
+    """
+    Executa callbacks na thread do Tk.
+
+    Uso:
+        dispatcher = UIDispatcher(root)
+        dispatcher.start()
+        dispatcher.post(label.config, text="pronto")   # de qualquer thread
+        on_done = dispatcher.wrap(callback)             # callback seguro para workers
+    """
+
+    def __init__(self, root, interval_ms: int = 16, max_batch: int = 100):
+        self._root = root
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._ui_thread = threading.get_ident()
+        self._after_id = None
+        self._running = False
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        # Métricas de atraso (segundos entre post() e a execução na thread do Tk)
+        self.max_delay = 0.0
+        self.last_delay = 0.0
+        self.processed = 0
+
+    def start(self):
+        """Inicia o pump (deve ser chamado na thread do Tk)."""
+        self._ui_thread = threading.get_ident()
+        self._running = True
+        self._schedule(self.interval_ms)
+
+    def stop(self):
+        """Interrompe o pump; callbacks pendentes permanecem na fila."""
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def is_ui_thread(self) -> bool:
+        return threading.get_ident() == self._ui_thread
+
+    def post(self, callback: Callable, *args, **kwargs):
+        """Enfileira um callback para execução na thread do Tk (não bloqueia)."""
+        self._queue.put((time.perf_counter(), callback, args, kwargs))
+
+    def call(self, callback: Callable, *args, **kwargs):
+        """Executa imediatamente se já estiver na thread do Tk; senão enfileira."""
+        if self.is_ui_thread():
+            return callback(*args, **kwargs)
+        self.post(callback, *args, **kwargs)
+
+    def wrap(self, callback: Callable) -> Callable:
+        """Retorna uma versão do callback que sempre roda na thread do Tk."""
+        def wrapper(*args, **kwargs):
+            self.post(callback, *args, **kwargs)
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas do pump (atrasos em segundos)."""
+        return {
+            "processed": self.processed,
+            "max_delay": self.max_delay,
+            "last_delay": self.last_delay,
+            "pending": self._queue.qsize(),
+        }
+
+    def reset_stats(self):
+        self.max_delay = 0.0
+        self.last_delay = 0.0
+        self.processed = 0
+
+    def _schedule(self, delay_ms: int):
+        if self._running:
+            self._after_id = self._root.after(delay_ms, self._pump)
+
+    def _pump(self):
+        """Drena até max_batch callbacks e se reagenda."""
+        self._after_id = None
+        for _ in range(self.max_batch):
+            try:
+                enqueued_at, callback, args, kwargs = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            delay = time.perf_counter() - enqueued_at
+            self.last_delay = delay
+            if delay > self.max_delay:
+                self.max_delay = delay
+            self.processed += 1
+            try:
+                callback(*args, **kwargs)
+            except Exception as e:
+                logger.error("Erro em callback de UI %s: %s", getattr(callback, "__name__", callback), e)
+        # Se ainda houver trabalho, continua no próximo ciclo do event loop
+        self._schedule(0 if not self._queue.empty() else self.interval_ms)
@@ -1,10 +1,20 @@
 """
 Worker thread para executar operações Git sem congelar a UI.
 Implementa padrão produtor-consumidor com fila thread-safe.
+
+As tarefas rodam num pool limitado (TaskScheduler) com classes de prioridade
+(interativa, background, manutenção). Operações que alteram um repositório
+são serializadas por repositório (evita corridas no .git/index.lock);
+leituras rodam em paralelo.
 """
+import heapq
+import itertools
+import os
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import IntEnum
 from queue import Queue
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Dict, List, Optional
 from core.logger_config import get_logger
 
 logger = get_logger()
@@ -41,15 +51,15 @@ class WorkerThread(threading.Thread):
     def run(self):
         """Executa a tarefa e chama callbacks."""
         try:
-            logger.debug(f"Worker iniciado: {self.target.__name__}")
+            logger.debug("Worker iniciado: %s", self.target.__name__)
             self.result = self.target(*self.args)
 
             if self.on_success:
-                logger.debug(f"Worker sucesso: {self.target.__name__}")
+                logger.debug("Worker sucesso: %s", self.target.__name__)
                 self.on_success(self.result)
 
         except Exception as e:
-            logger.error(f"Worker erro em {self.target.__name__}: {e}")
+            logger.error("Worker erro em %s: %s", self.target.__name__, e)
             self.exception = e
 
             if self.on_error:
@@ -58,7 +68,204 @@ class WorkerThread(threading.Thread):
         finally:
             if self.on_finally:
                 self.on_finally()
-            logger.debug(f"Worker finalizado: {self.target.__name__}")
+            logger.debug("Worker finalizado: %s", self.target.__name__)
+
+
+class TaskPriority(IntEnum):
+    """Classes de prioridade (menor valor = executa primeiro)."""
+    INTERACTIVE = 0   # cliques do usuário (checkout, commit, update...)
+    BACKGROUND = 1    # refresh, prefetch, análises
+    MAINTENANCE = 2   # limpezas em massa, manutenção
+
+
+class _Task:
+    """Tarefa agendada: função, argumentos e o Future entregue ao chamador."""
+
+    __slots__ = ("func", "args", "kwargs", "future", "repo_key", "priority", "seq")
+
+    def __init__(self, func: Callable, args: tuple, kwargs: dict, future: Future,
+                 repo_key: Optional[str], priority: int, seq: int):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.repo_key = repo_key
+        self.priority = priority
+        self.seq = seq
+
+    def __lt__(self, other: "_Task") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class TaskScheduler:
+    """
+    Agendador de tarefas com prioridade sobre um ThreadPoolExecutor limitado.
+
+    - Tarefas prontas ficam numa fila de prioridade; o scheduler só entrega ao
+      executor quando há worker livre, então uma tarefa INTERACTIVE enviada
+      depois passa à frente de tarefas BACKGROUND/MAINTENANCE que aguardam.
+    - Tarefas BACKGROUND e MAINTENANCE ocupam no máximo `background_slots`
+      workers (MAINTENANCE no máximo `maintenance_slots`), deixando workers
+      livres para a interação do usuário mesmo com fetches lentos na rede.
+    - Tarefas mutantes (mutating=True) de um mesmo repositório executam uma de
+      cada vez; as que aguardam o repositório também são ordenadas por prioridade.
+    - Tarefas somente leitura (ou sem repositório) rodam em paralelo.
+
+    Uso:
+        future = get_scheduler().submit(update_branch, (repo, "feature/x"), repo=repo)
+        future.add_done_callback(...)
+        future.cancel()  # funciona enquanto a tarefa ainda aguarda na fila
+    """
+
+    def __init__(self, max_workers: int = 4, background_slots: Optional[int] = None, maintenance_slots: int = 1):
+        self.max_workers = max_workers
+        if background_slots is None:
+            background_slots = max_workers // 2
+        # Pelo menos um worker sempre livre para INTERACTIVE (com um único worker não há o que reservar)
+        self.background_slots = max(1, min(background_slots, max_workers - 1))
+        self.maintenance_slots = min(maintenance_slots, self.background_slots)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="git-worker")
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._ready: List[_Task] = []
+        self._running = 0
+        self._running_background = 0
+        self._running_maintenance = 0
+        self._busy_repos = set()
+        self._repo_queues: Dict[str, List[_Task]] = {}
+
+    def submit(
+        self,
+        func: Callable,
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        repo: Optional[str] = None,
+        mutating: bool = True,
+        priority: int = TaskPriority.INTERACTIVE
+    ) -> Future:
+        """Agenda a função e retorna um Future com o resultado."""
+        future = Future()
+        repo_key = os.fspath(repo) if (repo is not None and mutating) else None
+
+        with self._lock:
+            task = _Task(func, args, kwargs or {}, future, repo_key, int(priority), next(self._seq))
+            if repo_key is not None and repo_key in self._busy_repos:
+                # Repositório ocupado: aguarda a tarefa mutante atual terminar
+                heapq.heappush(self._repo_queues.setdefault(repo_key, []), task)
+                logger.debug("Tarefa %s enfileirada para %s", getattr(func, "__name__", func), repo_key)
+                return future
+            if repo_key is not None:
+                self._busy_repos.add(repo_key)
+            heapq.heappush(self._ready, task)
+            to_start = self._take_startable()
+
+        self._start(to_start)
+        return future
+
+    def _take_startable(self) -> List[_Task]:
+        """Retira da fila as tarefas que podem iniciar agora (chamado com o lock)."""
+        started = []
+        while self._ready and self._running < self.max_workers:
+            task = self._ready[0]
+            if task.priority >= TaskPriority.BACKGROUND and self._running_background >= self.background_slots:
+                # O topo é a tarefa de maior prioridade: as demais também são background
+                break
+            if task.priority >= TaskPriority.MAINTENANCE and self._running_maintenance >= self.maintenance_slots:
+                break
+            heapq.heappop(self._ready)
+            self._running += 1
+            if task.priority >= TaskPriority.BACKGROUND:
+                self._running_background += 1
+            if task.priority >= TaskPriority.MAINTENANCE:
+                self._running_maintenance += 1
+            started.append(task)
+        return started
+
+    def _start(self, tasks: List[_Task]):
+        for task in tasks:
+            self._executor.submit(self._run, task)
+
+    def _run(self, task: _Task):
+        try:
+            # Retorna False se o chamador cancelou enquanto a tarefa aguardava
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    result = task.func(*task.args, **task.kwargs)
+                except BaseException as e:
+                    task.future.set_exception(e)
+                else:
+                    task.future.set_result(result)
+        finally:
+            self._finish(task)
+
+    def _finish(self, task: _Task):
+        """Libera o worker (e o repositório) e inicia as próximas tarefas."""
+        with self._lock:
+            self._running -= 1
+            if task.priority >= TaskPriority.BACKGROUND:
+                self._running_background -= 1
+            if task.priority >= TaskPriority.MAINTENANCE:
+                self._running_maintenance -= 1
+            if task.repo_key is not None:
+                pending = self._repo_queues.get(task.repo_key)
+                if pending:
+                    # O repositório continua reservado para a próxima tarefa mutante
+                    heapq.heappush(self._ready, heapq.heappop(pending))
+                else:
+                    self._repo_queues.pop(task.repo_key, None)
+                    self._busy_repos.discard(task.repo_key)
+            to_start = self._take_startable()
+        self._start(to_start)
+
+    def pending_count(self) -> int:
+        """Quantidade de tarefas aguardando (prontas + aguardando repositório)."""
+        with self._lock:
+            return len(self._ready) + sum(len(q) for q in self._repo_queues.values())
+
+    def shutdown(self, wait: bool = True):
+        """Encerra o pool (tarefas já enviadas ao executor terminam)."""
+        self._executor.shutdown(wait=wait)
+
+
+_scheduler: Optional[TaskScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> TaskScheduler:
+    """Retorna o agendador global (criado sob demanda)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            # Workers aguardam processos git (E/S): mesmo com uma CPU, dois garantem a vaga interativa
+            _scheduler = TaskScheduler(max_workers=max(2, min(4, os.cpu_count() or 1)))
+        return _scheduler
+
+
+def _notify(
+    future: Future,
+    name: str,
+    on_success: Optional[Callable],
+    on_error: Optional[Callable],
+    on_finally: Optional[Callable]
+):
+    """Chama os callbacks de uma tarefa concluída (mesma semântica do WorkerThread)."""
+    try:
+        if future.cancelled():
+            logger.debug("Worker cancelado: %s", name)
+            return
+        error = future.exception()
+        if error is None:
+            logger.debug("Worker sucesso: %s", name)
+            if on_success:
+                on_success(future.result())
+        else:
+            logger.error("Worker erro em %s: %s", name, error)
+            if on_error:
+                on_error(error)
+    finally:
+        if on_finally:
+            on_finally()
+        logger.debug("Worker finalizado: %s", name)
 
 
 def run_in_thread(
@@ -66,20 +273,22 @@ def run_in_thread(
     args: tuple = (),
     on_success: Optional[Callable] = None,
     on_error: Optional[Callable] = None,
-    on_finally: Optional[Callable] = None
-) -> WorkerThread:
+    on_finally: Optional[Callable] = None,
+    repo: Optional[str] = None,
+    mutating: bool = True,
+    priority: int = TaskPriority.INTERACTIVE
+) -> Future:
     """
-    Executa função em thread separada sem bloquear UI.
+    Executa função no pool de workers sem bloquear UI.
 
-    Retorna: WorkerThread (pode usar .join() para aguardar)
-    """
-    worker = WorkerThread(
-        target=func,
-        args=args,
-        on_success=on_success,
-        on_error=on_error,
-        on_finally=on_finally
-    )
-    worker.start()
-    return worker
+    Se `repo` for informado e `mutating` for True, a tarefa é serializada com
+    as demais operações mutantes do mesmo repositório. `priority` define a
+    classe da tarefa (TaskPriority.INTERACTIVE por padrão).
 
+    Retorna: Future (pode usar .result() para aguardar ou .cancel() enquanto na fila)
+    """
+    name = getattr(func, "__name__", repr(func))
+    logger.debug("Worker agendado: %s", name)
+    future = get_scheduler().submit(func, args, repo=repo, mutating=mutating, priority=priority)
+    future.add_done_callback(lambda f: _notify(f, name, on_success, on_error, on_finally))
+    return future